@@ -0,0 +1 @@
+"""Micro-benchmarks for tiktok_dl."""
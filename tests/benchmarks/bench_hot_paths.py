@@ -0,0 +1,102 @@
+"""Micro-benchmarks of the code run once per video.
+
+Not collected by a plain `pytest` run, see `make bench`.
+"""
+import json
+import random
+
+import pytest
+
+from tiktok_dl.archive import ArchiveManager
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.extractors.extractor import Extractor
+from tiktok_dl.logger import Logger
+from tiktok_dl.utils import match_id
+from tiktok_dl.utils import search_regex
+from tiktok_dl.utils import try_get
+from tiktok_dl.utils import valid_url_re
+from tiktok_dl.validator import AwemeValidator
+
+pytest.importorskip("pytest_benchmark")
+
+URL = "https://www.tiktok.com/@tiktok.user_1/video/6843271209185053958"
+ARCHIVE_SIZE = 1000000
+
+
+@pytest.fixture
+def webpage(page_props):
+    """Webpage of a video with 64 KiB of markup before __NEXT_DATA__."""
+    return (
+        "<!DOCTYPE html><html><body><div>{}</div>"
+        '<script id="__NEXT_DATA__" type="application/json">{}</script>'
+        "</body></html>"
+    ).format("x" * 65536, json.dumps({"props": {"pageProps": page_props}}))
+
+
+@pytest.fixture(scope="module")
+def archive(tmp_path_factory):
+    """Text archive of ARCHIVE_SIZE ids with its index built."""
+    path = tmp_path_factory.mktemp("archive") / "archive.txt"
+    rng = random.Random(0)
+    ids = rng.sample(range(6000000000000000000, 7000000000000000000), ARCHIVE_SIZE)
+    path.write_text("\n".join(map(str, ids)) + "\n")
+    return str(path), str(ids[ARCHIVE_SIZE // 2])
+
+
+def test_search_regex(benchmark, webpage):
+    """Search __NEXT_DATA__ script after 64 KiB of markup."""
+    pattern = r'<script id="__NEXT_DATA__"[^>]*>(.+?)</script>'
+    result = benchmark(search_regex, pattern, webpage, "next data")
+    assert result.startswith('{"props"')
+
+
+def test_try_get(benchmark, page_props):
+    """Get pageProps from the parsed __NEXT_DATA__."""
+    json_data = {"props": {"pageProps": page_props}}
+    result = benchmark(
+        try_get, json_data, lambda x: x["props"]["pageProps"], expected_type=dict
+    )
+    assert result is page_props
+
+
+def test_match_id(benchmark):
+    """Match the video id of a URL."""
+    assert benchmark(lambda: match_id(URL, valid_url_re())) == "6843271209185053958"
+
+
+def test_extract(benchmark, page_props, video_data):
+    """Extract video data from pageProps."""
+    extractor = Extractor()
+    assert benchmark(extractor.extract, page_props)[1] == video_data
+
+
+def test_validate(benchmark, video_data):
+    """Validate extracted video data against the full schema."""
+    validator = AwemeValidator(mode="full")
+    assert benchmark(validator.validate, video_data) == (True, "0.0.1")
+
+
+def test_output_format(benchmark, video_data):
+    """Render the output path of a video."""
+    downloader = Downloader(None, None, Logger(verbose=False))
+    try:
+        assert benchmark(downloader._output_format, video_data).endswith(
+            "6843271209185053958_6700000000000000001"
+        )
+    finally:
+        downloader.close()
+
+
+@pytest.mark.parametrize("recorded", [True, False], ids=["recorded", "new"])
+@pytest.mark.parametrize("bloom", [False, True], ids=["bisect", "bloom"])
+def test_archive_recorded(benchmark, archive, bloom, recorded):
+    """Look up a recorded or a new id in a 1M id archive."""
+    path, video_id = archive
+    manager = ArchiveManager(path, bloom=bloom)
+    if not recorded:
+        video_id = "6843271209185053958"
+
+    try:
+        assert benchmark(manager.recorded, video_id) is recorded
+    finally:
+        manager.close()
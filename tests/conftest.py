@@ -0,0 +1,101 @@
+"""Shared fixtures for tiktok_dl tests."""
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "data")
+
+
+def load_data(filename):
+    """Read JSON file from tests/data."""
+    with open(os.path.join(DATA_DIR, filename), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def page_props():
+    """pageProps of a TikTok Video webpage."""
+    return load_data("page_props.json")
+
+
+@pytest.fixture
+def video_data():
+    """Extracted video data matching `page_props`."""
+    return load_data("video_data.json")
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    """Serve `server.files` with Range support and request logging.
+
+    The first `server.throttle` requests are answered with 429.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(body=False)
+
+    def do_GET(self, body=True):
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        if self.server.throttle > 0:
+            self.server.throttle -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = self.server.files.get(self.path)
+        if payload is None:
+            self.send_error(404)
+            return
+
+        start, end = 0, len(payload) - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if m and self.server.ranges:
+            start = int(m.group(1))
+            if m.group(2):
+                end = min(end, int(m.group(2)))
+            if start >= len(payload):
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */{}".format(len(payload)))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", "bytes {}-{}/{}".format(start, end, len(payload))
+            )
+        else:
+            self.send_response(200)
+
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if self.path in self.server.etags:
+            self.send_header("ETag", self.server.etags[self.path])
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if body:
+            self.wfile.write(payload[start : end + 1])
+
+
+@pytest.fixture
+def media_server():
+    """Local HTTP server serving in-memory files."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MediaHandler)
+    server.files = {}
+    server.etags = {}
+    server.requests = []
+    server.ranges = True
+    server.throttle = 0
+    server.url = "http://127.0.0.1:{}".format(server.server_address[1])
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
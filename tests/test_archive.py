@@ -0,0 +1,118 @@
+"""Tests for `tiktok_dl.archive` module."""
+import pytest
+
+from tiktok_dl.archive import ArchiveManager
+from tiktok_dl.archive import open_archive
+from tiktok_dl.archive_index import ArchiveIndex
+
+
+@pytest.fixture
+def archive_path(tmp_path):
+    """Text archive with a few ids and no trailing newline."""
+    path = tmp_path / "archive.txt"
+    path.write_text("6843271209185053958\n6843271209185053959\n1")
+    return str(path)
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_archive_manager(archive_path, bloom):
+    """Ids survive reopening and new lines are appended to the text file."""
+    archive = ArchiveManager(archive_path, bloom=bloom)
+    assert archive.recorded("6843271209185053958")
+    assert archive.recorded("1")
+    assert not archive.recorded("2")
+
+    archive.append("2")
+    assert archive.recorded("2")
+    archive.close()
+
+    with open(archive_path) as f:
+        assert f.read().split("\n")[-3:] == ["1", "2", ""]
+
+    archive = ArchiveManager(archive_path, bloom=bloom)
+    assert archive.recorded("2")
+    assert not archive.recorded("3")
+    archive.close()
+
+
+def test_archive_index_reads_only_tail(archive_path):
+    """Lines appended after compaction are picked up as delta."""
+    ArchiveIndex(archive_path).close()
+    with open(archive_path, "a") as f:
+        f.write("\n42\n")
+
+    index = ArchiveIndex(archive_path, compact_threshold=2)
+    assert index.delta == {42}
+    assert "42" in index and "6843271209185053959" in index
+
+    index.add("43")
+    assert index.delta == set()
+    assert len(index) == 5
+    index.close()
+
+
+def test_stale_bloom_filter_is_rebuilt(archive_path):
+    """A Bloom filter written for an older index is not trusted."""
+    ArchiveIndex(archive_path, bloom=True).close()
+    index = ArchiveIndex(archive_path)
+    index.add("42")
+    index.close()
+
+    index = ArchiveIndex(archive_path, bloom=True)
+    assert "42" in index
+    assert "6843271209185053958" in index
+    index.close()
+
+
+def test_rewritten_archive_is_reindexed(archive_path):
+    """An archive rewritten to the same size is not served from its old index."""
+    ArchiveIndex(archive_path).close()
+    with open(archive_path, "w") as f:
+        f.write("7843271209185053958\n7843271209185053959\n2")
+
+    index = ArchiveIndex(archive_path)
+    assert "7843271209185053958" in index and "2" in index
+    assert "6843271209185053958" not in index
+    index.close()
+
+
+def test_index_lookup_across_fences(tmp_path):
+    """Ids are found on both sides of every fence of the sorted index."""
+    path = tmp_path / "archive.txt"
+    path.write_text("\n".join(str(i * 3) for i in range(2000)) + "\n")
+
+    index = ArchiveIndex(str(path), bloom=True)
+    assert all(str(i * 3) in index for i in range(2000))
+    assert not any(str(i * 3 + 1) in index for i in range(-1, 2000))
+    index.close()
+
+
+def test_archive_disabled():
+    """Archive without a path records in memory only."""
+    archive = ArchiveManager()
+    archive.append("1")
+    assert archive.recorded("1")
+    archive.close()
+
+
+def test_sqlite_archive(tmp_path):
+    """Records are shared between connections and failed ones are not recorded."""
+    path = str(tmp_path / "archive.db")
+    archive = open_archive(path, backend="sqlite")
+    other = open_archive(path, backend="sqlite")
+
+    archive.append("1", user_id="u", create_time=1, files=["a.mp4"], size=10)
+    archive.append("2", status="failed")
+    assert archive.recorded("1")
+    assert not archive.recorded("2")
+    assert not other.recorded("1")
+
+    archive.flush()
+    assert other.recorded("1")
+    row = other.connection.execute(
+        "SELECT user_id, files, size FROM videos WHERE video_id = '1'"
+    ).fetchone()
+    assert row == ("u", '["a.mp4"]', 10)
+
+    archive.close()
+    other.close()
@@ -0,0 +1,117 @@
+"""Tests for `tiktok_dl.async_downloader` module."""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from tiktok_dl.logger import Logger
+
+aiohttp = pytest.importorskip("aiohttp")
+web = pytest.importorskip("aiohttp.web")
+
+from tiktok_dl.async_downloader import AsyncDownloader  # noqa: E402
+from tiktok_dl.downloader import URLExistsInArchive  # noqa: E402
+
+
+def test_download_url(tmp_path):
+    """Media is streamed to disk and failed downloads leave no file."""
+    payload = b"x" * 3000000
+
+    async def media(request):
+        return web.Response(body=payload)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/media.mp4", media)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        downloader = AsyncDownloader(None, None, Logger(verbose=False))
+        async with aiohttp.ClientSession() as session:
+            downloader.session = session
+            base = "http://127.0.0.1:{}".format(port)
+            await downloader._download_url(
+                base + "/media.mp4", str(tmp_path / "a" / "media.mp4")
+            )
+            await downloader._download_url(
+                base + "/missing.mp4", str(tmp_path / "a" / "missing.mp4")
+            )
+        await runner.cleanup()
+
+    asyncio.run(scenario())
+
+    assert (tmp_path / "a" / "media.mp4").read_bytes() == payload
+    assert not (tmp_path / "a" / "missing.mp4").exists()
+
+
+def test_download_all_reads_urls_off_the_loop():
+    """URLs are read in the executor so a slow iterator never blocks the loop."""
+    threads = []
+    downloaded = []
+
+    def urls():
+        for i in range(3):
+            threads.append(threading.current_thread())
+            yield str(i)
+
+    async def download(url):
+        downloaded.append(url)
+
+    downloader = AsyncDownloader(None, None, Logger(verbose=False))
+    downloader.download = download
+    downloader.run(urls(), concurrent_count=2)
+
+    assert sorted(downloaded) == ["0", "1", "2"]
+    assert threading.main_thread() not in threads
+
+
+def test_download_blocking_steps_off_the_loop():
+    """Archive lookup, validation and output formatting run in the executor."""
+    threads = {}
+
+    def record(name, result=None):
+        def func(*args):
+            threads[name] = threading.current_thread()
+            return result
+
+        return func
+
+    archive = SimpleNamespace(recorded=record("recorded", True))
+    validator = SimpleNamespace(validate=record("validate"))
+    downloader = AsyncDownloader(
+        validator,
+        None,
+        Logger(verbose=False),
+        archive=archive,
+        skip_download=True,
+    )
+
+    async def fetch_data(url):
+        return {"video_data": {"id": "1"}}
+
+    async def save_json(data, dest, on_saved=None):
+        pass
+
+    async def scenario():
+        with pytest.raises(URLExistsInArchive):
+            await downloader._fetch_data("https://www.tiktok.com/@user/video/1")
+        downloader._fetch_data = fetch_data
+        downloader._output_format = record("output_format", "video")
+        downloader._save_description = record("save_description")
+        downloader._save_json = save_json
+        await downloader.download("https://www.tiktok.com/@user/video/1")
+
+    asyncio.run(scenario())
+
+    assert sorted(threads) == [
+        "output_format",
+        "recorded",
+        "save_description",
+        "validate",
+    ]
+    assert threading.main_thread() not in threads.values()
+    assert downloader.metrics.snapshot()["stages"]["validate"]["count"] == 1
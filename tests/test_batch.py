@@ -0,0 +1,56 @@
+"""Tests for `tiktok_dl.batch` module."""
+import io
+
+from tiktok_dl.batch import input_urls
+from tiktok_dl.batch import read_batch_file
+
+BATCH = """\ufeff# comment
+https://www.tiktok.com/@a/video/1
+
+; comment
+] comment
+  https://www.tiktok.com/@a/video/2
+"""
+
+
+def test_read_batch_file(tmp_path):
+    """Blank and comment lines are skipped."""
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text(BATCH, encoding="utf-8")
+
+    assert list(read_batch_file(str(batch_file))) == [
+        "https://www.tiktok.com/@a/video/1",
+        "https://www.tiktok.com/@a/video/2",
+    ]
+
+
+def test_read_batch_file_stdin(monkeypatch):
+    """'-' reads from stdin."""
+    monkeypatch.setattr("sys.stdin", io.StringIO("#\nhttps://www.tiktok.com/\n"))
+
+    assert list(read_batch_file("-")) == ["https://www.tiktok.com/"]
+
+
+def test_input_urls_lazy(monkeypatch):
+    """Batch file is read only as URLs are consumed."""
+
+    class Lines:
+        def __init__(self):
+            self.read = 0
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            self.read += 1
+            return "https://www.tiktok.com/@a/video/{}\n".format(self.read)
+
+    lines = Lines()
+    monkeypatch.setattr("sys.stdin", lines)
+    urls = input_urls(["https://www.tiktok.com/@a/video/0"], "-")
+
+    assert next(urls).endswith("/0")
+    assert lines.read == 0
+    assert next(urls).endswith("/1")
+    assert next(urls).endswith("/2")
+    assert lines.read == 2
@@ -0,0 +1,40 @@
+"""Tests for the end-to-end benchmark in `utils/benchmark.py`."""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def test_benchmark_downloads_all_videos(tmp_path):
+    """Both engines download every video from the stand-in server."""
+    output = tmp_path / "benchmark.json"
+    subprocess.run(
+        [
+            sys.executable,
+            os.path.join(ROOT, "utils", "benchmark.py"),
+            "--videos",
+            "3",
+            "--concurrency",
+            "2",
+            "--media-size",
+            "4096",
+            "--page-padding",
+            "1024",
+            "--output",
+            str(output),
+        ],
+        stdout=subprocess.DEVNULL,
+        cwd=ROOT,
+        check=True,
+    )
+
+    results = json.loads(output.read_text())
+    assert [s["engine"] for s in results["scenarios"]] == ["threads", "asyncio"]
+    for scenario in results["scenarios"]:
+        assert scenario["exit_code"] == 0
+        assert scenario["completed"] == 3
+        assert scenario["statuses"] == {"200": 9}
+        assert scenario["latency_ms"]["p99"] >= scenario["latency_ms"]["p50"] > 0
+        assert scenario["peak_rss_mb"] > 0
@@ -0,0 +1,173 @@
+"""Tests for `tiktok_dl.daemon` module."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tiktok_dl.archive import ArchiveManager
+from tiktok_dl.daemon import create_app
+from tiktok_dl.daemon import JobManager
+from tiktok_dl.logger import Logger
+from tiktok_dl.metrics import Metrics
+
+
+class FakeTikTok:
+    """TikTokDownloader stand-in recording downloaded urls."""
+
+    def __init__(self):
+        self.options = SimpleNamespace(concurrent_count=2)
+        self.logger = Logger(verbose=False)
+        self.archive = ArchiveManager()
+        self.metrics = Metrics()
+        self.downloaded = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def abort(self):
+        pass
+
+    def download(self, url):
+        self.release.wait()
+        self.downloaded.append(url)
+
+
+def wait_for(job, status):
+    """Wait up to a second for job to reach status."""
+    for _ in range(100):
+        if job.status == status:
+            break
+        time.sleep(0.01)
+    return job.status
+
+
+def test_job_manager():
+    """Jobs are filtered, downloaded and reported."""
+    tiktok = FakeTikTok()
+    tiktok.archive.append("2")
+    manager = JobManager(tiktok)
+
+    job = manager.submit(
+        [
+            "https://www.tiktok.com/@user/video/1",
+            "https://www.tiktok.com/@user/video/2",
+            "https://www.tiktok.com/@user/video/3",
+        ]
+    )
+    for _ in range(100):
+        if job.status == "finished":
+            break
+        time.sleep(0.01)
+
+    assert job.to_dict()["queued"] == 2
+    assert job.to_dict()["skipped"] == 1
+    assert job.status == "finished"
+    assert sorted(tiktok.downloaded) == [
+        "https://www.tiktok.com/@user/video/1",
+        "https://www.tiktok.com/@user/video/3",
+    ]
+    assert manager.stats()["completed"] == 2
+    manager.close()
+
+
+def test_submit_reads_urls_lazily():
+    """Downloads start before the whole iterator of urls was read."""
+    tiktok = FakeTikTok()
+    manager = JobManager(tiktok)
+    downloaded = []
+
+    def urls():
+        yield "https://www.tiktok.com/@user/video/1"
+        for _ in range(100):
+            if tiktok.downloaded:
+                break
+            time.sleep(0.01)
+        downloaded.extend(tiktok.downloaded)
+        yield "https://www.tiktok.com/@user/video/1"
+
+    job = manager.submit(urls())
+    assert downloaded == ["https://www.tiktok.com/@user/video/1"]
+    assert wait_for(job, "finished") == "finished"
+    assert job.to_dict()["total"] == 2
+    assert job.to_dict()["skipped"] == 1
+    manager.close()
+
+
+def test_finished_jobs_evicted():
+    """Only the most recent finished Jobs are kept."""
+    tiktok = FakeTikTok()
+    manager = JobManager(tiktok, max_jobs=2)
+
+    jobs = []
+    for video_id in range(1, 4):
+        job = manager.submit(["https://www.tiktok.com/@user/video/{}".format(video_id)])
+        assert wait_for(job, "finished") == "finished"
+        jobs.append(job)
+
+    assert list(manager.jobs) == [jobs[1].id, jobs[2].id]
+    assert manager.stats()["jobs"] == 3
+    assert manager.stats()["pending"] == 0
+    manager.close()
+
+
+def test_close_does_not_create_downloader():
+    """Closing an idle daemon does not import the downloader."""
+    from tiktok_dl.options import options_parser
+    from tiktok_dl.tiktok_dl import TikTokDownloader
+
+    tiktok = TikTokDownloader(options_parser().parse_args(["--quiet"]))
+    JobManager(tiktok).close()
+
+    assert tiktok._downloader is None
+    tiktok.close()
+
+
+def test_job_running_when_picked_up():
+    """A Job is running as soon as its first url is being downloaded."""
+    tiktok = FakeTikTok()
+    tiktok.release.clear()
+    manager = JobManager(tiktok)
+
+    job = manager.submit(["https://www.tiktok.com/@user/video/1"])
+    assert wait_for(job, "running") == "running"
+    assert job.to_dict()["done"] == 0
+
+    tiktok.release.set()
+    assert wait_for(job, "finished") == "finished"
+    manager.close()
+
+
+def test_http_api():
+    """Jobs, stats and metrics are served over HTTP."""
+    tiktok = FakeTikTok()
+    manager = JobManager(tiktok)
+    app = create_app(manager)
+    try:
+        client = app.test_client
+    except ImportError:
+        pytest.skip("sanic-testing is not installed")
+
+    _, response = client.post(
+        "/jobs", json={"urls": ["https://www.tiktok.com/@user/video/1"]}
+    )
+    assert response.status == 202
+    job_id = response.json["id"]
+
+    _, response = client.post("/jobs", json={})
+    assert response.status == 400
+    _, response = client.post("/jobs", json=["https://www.tiktok.com/@user/video/1"])
+    assert response.status == 400
+
+    assert wait_for(manager.jobs[job_id], "finished") == "finished"
+    _, response = client.get("/jobs/{}".format(job_id))
+    assert response.json["status"] == "finished"
+    _, response = client.get("/jobs/999")
+    assert response.status == 404
+
+    _, response = client.get("/stats")
+    assert response.json["completed"] == 1
+
+    _, response = client.get("/metrics")
+    assert response.status == 200
+    assert "tiktok_dl_stage_seconds_count" in response.text
+    manager.close()
@@ -0,0 +1,91 @@
+"""Tests for `tiktok_dl.downloader` module."""
+from types import SimpleNamespace
+
+import pytest
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+
+
+@pytest.fixture
+def downloader():
+    """Downloader without validator and extractor."""
+    return Downloader(None, None, Logger(verbose=False))
+
+
+def test_download_url_resumes_part(media_server, downloader, tmp_path):
+    """Existing .part file is resumed with a Range request."""
+    payload = bytes(range(256)) * 1000
+    media_server.files["/video.mp4"] = payload
+    dest = tmp_path / "video.mp4"
+    (tmp_path / "video.mp4.part").write_bytes(payload[:1000])
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest))
+
+    assert dest.read_bytes() == payload
+    assert not (tmp_path / "video.mp4.part").exists()
+    assert media_server.requests[-1][2]["Range"] == "bytes=1000-"
+
+
+def test_download_url_restarts_without_ranges(media_server, downloader, tmp_path):
+    """Server ignoring Range overwrites the .part file."""
+    payload = b"a" * 5000
+    media_server.files["/video.mp4"] = payload
+    media_server.ranges = False
+    dest = tmp_path / "video.mp4"
+    (tmp_path / "video.mp4.part").write_bytes(b"b" * 100)
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest))
+
+    assert dest.read_bytes() == payload
+
+
+def test_download_url_complete_part(media_server, downloader, tmp_path):
+    """Fully downloaded .part file is renamed on 416."""
+    payload = b"a" * 5000
+    media_server.files["/video.mp4"] = payload
+    dest = tmp_path / "video.mp4"
+    (tmp_path / "video.mp4.part").write_bytes(payload)
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest))
+
+    assert dest.read_bytes() == payload
+
+
+def test_download_url_missing(media_server, downloader, tmp_path):
+    """Missing media leaves no file behind."""
+    dest = tmp_path / "video.mp4"
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_download_url_segmented(media_server, tmp_path, ranges):
+    """Large media is fetched in ranges, or in one stream without range support."""
+    downloader = Downloader(
+        None, None, Logger(verbose=False), segments=4, segment_min_size=1000
+    )
+    payload = bytes(range(256)) * 1001
+    media_server.files["/video.mp4"] = payload
+    media_server.ranges = ranges
+    dest = tmp_path / "video.mp4"
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest), segmented=True)
+
+    assert dest.read_bytes() == payload
+    assert list(tmp_path.iterdir()) == [dest]
+    ranged = [r for r in media_server.requests if "Range" in r[2]]
+    assert len(ranged) == (5 if ranges else 1)
+
+
+def test_download_aborted_is_not_recorded(downloader, video_data):
+    """Videos aborted while downloading media are not saved nor recorded."""
+    downloader._fetch_data = lambda url: {"video_data": video_data}
+    downloader.validator = SimpleNamespace(validate=lambda data: None)
+    downloader._download_media = lambda data, path: downloader.abort()
+    downloader._save_json = pytest.fail
+    downloader._record = pytest.fail
+
+    downloader.download("https://www.tiktok.com/@a/video/1")
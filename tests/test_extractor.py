@@ -0,0 +1,60 @@
+"""Tests for `tiktok_dl.extractors` package."""
+import pytest
+
+from tiktok_dl.extractors.extractor import Extractor
+from tiktok_dl.extractors.extractor import ExtractorError
+from tiktok_dl.extractors.spec import CompiledExtractor
+
+
+def test_extract(page_props, video_data):
+    """Extractor output matches the recorded video data."""
+    assert Extractor().extract(page_props) == ("0.0.1", video_data)
+
+
+def test_extract_version_from_payload(page_props, video_data):
+    """Extractor is picked from the payload, not from earlier videos."""
+    extractor = Extractor()
+
+    with pytest.raises(ExtractorError):
+        extractor.extract({"videoData": {}})
+
+    assert extractor.extract(page_props) == ("0.0.1", video_data)
+
+
+def test_extract_missing_template_field(page_props):
+    """Templates fail instead of rendering missing fields as None."""
+    del page_props["videoData"]["authorInfos"]["uniqueId"]
+
+    with pytest.raises(ExtractorError, match="missing unique_id"):
+        Extractor().extract(page_props)
+
+
+def test_extract_missing_fields():
+    """Missing or mistyped paths extract as None."""
+    extractor = CompiledExtractor(
+        {
+            "name": "test",
+            "version": "0.0.0",
+            "fields": {
+                "id": {"path": "a.b.id", "type": "str"},
+                "count": {"path": "a.b.count", "type": "int"},
+                "items": {"path": "a.c", "type": "list"},
+                "date": {"from": "time", "type": "date"},
+                "time": {"path": "a.time", "type": "int"},
+                "url": {"template": "/{id}"},
+            },
+        }
+    )
+
+    assert extractor.extract({"a": {"b": {"id": 1}, "c": "x"}}) == {
+        "id": "1",
+        "count": None,
+        "items": None,
+        "date": None,
+        "time": None,
+        "url": "/1",
+    }
+    assert (
+        extractor.extract({"a": {"b": {"id": 1}, "time": "1592915000"}})["date"]
+        == "20200623"
+    )
@@ -0,0 +1,62 @@
+"""Tests for `tiktok_dl.metadata` module."""
+import gzip
+import json
+import os
+
+from tiktok_dl.metadata import MetadataSink
+from tiktok_dl.metadata import read_records
+
+
+def test_sink_rotates_and_looks_up(tmp_path):
+    """Records are split into blocks and shards and found by video id."""
+    directory = str(tmp_path / "meta")
+    sink = MetadataSink(directory, block_size=200, shard_size=300)
+    records = [{"video_data": {"id": str(i)}, "n": "x" * 50} for i in range(20)]
+    for record in records:
+        sink.write(record["video_data"]["id"], record)
+
+    assert sink.lookup("7") == records[7]
+    assert sink.lookup("19") == records[19]
+    assert sink.lookup("20") is None
+    sink.close()
+
+    shards = sorted(n for n in os.listdir(directory) if n.endswith(".gz"))
+    assert len(shards) > 1
+    with gzip.open(os.path.join(directory, shards[0]), "rt") as f:
+        assert json.loads(f.readline()) == records[0]
+    assert list(read_records(directory)) == records
+
+
+def test_sink_reopen(tmp_path):
+    """Reopened sink appends to a new shard and keeps the index."""
+    directory = str(tmp_path / "meta")
+    sink = MetadataSink(directory)
+    sink.write("1", {"id": 1})
+    sink.close()
+
+    sink = MetadataSink(directory)
+    sink.write("2", {"id": 2})
+    assert sink.lookup("1") == {"id": 1}
+    assert sink.lookup("2") == {"id": 2}
+    sink.close()
+
+    assert list(read_records(directory)) == [{"id": 1}, {"id": 2}]
+
+
+def test_sink_callbacks_after_write(tmp_path):
+    """Callbacks run once the block of their record was written."""
+    directory = str(tmp_path / "meta")
+    sink = MetadataSink(directory, block_size=1000)
+    written = []
+    sink.write("1", {"id": 1}, on_written=lambda: written.append("1"))
+    assert written == []
+
+    sink.close()
+    assert written == ["1"]
+
+    for name in os.listdir(directory):
+        if name.endswith(".gz"):
+            os.remove(os.path.join(directory, name))
+    sink = MetadataSink(directory)
+    assert sink.lookup("1") is None
+    sink.close()
@@ -0,0 +1,78 @@
+"""Tests for `tiktok_dl.metrics` module."""
+import json
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.extractors.extractor import Extractor
+from tiktok_dl.logger import Logger
+from tiktok_dl.metrics import Metrics
+from tiktok_dl.metrics import STAGES
+from tiktok_dl.metrics import StatsFile
+from tiktok_dl.validator import AwemeValidator
+
+URL = "http://www.tiktok.com/@tiktok.user_1/video/6843271209185053958"
+
+
+def test_metrics_export(tmp_path):
+    """Timings are aggregated and exported as JSON and Prometheus text."""
+    metrics = Metrics()
+    for seconds in (0.001, 0.002, 0.2):
+        metrics.observe("webpage", seconds)
+    with metrics.timer("extract"):
+        pass
+    metrics.count("throttle_retries", 2)
+    metrics.add_bytes("media", 100)
+    metrics.error(ValueError())
+
+    snapshot = metrics.snapshot()
+    assert snapshot["stages"]["webpage"]["count"] == 3
+    assert snapshot["stages"]["webpage"]["p50"] == 0.0025
+    assert snapshot["stages"]["webpage"]["p99"] == 0.2
+    assert snapshot["stages"]["extract"]["count"] == 1
+    assert snapshot["counters"] == {"throttle_retries": 2}
+    assert snapshot["errors"] == {"ValueError": 1}
+
+    text = metrics.prometheus()
+    assert 'tiktok_dl_stage_seconds_bucket{stage="webpage",le="0.001"} 1' in text
+    assert 'tiktok_dl_stage_seconds_bucket{stage="webpage",le="+Inf"} 3' in text
+    assert 'tiktok_dl_bytes_total{kind="media"} 100' in text
+    assert 'tiktok_dl_errors_total{class="ValueError"} 1' in text
+
+    path = tmp_path / "stats.json"
+    StatsFile(metrics, str(path), interval=60).close()
+    assert json.loads(path.read_text())["bytes"] == {"media": 100}
+
+
+def test_download_records_every_stage(media_server, page_props, tmp_path):
+    """A download records each pipeline stage, bytes and retries."""
+    item = page_props["videoData"]["itemInfos"]
+    item["video"]["urls"] = [media_server.url + "/video.mp4"]
+    item["covers"] = [media_server.url + "/cover.jpeg"]
+    page = '<script id="__NEXT_DATA__" type="application/json">{}</script>'.format(
+        json.dumps({"props": {"pageProps": page_props}})
+    )
+    # Proxied requests carry the absolute URL as path.
+    media_server.files[URL] = page.encode("utf-8")
+    media_server.files[item["video"]["urls"][0]] = b"v" * 1000
+    media_server.files[item["covers"][0]] = b"c" * 10
+    media_server.throttle = 1
+
+    validator = AwemeValidator()
+    downloader = Downloader(
+        validator,
+        Extractor(),
+        Logger(verbose=False),
+        directory_prefix=str(tmp_path),
+        sleep_interval=0,
+    )
+    downloader.session.proxies = {"http": media_server.url}
+    downloader.session.trust_env = False
+    downloader.download(URL)
+    downloader.close()
+
+    snapshot = downloader.metrics.snapshot()
+    for stage in STAGES:
+        expected = 2 if stage == "download_url" else 1
+        assert snapshot["stages"][stage]["count"] == expected, stage
+    assert snapshot["bytes"] == {"webpage": len(page), "media": 1010}
+    assert snapshot["counters"] == {"throttle_retries": 1, "videos_extracted": 1}
+    assert snapshot["errors"] == {}
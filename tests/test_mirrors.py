@@ -0,0 +1,63 @@
+"""Tests for `tiktok_dl.mirrors` module."""
+import pytest
+
+from tiktok_dl import downloader as downloader_module
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+from tiktok_dl.mirrors import MirrorSelector
+
+A = "https://v16-web.tiktokcdn.com/video.mp4"
+B = "https://v19-web.tiktokcdn.com/video.mp4"
+C = "https://v21-web.tiktokcdn.com/video.mp4"
+
+
+def test_order_by_speed_and_health():
+    """Unmeasured hosts come first, then fastest, failed hosts last."""
+    now = [0.0]
+    selector = MirrorSelector(cooldown=10, clock=lambda: now[0])
+
+    assert selector.order([A, B, C]) == [A, B, C]
+
+    selector.record(A, latency=0.5, size=1000000, elapsed=1.0)
+    selector.record(B, latency=0.1, size=1000000, elapsed=0.5)
+    assert selector.order([A, B, C]) == [C, B, A]
+
+    selector.failed(C)
+    assert selector.order([A, B, C]) == [B, A, C]
+
+    now[0] = 11
+    assert selector.order([A, B, C])[0] == C
+
+    selector.failed(C, status=404)
+    selector.failed(C, status=429)
+    assert selector.order([A, B, C])[0] == C
+    selector.failed(C, status=503)
+    assert selector.order([A, B, C])[-1] == C
+
+
+def test_download_fails_over(media_server, tmp_path):
+    """Dead mirrors are skipped and remembered."""
+    downloader = Downloader(None, None, Logger(verbose=False), sleep_interval=0.01)
+    media_server.files["/b.mp4"] = b"video"
+    dest = tmp_path / "video.mp4"
+    urls = [media_server.url + "/a.mp4", media_server.url + "/b.mp4"]
+
+    assert downloader._download_mirrors(urls, str(dest)) is True
+    assert dest.read_bytes() == b"video"
+    assert [r[1] for r in media_server.requests] == ["/a.mp4", "/b.mp4"]
+
+    assert downloader._download_mirrors(urls[:1], str(tmp_path / "x.mp4")) is False
+
+
+def test_race_mirrors(media_server, tmp_path, monkeypatch):
+    """Raced mirror answering first is downloaded from, in the shared pool."""
+    downloader = Downloader(
+        None, None, Logger(verbose=False), race_mirrors=2, sleep_interval=0.01
+    )
+    monkeypatch.setattr(downloader_module, "ThreadPoolExecutor", pytest.fail)
+    media_server.files["/b.mp4"] = b"video"
+    urls = [media_server.url + "/a.mp4", media_server.url + "/b.mp4"]
+
+    assert downloader._race(urls) == urls[::-1]
+    assert downloader._download_mirrors(urls, str(tmp_path / "video.mp4"))
+    assert (tmp_path / "video.mp4").read_bytes() == b"video"
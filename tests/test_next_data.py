@@ -0,0 +1,34 @@
+"""Tests for `tiktok_dl.next_data` module."""
+import pytest
+
+from tiktok_dl.next_data import NextDataScanner
+
+PAGE = (
+    b"<html><head>"
+    + b"x" * 5000
+    + b'<script id="__NEXT_DATA__" type="application/json"'
+    b' crossorigin="anonymous">{"props": {"pageProps": {"statusCode": 0}}}</script>'
+    b"<script>trailing()</script></html>"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, len(PAGE)])
+def test_scanner_chunks(chunk_size):
+    """Payload is found regardless of chunk boundaries."""
+    scanner = NextDataScanner()
+    for i in range(0, len(PAGE), chunk_size):
+        if scanner.feed(PAGE[i : i + chunk_size]):
+            break
+
+    assert scanner.payload == '{"props": {"pageProps": {"statusCode": 0}}}'
+    assert i < PAGE.index(b"<script>trailing")
+
+
+def test_scanner_missing():
+    """Scanner buffers only a small tail without the marker."""
+    scanner = NextDataScanner(keep=64)
+    for _ in range(100):
+        assert not scanner.feed(b"y" * 1000)
+
+    assert not scanner.done
+    assert len(scanner.buffer) == 64
@@ -0,0 +1,49 @@
+"""Tests for `tiktok_dl.output` module."""
+import io
+import json
+
+import pytest
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+from tiktok_dl.output import JSONLinesWriter
+from tiktok_dl.validator import AwemeValidator
+
+
+def test_json_lines_writer():
+    """Records are written as one compact line each."""
+    stream = io.StringIO()
+    writer = JSONLinesWriter(stream, max_pending=2)
+    for i in range(100):
+        writer.write({"id": str(i), "title": "ü"})
+    writer.close()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 100
+    assert lines[5] == '{"id":"5","title":"ü"}'
+
+
+@pytest.mark.parametrize("option", ["dump_json", "simulate"])
+def test_metadata_only(video_data, tmp_path, capsys, option):
+    """Metadata-only modes never download media nor write files."""
+    downloader = Downloader(
+        AwemeValidator(mode="off"),
+        None,
+        Logger(verbose=False),
+        content_store=str(tmp_path / "store"),
+        directory_prefix=str(tmp_path),
+        metadata_sink=str(tmp_path / "sink"),
+        **{option: True},
+    )
+    downloader._fetch_data = lambda url: {"video_data": video_data}
+    downloader._download_media = pytest.fail
+
+    downloader.download("https://www.tiktok.com/@a/video/1")
+    downloader.close()
+
+    assert list(tmp_path.iterdir()) == []
+    out = capsys.readouterr().out
+    if option == "dump_json":
+        assert json.loads(out) == video_data
+    else:
+        assert out == ""
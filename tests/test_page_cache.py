@@ -0,0 +1,95 @@
+"""Tests for `tiktok_dl.page_cache` and `tiktok_dl.reextract` modules."""
+import json
+import os
+
+import pytest
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.extractors.extractor import Extractor
+from tiktok_dl.logger import Logger
+from tiktok_dl.page_cache import PageCache
+from tiktok_dl.reextract import reextract
+
+URL = "https://www.tiktok.com/@tiktok.user_1/video/6843271209185053958"
+
+
+@pytest.fixture
+def next_data(page_props):
+    """__NEXT_DATA__ payload of the recorded video."""
+    return json.dumps({"props": {"pageProps": page_props}})
+
+
+def test_ttl_and_lru(tmp_path):
+    """Expired pages are ignored, least recently used pages evicted."""
+    cache = PageCache(str(tmp_path / "pages.db"), max_size=1000, ttl=60)
+    cache.put("1", "a" * 10)
+    cache.connection.execute("UPDATE pages SET fetched_at = fetched_at - 61")
+    assert cache.get("1") is None
+
+    pages = {str(i): os.urandom(200).hex() for i in range(2, 12)}
+    for video_id, payload in pages.items():
+        cache.put(video_id, payload)
+        cache.get("2")
+
+    assert cache.get("2") == pages["2"]
+    assert cache.get("3") is None
+    assert cache.get("11") == pages["11"]
+    assert cache.total_size <= 1000
+    cache.close()
+
+
+def test_fetch_data_uses_cache(tmp_path, next_data, video_data):
+    """Webpages are fetched once and then read from the cache."""
+    cache = PageCache(str(tmp_path / "pages.db"))
+    downloader = Downloader(None, Extractor(), Logger(verbose=False), page_cache=cache)
+    fetched = []
+
+    def download_webpage(url, video_id, note=None):
+        fetched.append(url)
+        return next_data
+
+    downloader._download_webpage = download_webpage
+
+    for _ in range(2):
+        assert downloader._fetch_data(URL)["video_data"] == video_data
+    assert fetched == [URL]
+    cache.close()
+
+
+def test_reextract(tmp_path, next_data, video_data):
+    """Cached pages are extracted in a process pool."""
+    path = str(tmp_path / "pages.db")
+    cache = PageCache(path)
+    cache.put("6843271209185053958", next_data)
+    cache.put("1", json.dumps({"props": {"pageProps": {"statusCode": 10216}}}))
+    cache.put("2", "{")
+    cache.close()
+
+    records = {}
+    stats = reextract(
+        path, records.__setitem__, processes=2, validate="off", full=False
+    )
+
+    assert stats == {"extracted": 1, "failed": 1}
+    assert records == {"6843271209185053958": video_data}
+
+
+def test_reextract_full_records(tmp_path, next_data):
+    """Full records match downloaded ones, expired pages are skipped."""
+    path = str(tmp_path / "pages.db")
+    cache = PageCache(path)
+    cache.put("6843271209185053958", next_data)
+    cache.connection.execute("UPDATE pages SET fetched_at = fetched_at - 61")
+    fetched_at = cache.read("6843271209185053958")[1]
+    cache.close()
+
+    records = {}
+    assert reextract(path, records.__setitem__, processes=1, ttl=60)["extracted"] == 0
+    reextract(path, records.__setitem__, processes=1, validate="off")
+
+    downloader = Downloader(None, Extractor(), Logger(verbose=False))
+    downloaded = downloader._parse_next_data(next_data, "6843271209185053958", URL)
+    record = records["6843271209185053958"]
+    assert record.keys() == downloaded.keys()
+    assert record["url"] == URL
+    assert record["timestamp"] == fetched_at
@@ -0,0 +1,46 @@
+"""Tests for `tiktok_dl.preflight` module."""
+from tiktok_dl.archive import ArchiveManager
+from tiktok_dl.logger import Logger
+from tiktok_dl.preflight import Preflight
+
+
+def test_preflight_filter():
+    """Archived, duplicate and invalid urls are dropped."""
+    archive = ArchiveManager()
+    archive.append("2")
+    preflight = Preflight(archive, Logger(verbose=False))
+
+    urls = list(
+        preflight.filter(
+            [
+                " https://www.tiktok.com/@user/video/1?lang=en ",
+                "tiktok.com/@user/video/1",
+                "https://m.tiktok.com/@user/video/2",
+                "https://example.com/video/3",
+                "https://www.tiktok.com/share/video/3#top",
+            ]
+        )
+    )
+
+    assert urls == [
+        "https://www.tiktok.com/@user/video/1?lang=en",
+        "https://www.tiktok.com/share/video/3",
+    ]
+    assert preflight.stats == {
+        "queued": 2,
+        "duplicate": 1,
+        "archived": 1,
+        "invalid": 1,
+    }
+
+
+def test_preflight_seen_bounded():
+    """Only the most recently seen ids are remembered."""
+    preflight = Preflight(ArchiveManager(), Logger(verbose=False), max_seen=2)
+    url = "https://www.tiktok.com/@user/video/{}"
+
+    for video_id in (1, 2, 1, 3, 2):
+        preflight.check(url.format(video_id))
+
+    assert list(preflight.seen) == [3, 2]
+    assert preflight.stats["duplicate"] == 1
@@ -0,0 +1,101 @@
+"""Tests for `tiktok_dl.ratelimit` module."""
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+from tiktok_dl.ratelimit import parse_retry_after
+from tiktok_dl.ratelimit import RateLimiter
+from tiktok_dl.ratelimit import UNPACED_RATE
+
+URL = "https://v16.tiktokcdn.com/video.mp4"
+
+
+class Clock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_spaces_requests():
+    """Requests to a host are spaced by the current rate, hosts are independent."""
+    clock = Clock()
+    limiter = RateLimiter(sleep_interval=0.5, clock=clock)
+
+    assert limiter.reserve(URL) == 0
+    assert limiter.reserve(URL) == 0.5
+    assert limiter.reserve(URL) == 1.0
+    assert limiter.reserve("https://www.tiktok.com/") == 0
+
+    clock.now += 10
+    assert limiter.reserve(URL) == 0
+
+
+def test_aimd():
+    """Healthy responses raise the rate, throttling halves it."""
+    clock = Clock()
+    limiter = RateLimiter(sleep_interval=1, max_sleep_interval=10, clock=clock)
+    limiter.reserve(URL)
+    bucket = limiter.buckets["v16.tiktokcdn.com"]
+
+    for _ in range(200):
+        assert limiter.feedback(URL, 200) is False
+    assert bucket.rate == limiter.max_rate == 10
+
+    assert limiter.feedback(URL, 429) is True
+    assert bucket.rate == 5
+    for _ in range(10):
+        limiter.feedback(URL, 503)
+    assert bucket.rate == limiter.min_rate == 0.1
+
+    limiter.feedback(URL, 404)
+    assert bucket.rate == 0.1
+
+
+def test_retry_after_blocks_host():
+    """Retry-After delays the next request to the host."""
+    clock = Clock()
+    limiter = RateLimiter(sleep_interval=0.1, clock=clock)
+
+    limiter.feedback(URL, 429, "30")
+
+    assert limiter.reserve(URL) == 30
+    clock.now += 30
+    assert limiter.reserve(URL) < 1
+
+
+def test_parse_retry_after():
+    """Retry-After is parsed as seconds or HTTP date."""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412400) == 80
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_download_retries_throttled(media_server, tmp_path):
+    """Throttled media requests are retried after backing off."""
+    downloader = Downloader(None, None, Logger(verbose=False), sleep_interval=0.01)
+    media_server.files["/video.mp4"] = b"video"
+    media_server.throttle = 2
+    dest = tmp_path / "video.mp4"
+
+    downloader._download_url(media_server.url + "/video.mp4", str(dest))
+
+    assert dest.read_bytes() == b"video"
+    assert len(media_server.requests) == 3
+    assert downloader.limiter.buckets["127.0.0.1"].rate < UNPACED_RATE
+
+
+def test_only_webpage_hosts_paced():
+    """Hosts outside `hosts` are not paced until they throttle."""
+    clock = Clock()
+    limiter = RateLimiter(sleep_interval=0.5, hosts=["tiktok.com"], clock=clock)
+
+    assert limiter.reserve("https://www.tiktok.com/@a/video/1") == 0
+    assert limiter.reserve("https://www.tiktok.com/@a/video/2") == 0.5
+    for _ in range(10):
+        assert limiter.reserve(URL) <= 0.01
+
+    limiter.feedback(URL, 429, "0")
+    assert limiter.buckets["v16.tiktokcdn.com"].rate == UNPACED_RATE / 2
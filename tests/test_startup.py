@@ -0,0 +1,70 @@
+"""Tests for import cost of the `tiktok_dl.cli` entry point."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["aiohttp", "jsonschema", "loguru", "requests", "sanic", "urllib3"]
+
+SCRIPT = """
+import json
+import sys
+
+from tiktok_dl import cli
+
+heavy = json.loads(sys.argv[2])
+sys.argv = ["tiktok-dl"] + json.loads(sys.argv[1])
+try:
+    cli.main()
+except SystemExit:
+    pass
+print(json.dumps(sorted(m for m in heavy if m in sys.modules)))
+"""
+
+
+def imported_modules(args):
+    """Run cli.main with args and return the heavy modules it imported."""
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT, json.dumps(args), json.dumps(HEAVY_MODULES)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+        check=True,
+    )
+    return json.loads(out.stdout.decode("utf-8").strip().split("\n")[-1])
+
+
+@pytest.mark.parametrize("args", [["--version"], ["--help"]])
+def test_no_heavy_imports_for_help(args):
+    """--help and --version only need argparse."""
+    assert imported_modules(args) == []
+
+
+def test_no_heavy_imports_for_archived_urls(tmp_path):
+    """Runs where every URL is archived never build the downloader."""
+    archive = tmp_path / "archive.txt"
+    archive.write_text("6843271209185053958\n")
+
+    args = [
+        "--quiet",
+        "--download-archive",
+        str(archive),
+        "https://www.tiktok.com/@user/video/6843271209185053958",
+    ]
+
+    assert imported_modules(args) == []
+
+
+def test_validator_and_extractor_created_on_access():
+    """Validator and extractor are available before the downloader was used."""
+    from tiktok_dl.options import options_parser
+    from tiktok_dl.tiktok_dl import TikTokDownloader
+
+    tiktok = TikTokDownloader(options_parser().parse_args(["--quiet"]))
+
+    assert tiktok._downloader is None
+    assert tiktok.validator is tiktok.downloader.validator is not None
+    assert tiktok.extractor is tiktok.downloader.extractor is not None
+    tiktok.close()
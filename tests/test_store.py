@@ -0,0 +1,65 @@
+"""Tests for `tiktok_dl.store` module."""
+import os
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+from tiktok_dl.store import ContentStore
+
+
+def test_put_deduplicates(tmp_path):
+    """Same content is stored once and linked into every path."""
+    store = ContentStore(str(tmp_path / "store"))
+    for name in ("a", "b"):
+        (tmp_path / (name + ".part")).write_bytes(b"cover")
+        store.put(str(tmp_path / (name + ".part")), str(tmp_path / (name + ".jpg")))
+
+    blobs = list((tmp_path / "store" / "objects").rglob("*"))
+    assert len([p for p in blobs if p.is_file()]) == 1
+    assert (tmp_path / "a.jpg").read_bytes() == (tmp_path / "b.jpg").read_bytes()
+    assert os.path.samefile(str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg"))
+    assert not (tmp_path / "a.part").exists()
+    store.close()
+
+
+def test_download_skips_known_etag(media_server, tmp_path):
+    """Only a response of the same URL with known ETag and size is linked."""
+    store_dir = str(tmp_path / "store")
+    downloader = Downloader(
+        None, None, Logger(verbose=False), content_store=store_dir, sleep_interval=0.01
+    )
+    media_server.files["/a.jpg"] = b"cover"
+    media_server.files["/b.jpg"] = b"other"
+    media_server.files["/a.jpg?sig=2"] = b"cover"
+    for path in media_server.files:
+        media_server.etags[path] = '"1234"'
+    url = media_server.url + "/a.jpg"
+
+    downloader._download_url(url, str(tmp_path / "a.jpg"))
+    downloader._download_url(media_server.url + "/b.jpg", str(tmp_path / "b.jpg"))
+    downloader._download_url(url + "?sig=2", str(tmp_path / "c.jpg"))
+    downloader.close()
+
+    assert (tmp_path / "b.jpg").read_bytes() == b"other"
+    assert (tmp_path / "c.jpg").read_bytes() == b"cover"
+    assert [r[1] for r in media_server.requests] == ["/a.jpg", "/b.jpg", "/a.jpg?sig=2"]
+    assert not (tmp_path / "c.jpg.part").exists()
+
+    store = ContentStore(store_dir)
+    assert store.lookup(url, '"1234"', 5) == store.blob_path(
+        store.digest_file(str(tmp_path / "a.jpg"))
+    )
+    assert store.lookup(url, 'W/"1234"', 5) is None
+    assert store.lookup(media_server.url + "/c.jpg", '"1234"', 5) is None
+    store.close()
+
+
+def test_copy_link_mode(tmp_path):
+    """Copies do not share data with the blob."""
+    store = ContentStore(str(tmp_path / "store"), link_mode="copy")
+    (tmp_path / "a.part").write_bytes(b"cover")
+    digest = store.put(str(tmp_path / "a.part"), str(tmp_path / "a.jpg"))
+
+    (tmp_path / "a.jpg").write_bytes(b"edited")
+    with open(store.blob_path(digest), "rb") as f:
+        assert f.read() == b"cover"
+    store.close()
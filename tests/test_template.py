@@ -0,0 +1,60 @@
+"""Tests for `tiktok_dl.template` module."""
+import pytest
+
+from tiktok_dl.template import OutputTemplate
+
+
+def test_default_template(video_data):
+    """Default template renders like the previous implementation."""
+    template = OutputTemplate("{Y}-{d}-{m}_{H}-{M}-{S} {id}_{user_id}")
+
+    assert template.fields == {"Y", "d", "m", "H", "M", "S", "id", "user_id"}
+    assert template.render(video_data) == "2020-23-06_12-23-20 {}_{}".format(
+        video_data["id"], video_data["user_id"]
+    )
+
+
+def test_sanitize_and_missing():
+    """Field values are sanitized, separators of the template are kept."""
+    template = OutputTemplate("{unique_id}/{description:.8} {nope} {width:05d}")
+
+    assert (
+        template.render({"unique_id": "..", "description": 'a/b:c?"d', "width": 720})
+        == "_/a_b_c__d NA 00720"
+    )
+
+
+def test_collisions():
+    """Paths rendered for different videos never collide."""
+    template = OutputTemplate("{nick_name}")
+
+    assert template.render({"id": "1", "nick_name": "a"}) == "a"
+    assert template.render({"id": "1", "nick_name": "a"}) == "a"
+    assert template.render({"id": "2", "nick_name": "a"}) == "a_2"
+    assert template.render({"id": "3", "nick_name": "a_2"}) == "a_2_3"
+
+
+def test_format_spec_mismatch():
+    """Mismatched format specs are rejected by check and ignored by render."""
+    template = OutputTemplate("{id:05d}")
+
+    with pytest.raises(ValueError, match="Format spec '05d' of field id"):
+        template.check({"id": "6843271209185053958"})
+    assert template.render({"id": "12"}) == "12"
+    assert OutputTemplate("{width:05d}").check({"width": 720}) is None
+
+
+def test_paths_bounded():
+    """Only the most recently rendered paths are remembered."""
+    template = OutputTemplate("{nick_name}", max_paths=2)
+
+    for i in range(5):
+        template.render({"id": str(i), "nick_name": str(i)})
+
+    assert list(template.paths) == ["3", "4"]
+
+
+def test_positional_fields():
+    """Positional fields are rejected."""
+    with pytest.raises(ValueError):
+        OutputTemplate("{} {0}")
@@ -0,0 +1,33 @@
+"""Tests for `tiktok_dl.validator` module."""
+from types import SimpleNamespace
+
+from tiktok_dl.validator import AwemeValidator
+
+
+def test_validate_full(video_data):
+    """Valid data matches the bundled schema, invalid data does not."""
+    warnings = []
+    logger = SimpleNamespace(warning=warnings.append)
+    validator = AwemeValidator(logger=logger)
+
+    assert validator.validate(video_data) == (True, "0.0.1")
+    assert warnings == []
+    assert validator.validate({"id": 1}) == (False, None)
+    assert warnings == ["No valid schema exists for given json data"]
+
+
+def test_validate_sampled():
+    """Only one in `sample_rate` videos is validated."""
+    validator = AwemeValidator(mode="sampled", sample_rate=3)
+
+    results = [validator.validate({"id": 1})[0] for _ in range(6)]
+
+    assert results == [False, True, True, False, True, True]
+
+
+def test_validate_off():
+    """Validation is skipped."""
+    validator = AwemeValidator(mode="off")
+
+    assert validator.validate({"id": 1}) == (True, None)
+    assert validator.validators is None
@@ -0,0 +1,64 @@
+"""Tests for `tiktok_dl.worker` module."""
+import threading
+import time
+
+from tiktok_dl.logger import Logger
+from tiktok_dl.worker import WorkerPool
+
+
+def test_worker_pool_runs_concurrently():
+    """All items are processed with at most `concurrent_count` running."""
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0, "done": []}
+
+    def task(item):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.01)
+        with lock:
+            state["running"] -= 1
+            state["done"].append(item)
+
+    pool = WorkerPool(task, logger=Logger(verbose=False), concurrent_count=4)
+    pool.map(iter(range(40)))
+
+    assert sorted(state["done"]) == list(range(40))
+    assert 1 < state["peak"] <= 4
+
+
+def test_worker_pool_stop_cancels_queued():
+    """Queued items are not run after stop."""
+    done = []
+
+    def task(item):
+        if item == 0:
+            pool.stop()
+        done.append(item)
+
+    pool = WorkerPool(task, logger=Logger(verbose=False), concurrent_count=1)
+    pool.map(range(10))
+
+    assert done == [0]
+
+
+def test_worker_pool_join_and_submit_after_shutdown():
+    """join waits for running tasks, submitting to a shut down pool is a no-op."""
+    done = []
+    started = threading.Event()
+
+    def task(item):
+        started.set()
+        time.sleep(0.05)
+        done.append(item)
+
+    pool = WorkerPool(task, logger=Logger(verbose=False), concurrent_count=1)
+    pool.submit(1)
+    started.wait()
+    pool.stop()
+    assert pool.join(timeout=5)
+    assert done == [1]
+
+    pool = WorkerPool(task, logger=Logger(verbose=False), concurrent_count=1)
+    pool.shutdown()
+    assert pool.submit(2) is None
@@ -0,0 +1,78 @@
+"""Tests for `tiktok_dl.writer` module."""
+import json
+import os
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.logger import Logger
+from tiktok_dl.writer import FileWriter
+
+
+def test_write_json_no_overwrite(tmp_path):
+    """Existing files are kept with no_overwrite, temporary files removed."""
+    dest = str(tmp_path / "a" / "video.json")
+
+    assert FileWriter().write_json(dest, {"id": "1"})
+    assert not FileWriter(no_overwrite=True).write_json(dest, {"id": "2"})
+    assert FileWriter().write_json(dest, {"id": "3"})
+
+    assert json.loads((tmp_path / "a" / "video.json").read_text()) == {"id": "3"}
+    assert os.listdir(str(tmp_path / "a")) == ["video.json"]
+
+
+def test_directories_cached(tmp_path, monkeypatch):
+    """Known directories are not created again."""
+    calls = []
+    makedirs = os.makedirs
+    monkeypatch.setattr(
+        os, "makedirs", lambda *a, **k: calls.append(a) or makedirs(*a, **k)
+    )
+    writer = FileWriter()
+
+    for i in range(5):
+        writer.write_text(str(tmp_path / "a" / "{}.txt".format(i)), "x")
+
+    assert len(calls) == 1
+
+
+def test_fsync_batched(tmp_path, monkeypatch):
+    """Files are synced before their rename, directories once per batch."""
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd) or fsync(fd))
+    replace = os.replace
+    monkeypatch.setattr(
+        os, "replace", lambda *a: synced.append("replace") or replace(*a)
+    )
+    writer = FileWriter(fsync=True, sync_every=3)
+
+    for i in range(4):
+        writer.write_text(str(tmp_path / "{}.txt".format(i)), "x")
+    assert synced.count("replace") == 4
+    assert synced[1] == "replace"
+    assert len(synced) == 4 + 4 + 1
+
+    writer.close()
+    assert len(synced) == 4 + 4 + 2
+
+
+def test_no_overwrite_file_created_meanwhile(tmp_path, monkeypatch):
+    """A file created after the existence check is not replaced."""
+    dest = tmp_path / "video.json"
+    writer = FileWriter(no_overwrite=True)
+    monkeypatch.setattr(writer, "skip", lambda dest: False)
+    dest.write_text("first")
+
+    assert not writer.write_json(str(dest), {"id": "2"})
+
+    assert dest.read_text() == "first"
+    assert os.listdir(str(tmp_path)) == ["video.json"]
+
+
+def test_write_description(tmp_path):
+    """Description is written next to the video with write_description."""
+    downloader = Downloader(None, None, Logger(verbose=False), write_description=True)
+    dest = str(tmp_path / "video.description")
+
+    downloader._save_description({"description": "Hello #fyp"}, dest)
+
+    assert (tmp_path / "video.description").read_text(encoding="utf-8") == "Hello #fyp"
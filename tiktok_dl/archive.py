@@ -1,37 +1,51 @@
 """Archive Manager for tiktok_dl."""
+import threading
+
+from tiktok_dl.archive_index import ArchiveIndex
+from tiktok_dl.archive_sqlite import SQLiteArchiveManager
 
 
 class ArchiveManager:
     """Manage Archive file containing ids of downloaded TikTok Videos."""
 
-    def __init__(self, download_archive=None):
+    def __init__(self, download_archive=None, bloom=False):
         """Initialize Archive Manager.
 
-           1. Read archive list from disc.
-           2. Open file object for archive list
+           1. Open file object for archive list
+           2. Load archive index, see `ArchiveIndex`.
 
         Args:
             download_archive (str, optional): File path of the local archive. Defaults to None.
+            bloom (bool, optional): Use a Bloom filter in front of the index. Defaults to False.
         """
         self.archive_path = download_archive
+        self.lock = threading.Lock()
         self.enable_archive = download_archive is not None
         self.archive_file = self._open()
-        self.list = self._init_archive()
+        self.index = self._init_archive(bloom)
 
     def _open(self):
-        """Open archive file for reading+writing."""
+        """Open archive file for appending."""
         if self.enable_archive:
-            return open(self.archive_path, "r+", encoding="utf-8")
+            archive_file = open(self.archive_path, "a+", encoding="utf-8")
+            if archive_file.tell() > 0:
+                archive_file.seek(archive_file.tell() - 1)
+                if archive_file.read(1) != "\n":
+                    archive_file.write("\n")
+                    archive_file.flush()
+            return archive_file
         return None
 
-    def _init_archive(self):
-        """Read local archive file."""
-        return self.archive_file.read().strip().split("\n")
+    def _init_archive(self, bloom):
+        """Open index of the local archive file."""
+        return ArchiveIndex(self.archive_path, bloom=bloom)
 
     def _update_archive(self, video_id: str):
-        self.list.append(video_id)
-        if self.enable_archive:
-            self.archive_file.write("%s\n" % video_id)
+        with self.lock:
+            if self.enable_archive:
+                self.archive_file.write("%s\n" % video_id)
+                self.archive_file.flush()
+            self.index.add(video_id)
 
     def recorded(self, video_id: str):
         """Check if the video_id exists in the Archive?.
@@ -42,17 +56,39 @@ class ArchiveManager:
         Returns:
             bool: True if exists in archive
         """
-        return video_id in self.list
+        with self.lock:
+            return video_id in self.index
 
-    def append(self, video_id: str):
+    def append(self, video_id: str, status="downloaded", **metadata):
         """Record video_id to the archive.
 
         Args:
             video_id (str): id of the TikTok Video
+            status (str, optional): Only "downloaded" videos are recorded. Defaults to "downloaded".
+            **metadata: Ignored, the text archive only stores ids.
         """
-        self._update_archive(video_id)
+        if status == "downloaded":
+            self._update_archive(video_id)
 
     def close(self):
         """Close Archive Manager."""
-        if self.enable_archive:
-            self.archive_file.close()
+        with self.lock:
+            if self.enable_archive:
+                self.archive_file.close()
+            self.index.close()
+
+
+def open_archive(download_archive=None, backend="text", bloom=False):
+    """Open download archive with the given backend.
+
+    Args:
+        download_archive (str, optional): File path of the archive. Defaults to None.
+        backend (str, optional): "text" or "sqlite". Defaults to "text".
+        bloom (bool, optional): Use a Bloom filter with text archive. Defaults to False.
+
+    Returns:
+        ArchiveManager or SQLiteArchiveManager: Archive Manager instance.
+    """
+    if backend == "sqlite" and download_archive is not None:
+        return SQLiteArchiveManager(download_archive)
+    return ArchiveManager(download_archive, bloom=bloom)
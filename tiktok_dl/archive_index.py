@@ -0,0 +1,356 @@
+"""Compact on-disk index of archived TikTok Video ids."""
+import bisect
+import heapq
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# Index files hold little-endian uint64 ids after the header, which records
+# the id count, the bytes of the text archive covered and a CRC32 of the
+# last TAIL_SIZE bytes before that offset.
+MAGIC = b"TTDLIDX2"
+HEADER = struct.Struct("<8sQQI")
+TAIL_SIZE = 64
+# Bloom files record the id count and text offset of the index they cover.
+BLOOM_MAGIC = b"TTDLBLM2"
+BLOOM_HEADER = struct.Struct("<8sQQ")
+MAX_ID = (1 << 64) - 1
+# Every FENCE-th id is kept in a list to narrow the bisect of the mapped ids.
+FENCE = 512
+LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def parse_id(video_id):
+    """Convert video id to int.
+
+    Args:
+        video_id (str or bytes): id of the TikTok Video.
+
+    Returns:
+        int: Numeric id or None if the id is not a valid uint64.
+    """
+    try:
+        value = int(video_id)
+    except (TypeError, ValueError):
+        return None
+    if 0 <= value <= MAX_ID:
+        return value
+    return None
+
+
+def _write_ids(f, ids):
+    """Write array of ids to f as little-endian uint64."""
+    if not LITTLE_ENDIAN:
+        ids.byteswap()
+    ids.tofile(f)
+
+
+class BloomFilter:
+    """Bloom filter over uint64 ids backed by a bytearray or mmap.
+
+    TikTok ids are spread well enough to be used unhashed: the two bit
+    positions are the id and its bits above the 21st modulo the filter
+    size. Hashing them costs more in Python than the bisect the filter
+    saves. With the default 10 bits per item about 3% of absent ids pass.
+    """
+
+    def __init__(self, capacity, bits_per_item=10, data=None):
+        """Initialize Bloom filter.
+
+        Args:
+            capacity (int): Expected number of items.
+            bits_per_item (int, optional): Size of the filter per item. Defaults to 10.
+            data (buffer, optional): Existing filter bits. Defaults to None.
+        """
+        if data is None:
+            data = bytearray(max(8, (capacity * bits_per_item + 7) // 8))
+        self.data = data
+        self.size = len(data) * 8
+
+    def add(self, value):
+        """Add value to the filter."""
+        for pos in (value % self.size, (value >> 21) % self.size):
+            self.data[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value):
+        """Check if value may be in the filter."""
+        data, size = self.data, self.size
+        pos = value % size
+        if not data[pos >> 3] & (1 << (pos & 7)):
+            return False
+        pos = (value >> 21) % size
+        return data[pos >> 3] & (1 << (pos & 7)) != 0
+
+
+class ArchiveIndex:
+    """Index of archived ids as a sorted uint64 array in a mmap'd file.
+
+    The text archive stays the source of truth. The index file records how
+    many bytes of the text archive it covers, so only lines appended after
+    the last compaction are parsed on startup. New ids are kept in an
+    in-memory delta set and merged into the sorted file once the delta
+    reaches `compact_threshold` ids or on close. An archive rewritten since
+    the last compaction is detected by the checksum of its indexed tail.
+    """
+
+    def __init__(
+        self,
+        archive_path=None,
+        bloom=False,
+        compact_threshold=100000,
+    ):
+        """Open or build the index for the archive.
+
+        Args:
+            archive_path (str, optional): File path of the text archive. The
+                index is stored next to it with `.idx` suffix. Defaults to None
+                (in-memory only).
+            bloom (bool, optional): Keep a Bloom filter in front of the sorted
+                ids, stored with `.bloom` suffix. Defaults to False.
+            compact_threshold (int, optional): Merge the delta into the index
+                file once it holds this many ids. Defaults to 100000.
+        """
+        self.archive_path = archive_path
+        self.index_path = None if archive_path is None else archive_path + ".idx"
+        self.bloom_path = None if archive_path is None else archive_path + ".bloom"
+        self.use_bloom = bloom
+        self.compact_threshold = compact_threshold
+
+        self.delta = set()
+        self.text_offset = 0
+        self._mmap = None
+        self._ids = ()
+        self._fences = []
+        self._bloom = None
+        self._bloom_mmap = None
+
+        if self.archive_path is not None:
+            self._load()
+
+    def __len__(self):
+        """Return number of ids in the index."""
+        return len(self._ids) + len(self.delta)
+
+    def __contains__(self, video_id):
+        """Check if video_id is in the index."""
+        # parse_id inlined, this runs for every URL.
+        try:
+            value = int(video_id)
+        except (TypeError, ValueError):
+            return False
+        if not 0 <= value <= MAX_ID:
+            return False
+        if value in self.delta:
+            return True
+        if self._bloom is not None and value not in self._bloom:
+            return False
+
+        j = bisect.bisect_right(self._fences, value)
+        if j == 0:
+            return False
+        ids = self._ids
+        lo = (j - 1) * FENCE
+        i = bisect.bisect_left(ids, value, lo, min(lo + FENCE, len(ids)))
+        return i < len(ids) and ids[i] == value
+
+    def _load(self):
+        crc = self._map_index()
+
+        if self._mmap is not None and (
+            self.text_offset > self._archive_size()
+            or crc != self._tail_crc(self.text_offset)
+        ):
+            # Archive was rewritten, index no longer matches.
+            self._unmap()
+            self.text_offset = 0
+
+        self._read_tail()
+        if self._mmap is None or (self.use_bloom and self._bloom is None):
+            self.compact()
+
+    def _archive_size(self):
+        try:
+            return os.path.getsize(self.archive_path)
+        except FileNotFoundError:
+            return 0
+
+    def _tail_crc(self, text_offset):
+        """Return CRC32 of the TAIL_SIZE archive bytes before text_offset."""
+        try:
+            with open(self.archive_path, "rb") as f:
+                start = max(0, text_offset - TAIL_SIZE)
+                f.seek(start)
+                return zlib.crc32(f.read(text_offset - start))
+        except FileNotFoundError:
+            return 0
+
+    def _map_index(self):
+        """Map the index file.
+
+        Returns:
+            int: Tail checksum recorded in the header, None if not mapped.
+        """
+        try:
+            f = open(self.index_path, "rb")
+        except FileNotFoundError:
+            return None
+
+        with f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, count, text_offset, crc = HEADER.unpack(header)
+            if magic != MAGIC:
+                return None
+            if os.fstat(f.fileno()).st_size != HEADER.size + count * 8:
+                return None
+
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if LITTLE_ENDIAN:
+            self._ids = memoryview(self._mmap)[HEADER.size :].cast("Q")
+        else:
+            self._ids = array("Q", self._mmap[HEADER.size :])
+            self._ids.byteswap()
+        self._fences = self._ids[::FENCE].tolist()
+        self.text_offset = text_offset
+
+        if self.use_bloom:
+            self._map_bloom()
+        return crc
+
+    def _map_bloom(self):
+        """Map the Bloom filter if it was built for the mapped index.
+
+        A filter of another index has false negatives, it is left unmapped
+        and rebuilt by the next `compact`.
+        """
+        try:
+            with open(self.bloom_path, "rb") as f:
+                header = f.read(BLOOM_HEADER.size)
+                if len(header) != BLOOM_HEADER.size:
+                    return
+                magic, count, text_offset = BLOOM_HEADER.unpack(header)
+                if (magic, count, text_offset) != (
+                    BLOOM_MAGIC,
+                    len(self._ids),
+                    self.text_offset,
+                ):
+                    return
+                self._bloom_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return
+        self._bloom = BloomFilter(
+            0, data=memoryview(self._bloom_mmap)[BLOOM_HEADER.size :]
+        )
+
+    def _unmap(self):
+        if isinstance(self._ids, memoryview):
+            self._ids.release()
+        self._ids = ()
+        self._fences = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._bloom is not None:
+            self._bloom.data.release()
+            self._bloom = None
+        if self._bloom_mmap is not None:
+            self._bloom_mmap.close()
+            self._bloom_mmap = None
+
+    def _read_tail(self):
+        try:
+            f = open(self.archive_path, "rb")
+        except FileNotFoundError:
+            return
+
+        with f:
+            f.seek(self.text_offset)
+            for line in f:
+                value = parse_id(line.strip())
+                if value is not None:
+                    self.delta.add(value)
+
+    def add(self, video_id):
+        """Add video_id to the in-memory delta.
+
+        Args:
+            video_id (str): id of the TikTok Video.
+        """
+        value = parse_id(video_id)
+        if value is None:
+            return
+        self.delta.add(value)
+        if self.archive_path is not None and len(self.delta) >= self.compact_threshold:
+            self.compact()
+
+    def compact(self):
+        """Merge the delta into the sorted index file.
+
+        The text archive must be flushed before calling this, everything in
+        it up to the current size is considered indexed afterwards.
+        """
+        if self.archive_path is None:
+            return
+
+        text_offset = self._archive_size()
+        crc = self._tail_crc(text_offset)
+        tmp_path = self.index_path + ".tmp"
+        count = 0
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, 0, text_offset, crc))
+            buffer = array("Q")
+            last = None
+            for value in heapq.merge(self._ids, sorted(self.delta)):
+                if value == last:
+                    continue
+                last = value
+                buffer.append(value)
+                if len(buffer) >= 65536:
+                    count += len(buffer)
+                    _write_ids(f, buffer)
+                    buffer = array("Q")
+            count += len(buffer)
+            _write_ids(f, buffer)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, count, text_offset, crc))
+
+        self._unmap()
+        if self.use_bloom:
+            self._write_bloom(tmp_path, count, text_offset)
+        os.replace(tmp_path, self.index_path)
+
+        self.delta = set()
+        self._map_index()
+
+    def _write_bloom(self, index_path, count, text_offset):
+        bloom = BloomFilter(max(count, self.compact_threshold))
+        with open(index_path, "rb") as f:
+            f.seek(HEADER.size)
+            while True:
+                chunk = array("Q")
+                try:
+                    chunk.fromfile(f, 65536)
+                except EOFError:
+                    pass
+                if len(chunk) == 0:
+                    break
+                if not LITTLE_ENDIAN:
+                    chunk.byteswap()
+                for value in chunk:
+                    bloom.add(value)
+
+        tmp_path = self.bloom_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOOM_HEADER.pack(BLOOM_MAGIC, count, text_offset))
+            f.write(bloom.data)
+        os.replace(tmp_path, self.bloom_path)
+
+    def close(self):
+        """Merge pending ids and release the mapped files."""
+        if self.delta:
+            self.compact()
+        self._unmap()
@@ -0,0 +1,146 @@
+"""SQLite Archive Manager for tiktok_dl."""
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    user_id TEXT,
+    create_time INTEGER,
+    files TEXT,
+    size INTEGER,
+    status TEXT NOT NULL,
+    recorded_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_user_id ON videos (user_id);
+CREATE INDEX IF NOT EXISTS videos_create_time ON videos (create_time);
+CREATE INDEX IF NOT EXISTS videos_status ON videos (status);
+"""
+
+
+class SQLiteArchiveManager:
+    """Manage SQLite database of downloaded TikTok Videos.
+
+    The database runs in WAL mode so several processes, or hosts sharing
+    the file over a local filesystem, can read and append concurrently.
+    Appends are buffered and written in one transaction per batch.
+    """
+
+    def __init__(self, download_archive, batch_size=100, flush_interval=5):
+        """Initialize SQLite Archive Manager.
+
+        Args:
+            download_archive (str): File path of the database.
+            batch_size (int, optional): Number of records written per transaction. Defaults to 100.
+            flush_interval (int, optional): Maximum seconds a record stays buffered. Defaults to 5.
+        """
+        self.archive_path = download_archive
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enable_archive = True
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.time()
+        self.connection = self._open()
+
+    def _open(self):
+        """Open database and create tables."""
+        connection = sqlite3.connect(
+            self.archive_path,
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _flush(self):
+        if not self.pending:
+            return
+
+        rows = list(self.pending.values())
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO videos "
+                "(video_id, user_id, create_time, files, size, status, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+        self.pending = {}
+        self.last_flush = time.time()
+
+    def recorded(self, video_id: str):
+        """Check if the video_id was downloaded.
+
+        Args:
+            video_id (str): id of the TikTok Video
+
+        Returns:
+            bool: True if exists in archive
+        """
+        with self.lock:
+            row = self.pending.get(video_id)
+            if row is not None:
+                return row[5] == "downloaded"
+            cursor = self.connection.execute(
+                "SELECT 1 FROM videos WHERE video_id = ? AND status = 'downloaded'",
+                (video_id,),
+            )
+            return cursor.fetchone() is not None
+
+    def append(
+        self,
+        video_id: str,
+        user_id=None,
+        create_time=None,
+        files=None,
+        size=None,
+        status="downloaded",
+    ):
+        """Record video_id to the archive.
+
+        Args:
+            video_id (str): id of the TikTok Video
+            user_id (str, optional): id of the author. Defaults to None.
+            create_time (int, optional): Upload time of the video. Defaults to None.
+            files (list, optional): Paths of the written files. Defaults to None.
+            size (int, optional): Total size of the written files. Defaults to None.
+            status (str, optional): Download status. Defaults to "downloaded".
+        """
+        row = (
+            video_id,
+            user_id,
+            create_time,
+            json.dumps(files or [], ensure_ascii=False),
+            size,
+            status,
+            int(time.time()),
+        )
+        with self.lock:
+            self.pending[video_id] = row
+            if (
+                len(self.pending) >= self.batch_size
+                or time.time() - self.last_flush >= self.flush_interval
+            ):
+                self._flush()
+
+    def flush(self):
+        """Write buffered records to the database."""
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        """Close SQLite Archive Manager."""
+        with self.lock:
+            self._flush()
+            self.connection.close()
@@ -0,0 +1,357 @@
+"""asyncio based TikTok Video Downloader"""
+import asyncio
+import os
+import re
+import time
+
+import requests
+
+from tiktok_dl.downloader import Downloader
+from tiktok_dl.downloader import URLExistsInArchive
+from tiktok_dl.next_data import NextDataScanner
+from tiktok_dl.ratelimit import THROTTLE_RETRIES
+from tiktok_dl.utils import match_id
+from tiktok_dl.utils import parse_content_range
+from tiktok_dl.utils import valid_url_re
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+def _size_or_zero(path: str):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+class AsyncDownloader(Downloader):
+    """Downloader for TikTok Videos driven by a single event loop.
+
+    Network I/O runs as coroutines on an `aiohttp` session while file
+    writes are handed to the default executor so they never block the loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Class for handling file downloads with asyncio.
+
+        Accepts the same arguments as `Downloader`.
+
+        Raises:
+            ImportError: If aiohttp is not installed.
+        """
+        if aiohttp is None:
+            raise ImportError("asyncio engine requires aiohttp, pip install aiohttp")
+
+        super().__init__(*args, **kwargs)
+
+    def _create_session(self):
+        # aiohttp session is bound to the event loop, see `download_all`.
+        return None
+
+    def _ssl(self):
+        return False if self.no_check_certificate else None
+
+    async def _run_in_executor(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def _timed(self, stage: str, func, *args):
+        # Timed in the executor, so time waiting for a thread is not counted.
+        with self.metrics.timer(stage):
+            return func(*args)
+
+    async def _get(self, url: str, **kwargs):
+        """Send GET request once `limiter` allows it.
+
+        Throttled requests are retried up to THROTTLE_RETRIES times.
+
+        Returns:
+            aiohttp.ClientResponse: Response, to be used as context manager.
+        """
+        for attempt in range(THROTTLE_RETRIES + 1):
+            await asyncio.sleep(self.limiter.reserve(url))
+            response = await self.session.get(url, ssl=self._ssl(), **kwargs)
+            throttled = self.limiter.feedback(
+                url, response.status, response.headers.get("Retry-After")
+            )
+            if not throttled or attempt == THROTTLE_RETRIES:
+                return response
+            self.metrics.count("throttle_retries")
+            response.release()
+        return response
+
+    async def _download_webpage(
+        self, url: str, video_id: str, note="Downloading webpage"
+    ):
+        self.logger.debug("{} {}", note, video_id)
+        scanner = NextDataScanner()
+        scan = 0.0
+        received = 0
+        with self.metrics.timer("webpage"):
+            async with await self._get(url) as r:
+                async for chunk in r.content.iter_chunked(16384):
+                    received += len(chunk)
+                    started = time.perf_counter()
+                    done = scanner.feed(chunk)
+                    scan += time.perf_counter() - started
+                    if done:
+                        r.close()
+                        break
+        self.metrics.observe("scan", scan)
+        self.metrics.add_bytes("webpage", received)
+
+        if not scanner.done:
+            raise re.error("Unable to extract json_string")
+        return scanner.payload
+
+    async def _fetch_data(self, url: str):
+        video_id = match_id(url, valid_url_re())
+        if self.archive is not None and await self._run_in_executor(
+            self.archive.recorded, video_id
+        ):
+            raise URLExistsInArchive("{} already recorded in archive".format(video_id))
+
+        cached = None
+        if self.page_cache is not None:
+            cached = await self._run_in_executor(self.page_cache.get, video_id)
+        json_string = cached or await self._download_webpage(
+            url, video_id, note="Downloading video webpage"
+        )
+        data = self._parse_next_data(json_string, video_id, url)
+        if self.page_cache is not None and cached is None:
+            await self._run_in_executor(self.page_cache.put, video_id, json_string)
+        return data
+
+    async def _save_json(self, data: dict, dest: str, on_saved=None):
+        await self._run_in_executor(super()._save_json, data, dest, on_saved)
+
+    async def _download_url(self, url: str, dest: str, retry=True):
+        if await self._run_in_executor(os.path.exists, dest):
+            return True
+
+        await self._run_in_executor(self.writer.makedirs, os.path.dirname(dest))
+        part = dest + ".part"
+        offset = await self._run_in_executor(_size_or_zero, part)
+
+        headers = {"Accept-Encoding": "identity"}
+        if offset > 0:
+            headers["Range"] = "bytes={}-".format(offset)
+
+        try:
+            timeout = aiohttp.ClientTimeout(total=160)
+            # Time spent waiting for a throttled host counts as latency.
+            requested = time.monotonic()
+            async with await self._get(
+                url, timeout=timeout, headers=headers
+            ) as response:
+                latency = time.monotonic() - requested
+                if response.status == 416 and offset > 0:
+                    _, _, total = parse_content_range(
+                        response.headers.get("Content-Range")
+                    )
+                    if total == offset:
+                        await self._run_in_executor(self._finish, part, dest)
+                        return True
+                    if retry:
+                        await self._run_in_executor(os.remove, part)
+                        self.metrics.count("range_retries")
+                        return await self._download_url(url, dest, retry=False)
+                response.raise_for_status()
+
+                resume = self._resume_mode(response.status, response.headers, offset)
+                if resume is None:
+                    await self._run_in_executor(os.remove, part)
+                    raise aiohttp.ClientPayloadError(
+                        "Unexpected Content-Range for {}".format(url)
+                    )
+                mode, expected = resume
+
+                etag = response.headers.get("ETag")
+                hasher = None
+                if self.store is not None:
+                    if await self._run_in_executor(
+                        self._link_stored, url, etag, expected, part, dest
+                    ):
+                        return True
+                    if mode == "wb":
+                        hasher = self.store.hasher()
+
+                self.logger.debug("Downloading to {}".format(dest))
+                started = time.monotonic()
+                received = 0
+                handle = await self._run_in_executor(open, part, mode)
+                try:
+                    async for data in response.content.iter_chunked(1048576):
+                        await self._run_in_executor(handle.write, data)
+                        if hasher is not None:
+                            hasher.update(data)
+                        received += len(data)
+                finally:
+                    await self._run_in_executor(handle.close)
+                self.metrics.add_bytes("media", received)
+                self.mirrors.record(
+                    url,
+                    latency=latency,
+                    size=received,
+                    elapsed=time.monotonic() - started,
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.metrics.error(e)
+            # Only ClientResponseError carries a status.
+            self.mirrors.failed(url, getattr(e, "status", None))
+            self.logger.warning("Mirror {} failed for {}: {!r}".format(url, dest, e))
+            return False
+
+        size = await self._run_in_executor(os.path.getsize, part)
+        if expected is not None and size != expected:
+            self.mirrors.failed(url)
+            self.logger.warning(
+                "Incomplete download {}, {} of {} bytes".format(dest, size, expected)
+            )
+            return False
+        if size == 0:
+            await self._run_in_executor(os.remove, part)
+            return False
+
+        # Resumed downloads are hashed from disk.
+        digest = None if hasher is None else hasher.hexdigest()
+        await self._run_in_executor(
+            lambda: self._finish(
+                part, dest, digest=digest, url=url, etag=etag, size=size
+            )
+        )
+        return True
+
+    async def _download_mirrors(self, urls, dest: str):
+        if await self._run_in_executor(os.path.exists, dest):
+            return True
+        if not urls:
+            return False
+
+        urls = self.mirrors.order(urls)
+        for i, url in enumerate(urls):
+            if i > 0:
+                self.metrics.count("mirror_retries")
+            with self.metrics.timer("download_url"):
+                if await self._download_url(url, dest):
+                    return True
+
+        self.logger.error("Unable to download {} from {} mirrors", dest, len(urls))
+        return False
+
+    async def _download_media(self, video_data: dict, filepath: str):
+        await asyncio.gather(
+            self._download_mirrors(
+                video_data.get("play_urls") or [],
+                self._expand_path(filepath + ".mp4"),
+            ),
+            self._download_mirrors(
+                video_data.get("thumbnails") or [],
+                self._expand_path(filepath + ".jpg"),
+            ),
+        )
+
+    async def download(self, url: str):
+        try:
+            data = await self._fetch_data(url)
+            await self._run_in_executor(
+                self._timed, "validate", self.validator.validate, data.get("video_data")
+            )
+            if self.json_output is not None:
+                await self._run_in_executor(
+                    self.json_output.write, data.get("video_data")
+                )
+            self.metrics.count("videos_extracted")
+            if self.metadata_only:
+                return
+            filepath = await self._run_in_executor(
+                self._timed,
+                "output_format",
+                self._output_format,
+                data.get("video_data"),
+            )
+            if not self.skip_download:
+                await self._download_media(data.get("video_data"), filepath)
+            await self._run_in_executor(
+                self._save_description,
+                data.get("video_data"),
+                self._expand_path(filepath + ".description"),
+            )
+            await self._save_json(
+                data,
+                self._expand_path(filepath + ".json"),
+                on_saved=lambda: self._record(data.get("video_data"), filepath),
+            )
+        except URLExistsInArchive as e:
+            self.metrics.count("videos_archived")
+            self.logger.debug(e)
+        except requests.exceptions.InvalidURL as e:
+            self.metrics.error(e)
+            self.logger.error(e)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.metrics.error(e)
+            self.logger.error(e)
+        except re.error as e:
+            self.metrics.error(e)
+            self.logger.error(e)
+        except FileNotFoundError as e:
+            self.metrics.error(e)
+            self.logger.warning(e)
+        except Exception as e:
+            self.metrics.error(e)
+            self.logger.error("{}: {!r}", url, e)
+
+    async def download_all(self, urls, concurrent_count=1):
+        """Download all urls keeping at most `concurrent_count` in flight.
+
+        Args:
+            urls (iterable): URLs of TikTok Videos, consumed lazily in the
+                default executor as it may read a file or the network.
+            concurrent_count (int, optional): Maximum number of concurrent
+                downloads. Defaults to 1.
+        """
+        slots = asyncio.Semaphore(max(1, concurrent_count))
+        tasks = set()
+
+        async def worker(url):
+            try:
+                await self.download(url)
+            finally:
+                slots.release()
+
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.pool_size)
+        # trust_env: honour HTTP(S)_PROXY and NO_PROXY like requests does.
+        async with aiohttp.ClientSession(
+            headers=self.headers, connector=connector, trust_env=True
+        ) as session:
+            self.session = session
+            urls = iter(urls)
+            try:
+                while True:
+                    await slots.acquire()
+                    url = await self._run_in_executor(next, urls, None)
+                    if url is None:
+                        slots.release()
+                        break
+                    task = asyncio.ensure_future(worker(url))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                self.session = None
+
+    def run(self, urls, concurrent_count=1):
+        """Download all urls on a new event loop.
+
+        Args:
+            urls (iterable): URLs of TikTok Videos.
+            concurrent_count (int, optional): Maximum number of concurrent
+                downloads. Defaults to 1.
+        """
+        asyncio.run(self.download_all(urls, concurrent_count=concurrent_count))
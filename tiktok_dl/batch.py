@@ -0,0 +1,48 @@
+"""Lazy reading of URLs from the command-line and batch files."""
+import itertools
+import sys
+
+COMMENT_PREFIXES = ("#", ";", "]")
+
+
+def iter_urls(lines):
+    """Yield stripped URLs, skipping blank and comment lines.
+
+    Args:
+        lines (iterable): Lines of a batch file or command-line URLs.
+    """
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith(COMMENT_PREFIXES):
+            yield url
+
+
+def read_batch_file(batch_file: str):
+    """Yield URLs from batch file one line at a time.
+
+    Args:
+        batch_file (str): Path of the batch file, '-' for stdin.
+    """
+    if batch_file == "-":
+        yield from iter_urls(sys.stdin)
+        return
+
+    with open(batch_file, "r", encoding="utf-8-sig", errors="replace") as f:
+        yield from iter_urls(f)
+
+
+def input_urls(urls, batch_file=None):
+    """Chain URLs given on the command-line and the batch file lazily.
+
+    Args:
+        urls (list): URLs given on the command-line.
+        batch_file (str, optional): Path of the batch file, '-' for stdin.
+            Defaults to None.
+
+    Returns:
+        iterator: URLs, the batch file is read as they are consumed.
+    """
+    sources = [iter_urls(urls)]
+    if batch_file is not None:
+        sources.append(read_batch_file(batch_file))
+    return itertools.chain.from_iterable(sources)
@@ -2,10 +2,45 @@
 import os
 import sys
 
-from loguru import logger
-
 from tiktok_dl.options import options_parser
-from tiktok_dl.tiktok_dl import TikTokDownloader
+from tiktok_dl.template import OutputTemplate
+
+
+def reextract(args):
+    """Extract all pages of the page cache offline."""
+    from tiktok_dl.logger import Logger
+    from tiktok_dl.reextract import reextract
+
+    if args.metadata_sink is not None:
+        from tiktok_dl.metadata import MetadataSink
+
+        output = MetadataSink(args.metadata_sink, compression=args.metadata_compression)
+        emit = output.write
+    else:
+        from tiktok_dl.output import JSONLinesWriter
+
+        output = JSONLinesWriter()
+
+        def emit(video_id, record):
+            output.write(record)
+
+    try:
+        stats = reextract(
+            args.page_cache,
+            emit,
+            processes=args.concurrent_count if args.concurrent_count > 1 else None,
+            validate=args.validate,
+            ttl=args.page_cache_ttl,
+            full=args.metadata_sink is not None,
+        )
+    finally:
+        output.close()
+
+    logger = Logger(
+        no_warnings=args.no_warnings, quiet=args.quiet, verbose=args.verbose
+    )
+    logger.info("Extracted {} videos, {} failed", stats["extracted"], stats["failed"])
+    return 0
 
 
 def main():
@@ -13,22 +48,46 @@ def main():
     parser = options_parser()
     args = parser.parse_args()
 
-    if len(args.urls) == 0 and args.batch_file is None:
+    if args.reextract:
+        if args.page_cache is None:
+            parser.error("--reextract requires --page-cache.")
+        if not os.path.isfile(args.page_cache):
+            parser.error("Page cache {} does not exist.".format(args.page_cache))
+        return reextract(args)
+
+    if len(args.urls) == 0 and args.batch_file is None and not args.daemon:
         parser.error("URL or file containing list of URLs (--batch-file) is required.")
 
-    if args.batch_file is not None and os.path.isfile(args.batch_file):
-        with open(args.batch_file, "r") as f:
-            for url in f.read().split("\n"):
-                if len(url.strip()) > 0:
-                    args.urls.append(url.strip())
+    if args.daemon and args.engine != "threads":
+        parser.error("--daemon only supports --engine threads.")
+
+    from tiktok_dl.extractors.extractor import EXTRACTORS
 
-    logger.info("Downloading {} urls", len(args.urls))
+    try:
+        template = OutputTemplate(args.output_template)
+        for extractor in EXTRACTORS.values():
+            template.check(extractor.sample())
+    except ValueError as e:
+        parser.error("Invalid --output-template: {}".format(e))
+
+    if args.batch_file not in (None, "-") and not os.path.isfile(args.batch_file):
+        parser.error("Batch file {} does not exist.".format(args.batch_file))
+
+    # Imported after parsing so that --help and --version stay fast.
+    from tiktok_dl.tiktok_dl import TikTokDownloader
 
     tiktok = TikTokDownloader(args)
-    tiktok.process_urls()
+    if args.daemon:
+        from tiktok_dl.daemon import run_daemon
+
+        run_daemon(tiktok, host=args.daemon_host, port=args.daemon_port)
+        return 0
+
+    try:
+        tiktok.process_urls()
+    except KeyboardInterrupt:
+        return 130
 
-    print("Arguments: " + str(args))
-    print("Replace this message by putting your code into " "tiktok_dl.cli.main")
     return 0
 
 
@@ -0,0 +1,278 @@
+"""Daemon mode for tiktok_dl with HTTP API for job submission."""
+import asyncio
+import inspect
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from tiktok_dl.preflight import Preflight
+from tiktok_dl.worker import WorkerPool
+
+# Seconds running downloads get to stop on shutdown before the downloader
+# is closed under them.
+STOP_TIMEOUT = 30
+
+# Finished Jobs kept for status requests, older ones are forgotten.
+MAX_JOBS = 1000
+
+
+class Job:
+    """Batch of URLs submitted to the daemon."""
+
+    def __init__(self, job_id: int):
+        """Initialize Job.
+
+        Args:
+            job_id (int): id of the Job.
+        """
+        self.id = job_id
+        self.total = 0
+        self.queued = 0
+        self.skipped = 0
+        self.done = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.submitting = True
+
+    @property
+    def status(self):
+        """Return status of the Job."""
+        if self.finished_at is not None:
+            return "finished"
+        if self.started_at is not None:
+            return "running"
+        return "queued"
+
+    def to_dict(self):
+        """Return JSON serializable summary of the Job."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "queued": self.queued,
+            "skipped": self.skipped,
+            "done": self.done,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """Run submitted Jobs on a long lived worker pool.
+
+    The TikTokDownloader passed in keeps its HTTP session, validator and
+    archive open for the lifetime of the daemon.
+    """
+
+    def __init__(self, tiktok, max_jobs=MAX_JOBS):
+        """Initialize Job Manager and start the feeder thread.
+
+        Args:
+            tiktok (TikTokDownloader): Downloader used for all Jobs.
+            max_jobs (int, optional): Jobs kept for status requests, the
+                oldest finished Jobs are forgotten. Defaults to MAX_JOBS.
+        """
+        self.tiktok = tiktok
+        self.logger = tiktok.logger
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.started_at = time.time()
+        self.submitted = 0
+        self.completed = 0
+        self.pending = 0
+
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pool = WorkerPool(
+            self._download,
+            logger=self.logger,
+            concurrent_count=tiktok.options.concurrent_count,
+        )
+        self._feeder = threading.Thread(target=self._feed, daemon=True)
+        self._feeder.start()
+
+    def _feed(self):
+        # Submitting blocks while the pool is full, keep it off the event loop.
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._pool.submit(item)
+
+    def _download(self, item):
+        job, url = item
+        with self._lock:
+            if job.started_at is None:
+                job.started_at = time.time()
+        try:
+            self.tiktok.download(url)
+        finally:
+            with self._lock:
+                job.done += 1
+                self.completed += 1
+                self.pending -= 1
+                self._finish(job)
+
+    def _finish(self, job):
+        # Called with the lock held.
+        if not job.submitting and job.done == job.queued:
+            job.finished_at = time.time()
+
+    def _add(self, job):
+        # Called with the lock held. Running Jobs are never forgotten.
+        self.jobs[job.id] = job
+        self.submitted += 1
+        excess = len(self.jobs) - self.max_jobs
+        if excess > 0:
+            finished = [j.id for j in self.jobs.values() if j.finished_at is not None]
+            for job_id in finished[:excess]:
+                del self.jobs[job_id]
+
+    def submit(self, urls):
+        """Queue URLs as a new Job.
+
+        URLs are read and queued one at a time, downloads of the first
+        URLs start while the rest are still read.
+
+        Args:
+            urls (iterable): TikTok Video URLs.
+
+        Returns:
+            Job: The queued Job.
+        """
+        job = Job(next(self._ids))
+        preflight = Preflight(self.tiktok.archive, self.logger)
+        with self._lock:
+            self._add(job)
+
+        for url in urls:
+            job.total += 1
+            url = preflight.check(url)
+            if url is None:
+                continue
+            with self._lock:
+                job.queued += 1
+                self.pending += 1
+            self._queue.put((job, url))
+
+        with self._lock:
+            job.skipped = job.total - job.queued
+            job.submitting = False
+            self._finish(job)
+        return job
+
+    def stats(self):
+        """Return throughput statistics of the daemon."""
+        uptime = time.time() - self.started_at
+        with self._lock:
+            return {
+                "uptime": uptime,
+                "jobs": self.submitted,
+                "completed": self.completed,
+                "pending": self.pending,
+                "urls_per_second": self.completed / uptime if uptime > 0 else 0.0,
+            }
+
+    def close(self):
+        """Stop the worker pool and wait for aborted downloads to return.
+
+        Running downloads get up to STOP_TIMEOUT seconds, so that the
+        downloader and archive can be closed afterwards.
+        """
+        self._queue.put(None)
+        self.tiktok.abort()
+        self._pool.stop()
+        if not self._pool.join(timeout=STOP_TIMEOUT):
+            self.logger.warning("Downloads still running, closing anyway")
+
+
+def create_app(manager):
+    """Create Sanic application exposing the Job Manager.
+
+    Routes:
+        POST /jobs: Submit `{"urls": [...]}` or `{"url": "..."}`.
+        GET /jobs/<job_id>: Status of a Job.
+        GET /stats: Throughput statistics.
+        GET /metrics: Stage timings and counters in Prometheus text format.
+
+    Args:
+        manager (JobManager): Job Manager instance.
+
+    Returns:
+        Sanic: Sanic application.
+    """
+    from sanic import Sanic
+    from sanic.response import json
+    from sanic.response import text
+
+    app = Sanic("tiktok_dl")
+
+    @app.route("/jobs", methods=["POST"])
+    async def submit_job(request):
+        body = request.json or {}
+        if not isinstance(body, dict):
+            return json({"error": "body must be a JSON object"}, status=400)
+        urls = body.get("urls") or []
+        if not isinstance(urls, list):
+            return json({"error": "urls must be a list"}, status=400)
+        if body.get("url"):
+            urls = urls + [body.get("url")]
+        if len(urls) == 0:
+            return json({"error": "url or urls is required"}, status=400)
+        # Preflight and archive lookups block, keep them off the event loop.
+        loop = asyncio.get_event_loop()
+        job = await loop.run_in_executor(None, manager.submit, urls)
+        return json(job.to_dict(), status=202)
+
+    @app.route("/jobs/<job_id:int>", methods=["GET"])
+    async def job_status(request, job_id):
+        job = manager.jobs.get(job_id)
+        if job is None:
+            return json({"error": "job not found"}, status=404)
+        return json(job.to_dict())
+
+    @app.route("/stats", methods=["GET"])
+    async def stats(request):
+        return json(manager.stats())
+
+    @app.route("/metrics", methods=["GET"])
+    async def metrics(request):
+        return text(
+            manager.tiktok.metrics.prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    return app
+
+
+def run_daemon(tiktok, host="127.0.0.1", port=8000):
+    """Run daemon until interrupted.
+
+    URLs given on the command-line and in the batch file are submitted as the
+    first Job.
+
+    Args:
+        tiktok (TikTokDownloader): Downloader used for all Jobs.
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8000.
+    """
+    manager = JobManager(tiktok)
+    urls = tiktok.input_urls()
+    first = next(urls, None)
+    if first is not None:
+        manager.submit(itertools.chain([first], urls))
+
+    app = create_app(manager)
+    kwargs = {"host": host, "port": port, "access_log": False}
+    if "single_process" in inspect.signature(app.run).parameters:
+        kwargs["single_process"] = True
+    try:
+        app.run(**kwargs)
+    finally:
+        manager.close()
+        tiktok.close()
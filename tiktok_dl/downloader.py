@@ -2,16 +2,34 @@
 import json
 import os
 import re
+import threading
 import time
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import urllib3
 
-from tiktok_dl.utils import format_utctime
+from tiktok_dl.metadata import MetadataSink
+from tiktok_dl.metrics import Metrics
+from tiktok_dl.mirrors import MirrorSelector
+from tiktok_dl.next_data import NextDataScanner
+from tiktok_dl.next_data import video_record
+from tiktok_dl.output import JSONLinesWriter
+from tiktok_dl.ratelimit import RateLimitedAdapter
+from tiktok_dl.ratelimit import RateLimiter
+from tiktok_dl.segmented import SegmentedDownload
+from tiktok_dl.store import ContentStore
+from tiktok_dl.template import OutputTemplate
+from tiktok_dl.utils import int_or_none
 from tiktok_dl.utils import match_id
-from tiktok_dl.utils import search_regex
+from tiktok_dl.utils import parse_content_range
 from tiktok_dl.utils import try_get
 from tiktok_dl.utils import valid_url_re
+from tiktok_dl.writer import FileWriter
+
+# Hosts of the webpages, paced by `sleep_interval` unlike the CDN.
+WEBPAGE_HOSTS = ("tiktok.com",)
 
 
 class URLExistsInArchive(Exception):
@@ -24,6 +42,12 @@ class URLExistsInArchive(Exception):
     pass
 
 
+def _status_code(error):
+    """Return HTTP status of a failed request, None without response."""
+    response = getattr(error, "response", None)
+    return None if response is None else response.status_code
+
+
 class Downloader:
     """Downloader for TikTok Videos."""
 
@@ -32,14 +56,26 @@ class Downloader:
         validator,
         extractor,
         logger,
+        archive=None,
+        content_store=None,
+        content_store_link="hardlink",
         directory_prefix=None,
         dump_json=False,
+        fsync=False,
         max_sleep_interval=0,
-        no_check_certificate=True,
+        metadata_compression="gzip",
+        metadata_sink=None,
+        metrics=None,
+        no_check_certificate=False,
         no_overwrite=False,
         no_write_json=False,
         output_template="{Y}-{d}-{m}_{H}-{M}-{S} {id}_{user_id}",
+        page_cache=None,
+        pool_size=10,
         print_json=False,
+        race_mirrors=0,
+        segment_min_size=8388608,
+        segments=1,
         simulate=False,
         skip_download=False,
         sleep_interval=0.2,
@@ -52,28 +88,48 @@ class Downloader:
             validator: Instance of AwemeValidator class.
             extractor: Instance of Extractor class.
             self.logger: Instance of self.logger class.
+            archive (optional): Archive Manager recording downloaded videos. Defaults to None.
+            content_store (str, optional): Directory of the content-addressed store media is deduplicated in. Defaults to None.
+            content_store_link (str, optional): How stored media is linked into the output paths, "hardlink" or "copy". Defaults to "hardlink".
             directory_prefix (str, optional): Working directory for Downloader. Defaults to None.
-            dump_json (bool, optional): Dump TikTok Video JSON and exit. Defaults to False.
-            max_sleep_interval (int, optional): Maximum amount of seconds to sleep between downloads. Defaults to 0 (no sleeping).
+            dump_json (bool, optional): Print TikTok Video JSON to stdout, do not download or write anything. Defaults to False.
+            fsync (bool, optional): Sync written files to disk in batches per directory. Defaults to False.
+            max_sleep_interval (int, optional): Largest seconds between requests to a host that throttles us. Defaults to 0 (60 seconds).
+            metadata_compression (str, optional): Compression of metadata_sink shards, "gzip" or "zstd". Defaults to "gzip".
+            metadata_sink (str, optional): Directory of compressed JSON Lines shards metadata is appended to instead of writing `.json` files. Defaults to None.
+            metrics (optional): Metrics recording stage timings, bytes, retries and errors. Defaults to a new Metrics.
             no_check_certificate (bool, optional): Do not validate server ssl certificates. Defaults to False.
             no_overwrite (bool, optional): Do not overwrite any file. Defaults to False.
             no_write_json (bool, optional): Do not create `.info.json` file. Defaults to False.
             output_template (str, optional): Output file template. Defaults to "{Y}-{d}-{m}_{H}-{M}-{S} {id}_{user_id}".
-            print_json (bool, optional): Pretty print JSON when used with dump_json. Defaults to False.
+            page_cache (optional): PageCache of __NEXT_DATA__ payloads to read webpages from and store them in. Defaults to None.
+            pool_size (int, optional): Number of keep-alive connections kept per host. Defaults to 10.
+            print_json (bool, optional): Print TikTok Video JSON to stdout while downloading. Defaults to False.
+            race_mirrors (int, optional): Number of mirrors raced for the first byte, 0 or 1 disables racing. Defaults to 0.
+            segment_min_size (int, optional): Minimum video size in bytes for segmented download. Defaults to 8 MiB.
+            segments (int, optional): Number of parallel connections per video, 1 disables segmented download. Defaults to 1.
             simulate (bool, optional): Simulate only do not write and download anything. Defaults to False.
             skip_download (bool, optional): Do not download any media. Defaults to False.
-            sleep_interval (float, optional): Number of seconds to sleep between each requests. Defaults to 0.2.
+            sleep_interval (float, optional): Initial seconds between requests to a host, adapted to its responses. Defaults to 0.2.
             write_description (bool, optional): Create seperate .description file for description. Defaults to False.
             write_thumbnail (bool, optional): Download Video Thumbnail. Defaults to True.
         """
         self.directory_prefix = directory_prefix
         self.dump_json = dump_json
+        self.fsync = fsync
         self.max_sleep_interval = max_sleep_interval
+        self.metadata_compression = metadata_compression
+        self.metadata_sink = metadata_sink
         self.no_check_certificate = no_check_certificate
         self.no_overwrite = no_overwrite
         self.no_write_json = no_write_json
         self.output_template = output_template
+        self.output = OutputTemplate(output_template)
+        self.pool_size = pool_size
         self.print_json = print_json
+        self.race_mirrors = race_mirrors
+        self.segment_min_size = segment_min_size
+        self.segments = segments
         self.simulate = simulate
         self.skip_download = skip_download
         self.sleep_interval = sleep_interval
@@ -83,6 +139,22 @@ class Downloader:
         self.validator = validator
         self.extractor = extractor
         self.logger = logger
+        self.archive = archive
+        self.page_cache = page_cache
+        self.metrics = Metrics() if metrics is None else metrics
+        # Metadata-only modes write no files, see `metadata_only`.
+        self.store = None
+        if content_store is not None and not self.metadata_only:
+            self.store = ContentStore(content_store, link_mode=content_store_link)
+        self.writer = FileWriter(no_overwrite=self.no_overwrite, fsync=self.fsync)
+        self.json_output = None
+        if self.dump_json or self.print_json:
+            self.json_output = JSONLinesWriter()
+        self.sink = None
+        if metadata_sink is not None and not self.metadata_only:
+            self.sink = MetadataSink(
+                metadata_sink, compression=metadata_compression, fsync=fsync
+            )
 
         self.headers = {
             "user-agent": (
@@ -92,10 +164,51 @@ class Downloader:
             )
         }
         self.reaponse_ok = requests.codes.get("ok")
+        self.limiter = RateLimiter(
+            sleep_interval=self.sleep_interval,
+            max_sleep_interval=self.max_sleep_interval,
+            hosts=WEBPAGE_HOSTS,
+        )
+        self.mirrors = MirrorSelector()
+        self.session = self._create_session()
+        self.aborted = threading.Event()
+        # Runs mirror probes and segments of all downloads.
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(self.pool_size, self.segments, self.race_mirrors, 1)
+        )
+        self.segmented = SegmentedDownload(
+            self.session,
+            self.logger,
+            self.aborted,
+            self.executor,
+            segments=self.segments,
+            min_size=self.segment_min_size,
+        )
 
         if self.no_check_certificate:
             urllib3.disable_warnings()
 
+    def _create_session(self):
+        """Create HTTP session shared by all requests of this Downloader.
+
+        Connections to the webpage host and the CDN hosts are kept alive
+        and reused, with at most `pool_size` idle connections per host.
+        Every request waits for `limiter`, throttled requests are retried.
+        """
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.verify = not self.no_check_certificate
+
+        adapter = RateLimitedAdapter(
+            self.limiter,
+            metrics=self.metrics,
+            pool_connections=32,
+            pool_maxsize=self.pool_size,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
     def _parse_json(self, json_string: str, video_id: str, fatal=True):
         try:
             return json.loads(json_string)
@@ -107,23 +220,53 @@ class Downloader:
                 self.logger.error(errmsg + str(ve))
 
     def _download_webpage(self, url: str, video_id: str, note="Downloading webpage"):
+        """Stream webpage until the __NEXT_DATA__ script is complete.
+
+        The connection is closed as soon as the closing tag was received.
+
+        Returns:
+            str: JSON string of the __NEXT_DATA__ script.
+        """
         self.logger.debug("{} {}", note, video_id)
-        r = requests.get(url, verify=self.no_check_certificate, headers=self.headers)
-        return r.text
+        scanner = NextDataScanner()
+        scan = 0.0
+        received = 0
+        with self.metrics.timer("webpage"):
+            with self.session.get(url, stream=True) as r:
+                for chunk in r.iter_content(chunk_size=16384):
+                    received += len(chunk)
+                    started = time.perf_counter()
+                    done = scanner.feed(chunk)
+                    scan += time.perf_counter() - started
+                    if done:
+                        break
+        self.metrics.observe("scan", scan)
+        self.metrics.add_bytes("webpage", received)
+
+        if not scanner.done:
+            raise re.error("Unable to extract json_string")
+        return scanner.payload
 
     def _fetch_data(self, url: str):
-        video_id = match_id(url, valid_url_re)
-
-        webpage = self._download_webpage(
+        video_id = match_id(url, valid_url_re())
+        if self.archive is not None and self.archive.recorded(video_id):
+            raise URLExistsInArchive("{} already recorded in archive".format(video_id))
+
+        cached = None
+        if self.page_cache is not None:
+            cached = self.page_cache.get(video_id)
+        json_string = cached or self._download_webpage(
             url, video_id, note="Downloading video webpage"
         )
-        json_string = search_regex(
-            r"id=\"__NEXT_DATA__\"\s+type=\"application\/json\"\s*[^>]+>\s*(?P<json_string_id>[^<]+)",
-            webpage,
-            "json_string",
-            group="json_string_id",
-        )
-        json_data = self._parse_json(json_string, video_id)
+        data = self._parse_next_data(json_string, video_id, url)
+        # Only pages of available videos are cached.
+        if self.page_cache is not None and cached is None:
+            self.page_cache.put(video_id, json_string)
+        return data
+
+    def _parse_next_data(self, json_string: str, video_id: str, url: str):
+        with self.metrics.timer("parse_json"):
+            json_data = self._parse_json(json_string, video_id)
         aweme_data = try_get(
             json_data, lambda x: x["props"]["pageProps"], expected_type=dict
         )
@@ -131,14 +274,12 @@ class Downloader:
         if aweme_data.get("statusCode") != 0:
             raise FileNotFoundError("Video not available " + video_id)
 
-        extract_version, extract_data = self.extractor.extract(json_data=aweme_data)
+        with self.metrics.timer("extract"):
+            extract_version, extract_data = self.extractor.extract(json_data=aweme_data)
 
-        return {
-            "video_data": extract_data,
-            "aweme_data": aweme_data,
-            "tiktok-dl": extract_version,
-            "timestamp": int(time.time()),
-        }
+        return video_record(
+            url, extract_data, aweme_data, extract_version, int(time.time())
+        )
 
     def _expand_path(self, path):
         if self.directory_prefix is None:
@@ -146,78 +287,373 @@ class Downloader:
         return os.path.join(self.directory_prefix, path)
 
     def _output_format(self, json_data: dict):
-        def enhance_json_data(json_data):
-            data = dict(json_data)
-            timestamp = data.get("create_time")
-            data["Y"] = format_utctime(time=timestamp, fmt="%Y")
-            data["m"] = format_utctime(time=timestamp, fmt="%m")
-            data["d"] = format_utctime(time=timestamp, fmt="%d")
-            data["H"] = format_utctime(time=timestamp, fmt="%H")
-            data["M"] = format_utctime(time=timestamp, fmt="%M")
-            data["S"] = format_utctime(time=timestamp, fmt="%S")
-            return data
-
-        enhanced = enhance_json_data(json_data)
-        return self.output_template.format(**enhanced)
-
-    def _save_json(self, data: dict, dest: str):
-        if not os.path.exists(os.path.dirname(dest)):
-            os.makedirs(os.path.dirname(dest))
-
-        with open(dest, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False)
-
-    def _download_url(self, url: str, dest: str):
-        if not os.path.exists(os.path.dirname(dest)):
-            os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return self.output.render(json_data)
+
+    def _save_json(self, data: dict, dest: str, on_saved=None):
+        """Write data to dest or the metadata sink, then call on_saved.
+
+        Records of the metadata sink are buffered, on_saved runs once
+        their block was written.
+        """
+        if self.sink is not None:
+            self.sink.write(data["video_data"]["id"], data, on_written=on_saved)
+            return
+        self.writer.write_json(dest, data)
+        if on_saved is not None:
+            on_saved()
+
+    def _save_description(self, video_data: dict, dest: str):
+        if self.write_description:
+            self.writer.write_text(dest, video_data.get("description") or "")
+
+    def _resume_mode(self, status: int, headers, offset: int):
+        """Return file mode and expected final size for a media response.
+
+        Args:
+            status (int): HTTP status of the media response.
+            headers (dict): Headers of the media response.
+            offset (int): Size of the existing `.part` file.
+
+        Returns:
+            tuple: ("ab" or "wb", expected size or None), None if the
+                server answered with an unexpected range.
+        """
+        length = int_or_none(headers.get("Content-Length"))
+        if status != 206:
+            return ("wb", length)
+
+        start, _, total = parse_content_range(headers.get("Content-Range"))
+        if start != offset:
+            return None
+        if total is None and length is not None:
+            total = offset + length
+        return ("ab", total)
+
+    def _finish(
+        self, part: str, dest: str, digest=None, url=None, etag=None, size=None
+    ):
+        """Move completed part to dest, through the content store if enabled."""
+        if self.store is None:
+            self.writer.replace(part, dest)
+        else:
+            self.store.put(part, dest, digest=digest, url=url, etag=etag, size=size)
+            self.writer.written(dest)
+
+    def _link_stored(self, url: str, etag, size, part: str, dest: str):
+        """Link a known blob of url to dest instead of downloading it again.
+
+        Returns:
+            bool: True if dest was linked.
+        """
+        blob = self.store.lookup(url, etag, size)
+        if blob is None:
+            return False
+        self.logger.debug("{} found in content store", dest)
+        self.store.link(blob, dest)
+        if os.path.exists(part):
+            os.remove(part)
+        return True
+
+    def _download_url(self, url: str, dest: str, retry=True, segmented=False):
+        """Download url to dest.
+
+        Data is written to `dest.part` which is renamed to dest once its size
+        matches Content-Length. An existing `.part` file is resumed with a
+        Range request when the server supports it.
+
+        With `segmented` and `segments` > 1 a new download is first tried
+        with `SegmentedDownload`, falling back to a single stream.
+
+        With a content store the data is hashed while streaming, and a
+        response whose ETag and size are known is linked without reading
+        its body.
+
+        Returns:
+            bool: True if dest was downloaded.
+        """
+        if os.path.exists(dest):
+            return True
 
+        self.writer.makedirs(os.path.dirname(dest))
+        part = dest + ".part"
         try:
-            if os.path.getsize(dest) == 0:
-                os.remove(dest)
+            offset = os.path.getsize(part)
         except FileNotFoundError:
-            pass
+            offset = 0
+
+        if segmented and self.segments > 1 and offset == 0:
+            if self.segmented.download(url, dest):
+                self.metrics.add_bytes("media", os.path.getsize(dest))
+                if self.store is not None:
+                    self.store.put(dest, dest)
+                self.writer.written(dest)
+                return True
+            if self.aborted.is_set():
+                return False
+
+        headers = {"Accept-Encoding": "identity"}
+        if offset > 0:
+            headers["Range"] = "bytes={}-".format(offset)
 
         try:
-            with open(dest, "xb") as handle:
-                response = requests.get(url, stream=True, timeout=160)
-                if response.status_code != self.reaponse_ok:
+            with self.session.get(
+                url, stream=True, timeout=160, headers=headers
+            ) as response:
+                if response.status_code == 416 and offset > 0:
+                    _, _, total = parse_content_range(
+                        response.headers.get("Content-Range")
+                    )
+                    if total == offset:
+                        self._finish(part, dest)
+                        return True
+                if response.status_code >= 400:
                     response.raise_for_status()
 
+                resume = self._resume_mode(
+                    response.status_code, response.headers, offset
+                )
+                if resume is None:
+                    os.remove(part)
+                    raise requests.exceptions.ContentDecodingError(
+                        "Unexpected Content-Range for {}".format(url)
+                    )
+                mode, expected = resume
+
+                etag = response.headers.get("ETag")
+                hasher = None
+                if self.store is not None:
+                    if self._link_stored(url, etag, expected, part, dest):
+                        return True
+                    hasher = self.store.hasher()
+                    if mode == "ab":
+                        with open(part, "rb") as handle:
+                            for data in iter(lambda: handle.read(1048576), b""):
+                                hasher.update(data)
+
                 self.logger.debug("Downloading to {}".format(dest))
-                for data in response.iter_content(chunk_size=4194304):
-                    handle.write(data)
-                handle.close()
-        except FileExistsError:
-            pass
-        except requests.exceptions.RequestException:
-            self.logger.error("File {} not found on Server {}".format(dest, url))
-            pass
+                started = time.monotonic()
+                received = 0
+                with open(part, mode) as handle:
+                    for data in response.iter_content(chunk_size=4194304):
+                        if self.aborted.is_set():
+                            return False
+                        handle.write(data)
+                        if hasher is not None:
+                            hasher.update(data)
+                        received += len(data)
+                self.metrics.add_bytes("media", received)
+                self.mirrors.record(
+                    url,
+                    latency=response.elapsed.total_seconds(),
+                    size=received,
+                    elapsed=time.monotonic() - started,
+                )
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 416 and offset > 0 and retry:
+                os.remove(part)
+                self.metrics.count("range_retries")
+                return self._download_url(url, dest, retry=False)
+            self.metrics.error(e)
+            self.mirrors.failed(url, e.response.status_code)
+            self.logger.warning("Mirror {} failed for {}: {}".format(url, dest, e))
+            return False
+        except requests.exceptions.RequestException as e:
+            self.metrics.error(e)
+            self.mirrors.failed(url)
+            self.logger.warning("Mirror {} failed for {}: {}".format(url, dest, e))
+            return False
+
+        size = os.path.getsize(part)
+        if expected is not None and size != expected:
+            self.mirrors.failed(url)
+            self.logger.warning(
+                "Incomplete download {}, {} of {} bytes".format(dest, size, expected)
+            )
+            return False
+        if size == 0:
+            os.remove(part)
+            return False
+
+        digest = None if hasher is None else hasher.hexdigest()
+        self._finish(part, dest, digest=digest, url=url, etag=etag, size=size)
+        return True
+
+    def _race(self, urls):
+        """Race the first byte of up to `race_mirrors` urls.
+
+        Losing probes keep running in the background to update mirror stats.
+
+        Returns:
+            list: urls with the first mirror to answer moved to the front.
+        """
+        candidates = urls[: self.race_mirrors]
+        if len(candidates) < 2:
+            return urls
+
+        def probe(url):
+            started = time.monotonic()
+            with self.session.get(
+                url,
+                stream=True,
+                timeout=30,
+                headers={"Range": "bytes=0-0", "Accept-Encoding": "identity"},
+            ) as response:
+                response.raise_for_status()
+                next(response.iter_content(chunk_size=1), b"")
+            self.mirrors.record(url, latency=time.monotonic() - started)
+            return url
+
+        futures = {self.executor.submit(probe, url): url for url in candidates}
+        winner = None
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is None:
+                winner = future.result()
+                break
+            self.mirrors.failed(futures[future], _status_code(error))
+
+        if winner is None:
+            return urls
+        return [winner] + [url for url in urls if url != winner]
+
+    def _download_mirrors(self, urls, dest: str, segmented=False):
+        """Download dest from the best of urls, failing over to the others.
+
+        Args:
+            urls (list): Mirror URLs of the same file.
+            dest (str): Destination path.
+            segmented (bool, optional): Allow segmented download. Defaults to False.
 
-        if os.path.getsize(dest) == 0:
-            os.remove(dest)
+        Returns:
+            bool: True if dest was downloaded.
+        """
+        if os.path.exists(dest):
+            return True
+        if not urls:
+            return False
+
+        urls = self.mirrors.order(urls)
+        if self.race_mirrors > 1:
+            urls = self._race(urls)
+        for i, url in enumerate(urls):
+            if i > 0:
+                self.metrics.count("mirror_retries")
+            with self.metrics.timer("download_url"):
+                if self._download_url(url, dest, segmented=segmented):
+                    return True
+            if self.aborted.is_set():
+                return False
+
+        self.logger.error("Unable to download {} from {} mirrors", dest, len(urls))
+        return False
 
     def _download_media(self, video_data: dict, filepath: str):
-        video_url = video_data["play_urls"][0]
-        self._download_url(video_url, self._expand_path(filepath + ".mp4"))
-        cover_url = video_data["thumbnails"][0]
-        self._download_url(cover_url, self._expand_path(filepath + ".jpg"))
+        self._download_mirrors(
+            video_data.get("play_urls") or [],
+            self._expand_path(filepath + ".mp4"),
+            segmented=True,
+        )
+        self._download_mirrors(
+            video_data.get("thumbnails") or [], self._expand_path(filepath + ".jpg")
+        )
+
+    def _record(self, video_data: dict, filepath: str):
+        if self.archive is None:
+            return
+
+        files = []
+        size = 0
+        for ext in (".mp4", ".jpg", ".json", ".description"):
+            path = self._expand_path(filepath + ext)
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                continue
+            files.append(path)
+
+        status = "downloaded"
+        if self._expand_path(filepath + ".mp4") not in files:
+            status = "failed"
+
+        self.archive.append(
+            video_data.get("id"),
+            user_id=video_data.get("user_id"),
+            create_time=video_data.get("create_time"),
+            files=files,
+            size=size,
+            status=status,
+        )
+
+    def abort(self):
+        """Stop running downloads, partial files are kept for resuming."""
+        self.aborted.set()
+
+    @property
+    def metadata_only(self):
+        """True if only webpages are fetched, no media or files are written."""
+        return self.dump_json or self.simulate
+
+    def close(self):
+        """Sync written files, close the content store and metadata sink."""
+        # Losing mirror probes are left to finish on their own.
+        self.executor.shutdown(wait=False)
+        if self.json_output is not None:
+            self.json_output.close()
+        self.writer.close()
+        if self.store is not None:
+            self.store.close()
+        if self.sink is not None:
+            self.sink.close()
 
     def download(self, url: str):
+        if self.aborted.is_set():
+            return
+
         try:
             data = self._fetch_data(url)
-            self.validator.validate(data.get("video_data"))
-            filepath = self._output_format(data.get("video_data"))
-            self._download_media(data.get("video_data"), filepath)
-            self._save_json(data, self._expand_path(filepath + ".json"))
+            with self.metrics.timer("validate"):
+                self.validator.validate(data.get("video_data"))
+            if self.json_output is not None:
+                self.json_output.write(data.get("video_data"))
+            self.metrics.count("videos_extracted")
+            if self.metadata_only:
+                return
+            with self.metrics.timer("output_format"):
+                filepath = self._output_format(data.get("video_data"))
+            if not self.skip_download:
+                self._download_media(data.get("video_data"), filepath)
+            if self.aborted.is_set():
+                # Archive and writers are being closed, keep the video unrecorded.
+                return
+            self._save_description(
+                data.get("video_data"), self._expand_path(filepath + ".description")
+            )
+            # The video is recorded in the archive once its metadata is written.
+            self._save_json(
+                data,
+                self._expand_path(filepath + ".json"),
+                on_saved=lambda: self._record(data.get("video_data"), filepath),
+            )
+        except URLExistsInArchive as e:
+            self.metrics.count("videos_archived")
+            self.logger.debug(e)
+            pass
         except requests.exceptions.InvalidURL as e:
+            self.metrics.error(e)
             self.logger.error(e)
             pass
         except ConnectionError as e:
+            self.metrics.error(e)
             self.logger.error(e)
             pass
         except re.error as e:
+            self.metrics.error(e)
             self.logger.error(e)
             pass
         except FileNotFoundError as e:
+            self.metrics.error(e)
             self.logger.warning(e)
             pass
+        except Exception as e:
+            self.metrics.error(e)
+            raise
@@ -1,32 +1,52 @@
 """Extractor for extracting data from JSON."""
-from tiktok_dl.extractors.extractor_20200623 import Extractor20200623
+from tiktok_dl.extractors.extractor_20200623 import SPEC as SPEC_20200623
+from tiktok_dl.extractors.spec import CompiledExtractor
+from tiktok_dl.extractors.spec import ExtractorError
 
+EXTRACTORS = {
+    extractor.version: extractor
+    for extractor in [CompiledExtractor(spec) for spec in [SPEC_20200623]]
+}
 
-class ExtractorError(Exception):
-    """No Extractor found.
 
-    Args:
-        Exception (Exception): If no Extractor found.
-    """
+class Extractor:
+    """Extract TikTok Video JSON."""
 
-    pass
+    def __init__(self, extractors=None):
+        """Initialize Extractor.
 
+        Args:
+            extractors (dict, optional): Compiled extractors keyed by version.
+                Defaults to `EXTRACTORS`.
+        """
+        self.extractors = EXTRACTORS if extractors is None else extractors
+        self.versions = sorted(self.extractors, reverse=True)
 
-class Extractor:
-    """Extract TikTok Video JSON."""
+    def detect(self, json_data: dict):
+        """Return newest version whose extractor matches json_data or None."""
+        for version in self.versions:
+            if self.extractors[version].matches(json_data):
+                return version
+        return None
 
-    def extract(self, json_data: dict, version: str):
+    def extract(self, json_data: dict, version=None):
         """Extract data from json_data with json schema version.
 
         Args:
             json_data (dict): Data to be extracted from.
-            version (str): Version of the json schema to use.
+            version (str, optional): Version of the json schema to use. Defaults
+                to the newest extractor matching json_data.
+
+        Raises:
+            ExtractorError: No extractor matches or required fields are missing.
 
         Returns:
-            dict: Extracted json data.
+            tuple: Version of the extractor used and extracted json data.
         """
-        for extractor in [Extractor20200623()]:
-            if extractor.__class__.version() == version:
-                return (version, extractor.__class__.extract(json_data))
+        if version is None:
+            version = self.detect(json_data)
 
-        raise ExtractorError("Unable to extract from json_data")
+        extractor = self.extractors.get(version)
+        if extractor is None:
+            raise ExtractorError("Unable to extract from json_data")
+        return (version, extractor.extract(json_data))
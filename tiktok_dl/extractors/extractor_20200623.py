@@ -1,72 +1,54 @@
-"""JSON Extractor Class."""
-import datetime
-
-from tiktok_dl.utils import int_or_none
-from tiktok_dl.utils import str_or_none
-from tiktok_dl.utils import try_get
-
-
-class Extractor20200623:
-    """JSON Extractor for 20200623."""
-
-    def version(self):
-        return "0.0.1"
-
-    def extract(self, video_data: dict):
-        video_info = try_get(video_data, lambda x: x["videoData"]["itemInfos"], dict)
-        author_info = try_get(video_data, lambda x: x["videoData"]["authorInfos"], dict)
-        share_info = try_get(video_data, lambda x: x["shareMeta"], dict)
-        music_info = try_get(video_data, lambda x: x["videoData"]["musicInfos"], dict)
-        author_stats = try_get(
-            video_data, lambda x: x["videoData"]["authorStats"], dict
-        )
-
-        unique_id = str_or_none(author_info.get("uniqueId"))
-        timestamp = try_get(video_info, lambda x: int(x["createTime"]), int)
-        date = datetime.utcfromtimestamp(timestamp).strftime("%Y%m%d")
-
-        height = try_get(video_info, lambda x: x["video"]["videoMeta"]["height"], int)
-        width = try_get(video_info, lambda x: x["video"]["videoMeta"]["width"], int)
-
-        return {
-            "id": str_or_none(video_info.get("id")),
-            "play_urls": try_get(video_info, lambda x: x["video"]["urls"], list),
-            "ext": "mp4",
-            "width": width,
-            "height": height,
-            "duration": try_get(
-                video_info, lambda x: x["video"]["videoMeta"]["duration"], int
-            ),
-            "thumbnails": try_get(video_info, lambda x: x["covers"], list),
-            "comment_count": int_or_none(video_info.get("commentCount")),
-            "digg_count": int_or_none(video_info.get("diggCount")),
-            "share_count": int_or_none(video_info.get("shareCount")),
-            "play_count": int_or_none(video_info.get("playCount")),
-            "create_time": timestamp,
-            "upload_date": date,
-            "title": "{} on TikTok".format(str_or_none(author_info.get("nickName"))),
-            "description": str_or_none(share_info.get("desc")),
-            "nick_name": str_or_none(author_info.get("nickName")),
-            "unique_id": unique_id,
-            "sec_uid": str_or_none(author_info.get("secUid")),
-            "user_id": str_or_none(author_info.get("userId")),
-            "user_url": "https://www.tiktok.com/@" + unique_id,
-            "profile_pics": try_get(author_info, lambda x: x["covers"], list),
-            "webpage_url": "https://www.tiktok.com/@{}/video/{}?source=h5_t".format(
-                str_or_none(author_info.get("uniqueId")),
-                str_or_none(video_info.get("id")),
-            ),
-            "follower_count": int_or_none(author_stats.get("followerCount")),
-            "heart_total": str_or_none(author_stats.get("heartCount")),
-            "challenge_list": try_get(
-                video_data, lambda x: x["videoData"]["challengeInfoList"], list
-            ),
-            "duet_info": try_get(video_data, lambda x: x["videoData"]["duetInfo"], str),
-            "text_extra": try_get(
-                video_data, lambda x: x["videoData"]["textExtra"], list
-            ),
-            "music_id": str_or_none(music_info.get("musicId")),
-            "music_title": str_or_none(music_info.get("musicName")),
-            "music_artist": str_or_none(music_info.get("authorName")),
-            "music_covers": try_get(music_info, lambda x: x["covers"], list),
-        }
+"""JSON Extractor Spec for 20200623."""
+
+SPEC = {
+    "name": "2020-06-23",
+    "version": "0.0.1",
+    "detect": ["videoData.itemInfos.id", "videoData.authorInfos"],
+    "fields": {
+        "id": {"path": "videoData.itemInfos.id", "type": "str"},
+        "play_urls": {"path": "videoData.itemInfos.video.urls", "type": "list"},
+        "ext": {"value": "mp4"},
+        "width": {
+            "path": "videoData.itemInfos.video.videoMeta.width",
+            "type": "strict_int",
+        },
+        "height": {
+            "path": "videoData.itemInfos.video.videoMeta.height",
+            "type": "strict_int",
+        },
+        "duration": {
+            "path": "videoData.itemInfos.video.videoMeta.duration",
+            "type": "strict_int",
+        },
+        "thumbnails": {"path": "videoData.itemInfos.covers", "type": "list"},
+        "comment_count": {"path": "videoData.itemInfos.commentCount", "type": "int"},
+        "digg_count": {"path": "videoData.itemInfos.diggCount", "type": "int"},
+        "share_count": {"path": "videoData.itemInfos.shareCount", "type": "int"},
+        "play_count": {"path": "videoData.itemInfos.playCount", "type": "int"},
+        "create_time": {"path": "videoData.itemInfos.createTime", "type": "int"},
+        "upload_date": {"from": "create_time", "type": "date"},
+        "title": {"template": "{nick_name} on TikTok"},
+        "description": {"path": "shareMeta.desc", "type": "str"},
+        "nick_name": {"path": "videoData.authorInfos.nickName", "type": "str"},
+        "unique_id": {"path": "videoData.authorInfos.uniqueId", "type": "str"},
+        "sec_uid": {"path": "videoData.authorInfos.secUid", "type": "str"},
+        "user_id": {"path": "videoData.authorInfos.userId", "type": "str"},
+        "user_url": {"template": "https://www.tiktok.com/@{unique_id}"},
+        "profile_pics": {"path": "videoData.authorInfos.covers", "type": "list"},
+        "webpage_url": {
+            "template": "https://www.tiktok.com/@{unique_id}/video/{id}?source=h5_t"
+        },
+        "follower_count": {
+            "path": "videoData.authorStats.followerCount",
+            "type": "int",
+        },
+        "heart_total": {"path": "videoData.authorStats.heartCount", "type": "str"},
+        "challenge_list": {"path": "videoData.challengeInfoList", "type": "list"},
+        "duet_info": {"path": "videoData.duetInfo", "type": "strict_str"},
+        "text_extra": {"path": "videoData.textExtra", "type": "list"},
+        "music_id": {"path": "videoData.musicInfos.musicId", "type": "str"},
+        "music_title": {"path": "videoData.musicInfos.musicName", "type": "str"},
+        "music_artist": {"path": "videoData.musicInfos.authorName", "type": "str"},
+        "music_covers": {"path": "videoData.musicInfos.covers", "type": "list"},
+    },
+}
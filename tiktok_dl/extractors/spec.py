@@ -0,0 +1,183 @@
+"""Declarative extractor specs compiled into field accessors."""
+import string
+
+from tiktok_dl.utils import format_utctime
+from tiktok_dl.utils import int_or_none
+from tiktok_dl.utils import str_or_none
+
+
+def typed(expected_type):
+    """Coercion keeping values of expected_type only."""
+
+    def coerce(v):
+        return v if isinstance(v, expected_type) else None
+
+    return coerce
+
+
+def utc_date(v):
+    """Format unixtimestamp as YYYYMMDD."""
+    return None if v is None else format_utctime(time=v, fmt="%Y%m%d")
+
+
+class ExtractorError(Exception):
+    """No Extractor found or required fields missing.
+
+    Args:
+        Exception (Exception): If no Extractor found.
+    """
+
+    pass
+
+
+COERCIONS = {
+    "any": lambda v: v,
+    "str": str_or_none,
+    "int": int_or_none,
+    "strict_int": typed(int),
+    "strict_str": typed(str),
+    "list": typed(list),
+    "dict": typed(dict),
+    "date": utc_date,
+}
+
+# Values of each type in records returned by `CompiledExtractor.sample`.
+SAMPLES = {
+    "any": "sample",
+    "str": "sample",
+    "int": 1592915000,
+    "strict_int": 720,
+    "strict_str": "sample",
+    "list": [],
+    "dict": {},
+    "date": "20200623",
+}
+
+
+def _get_path(value, path):
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return value
+
+
+def _compile_node(node):
+    fields = node["fields"]
+    children = [(key, _compile_node(child)) for key, child in node["children"].items()]
+
+    def visit(value, out):
+        for name, coerce in fields:
+            out[name] = coerce(value)
+        for key, child in children:
+            try:
+                sub = value[key]
+            except (KeyError, IndexError, TypeError):
+                sub = None
+            child(sub, out)
+
+    return visit
+
+
+class CompiledExtractor:
+    """Extractor compiled from a declarative spec.
+
+    A spec is a dict with "name", "version", "detect" and "fields". "detect"
+    lists paths that must be present in the pageProps the spec applies to.
+    Every field maps an output key to one of:
+
+        {"path": "a.b.c", "type": "int"}: value at path coerced with type.
+        {"value": "mp4"}: constant value.
+        {"from": "create_time", "type": "date"}: coerced extracted field.
+        {"template": "{nick_name} on TikTok"}: str.format over extracted fields,
+            all of which are required.
+
+    Paths of all fields are merged into one tree, so shared prefixes such
+    as `videoData.itemInfos` are traversed once per extraction.
+    """
+
+    def __init__(self, spec: dict):
+        """Compile spec.
+
+        Args:
+            spec (dict): Declarative extractor spec.
+
+        Raises:
+            ValueError: Field has unknown type or kind.
+        """
+        self.name = spec["name"]
+        self.version = spec["version"]
+        self.keys = list(spec["fields"])
+        self.detect = [path.split(".") for path in spec.get("detect", [])]
+
+        tree = {"fields": [], "children": {}}
+        self.constants = {}
+        self.derived = []
+        self.templates = []
+        self.types = {}
+        for name, field in spec["fields"].items():
+            self.types[name] = field.get("type", "any")
+            coerce = COERCIONS.get(self.types[name])
+            if coerce is None:
+                raise ValueError("Unknown type of field {}".format(name))
+
+            if "path" in field:
+                node = tree
+                for key in field["path"].split("."):
+                    node = node["children"].setdefault(
+                        key, {"fields": [], "children": {}}
+                    )
+                node["fields"].append((name, coerce))
+            elif "value" in field:
+                self.constants[name] = field["value"]
+            elif "from" in field:
+                self.derived.append((name, field["from"], coerce))
+            elif "template" in field:
+                required = [
+                    key
+                    for _, key, _, _ in string.Formatter().parse(field["template"])
+                    if key
+                ]
+                self.templates.append((name, field["template"], required))
+            else:
+                raise ValueError("Unknown kind of field {}".format(name))
+
+        self._visit = _compile_node(tree)
+
+    def sample(self):
+        """Return record with a value of the right type for every field."""
+        values = {name: SAMPLES[kind] for name, kind in self.types.items()}
+        values.update(self.constants)
+        for name, _, _ in self.templates:
+            values[name] = SAMPLES["str"]
+        return {key: values[key] for key in self.keys}
+
+    def matches(self, json_data: dict):
+        """Return True if all `detect` paths are present in json_data."""
+        return all(_get_path(json_data, path) is not None for path in self.detect)
+
+    def extract(self, json_data: dict):
+        """Extract fields from json_data.
+
+        Args:
+            json_data (dict): pageProps of the TikTok Video webpage.
+
+        Raises:
+            ExtractorError: Field required by a template is missing.
+
+        Returns:
+            dict: Extracted fields in spec order.
+        """
+        values = dict(self.constants)
+        self._visit(json_data, values)
+        for name, source, coerce in self.derived:
+            values[name] = coerce(values.get(source))
+        for name, template, required in self.templates:
+            missing = [key for key in required if values.get(key) is None]
+            if missing:
+                raise ExtractorError(
+                    "Unable to extract {}, missing {}".format(name, ", ".join(missing))
+                )
+            values[name] = template.format(**values)
+        return {key: values[key] for key in self.keys}
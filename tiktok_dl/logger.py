@@ -1,5 +1,15 @@
 """Logger Class."""
-from loguru import logger
+_logger = None
+
+
+def _loguru():
+    """Return loguru logger, imported on first use to keep start-up fast."""
+    global _logger
+    if _logger is None:
+        from loguru import logger
+
+        _logger = logger
+    return _logger
 
 
 class Logger:
@@ -21,17 +31,17 @@ class Logger:
         self.verbose = verbose
 
     def debug(self, *args):
-        if self.verbose:
-            logger.debug(*args)
+        if self.verbose and not self.quiet:
+            _loguru().debug(*args)
 
     def info(self, *args):
-        if self.verbose:
-            logger.info(*args)
+        if self.verbose and not self.quiet:
+            _loguru().info(*args)
 
     def warning(self, *args):
         if not self.no_warnings or not self.quiet:
-            logger.warning(*args)
+            _loguru().warning(*args)
 
     def error(self, *args):
         if self.verbose or not self.quiet:
-            logger.error(*args)
+            _loguru().error(*args)
@@ -0,0 +1,237 @@
+"""Compressed JSON Lines sink for video metadata."""
+import gzip
+import io
+import json
+import os
+import re
+import threading
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIONS = ("gzip", "zstd")
+SHARD_NAME = "metadata-{:05d}.jsonl.{}"
+SHARD_RE = re.compile(r"metadata-(\d+)\.jsonl\.(gz|zst)$")
+EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+def compress(data: bytes, compression: str):
+    """Compress data as a single gzip member or zstd frame."""
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes, compression: str):
+    """Decompress concatenated gzip members or zstd frames."""
+    if compression == "zstd":
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(data), read_across_frames=True
+        )
+        return reader.read()
+    return gzip.decompress(data)
+
+
+class MetadataSink:
+    """Append metadata records to rotating compressed JSON Lines shards.
+
+    Records are buffered into blocks, every block is compressed on its own
+    as a gzip member or zstd frame, so shards stay valid `.jsonl.gz` and
+    `.jsonl.zst` files. `index.tsv` maps every video id to the offset and
+    length of its block for random lookup.
+
+    Buffered records are lost on a crash, callbacks passed to `write` run
+    only once the block of their record was written, so callers can defer
+    recording the video until then.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compression="gzip",
+        block_size=1048576,
+        shard_size=268435456,
+        fsync=False,
+    ):
+        """Initialize Metadata Sink.
+
+        Args:
+            directory (str): Directory of the shards.
+            compression (str, optional): "gzip" or "zstd". Defaults to "gzip".
+            block_size (int, optional): Uncompressed bytes per block. Defaults to 1 MiB.
+            shard_size (int, optional): Compressed bytes per shard. Defaults to 256 MiB.
+            fsync (bool, optional): Sync shard and index to disk before running
+                the callbacks of a block. Defaults to False.
+
+        Raises:
+            ImportError: If zstd compression is requested without zstandard.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError("Unknown compression {}".format(compression))
+        if compression == "zstd" and zstandard is None:
+            raise ImportError(
+                "zstd compression requires zstandard, pip install zstandard"
+            )
+
+        self.directory = directory
+        self.compression = compression
+        self.block_size = block_size
+        self.shard_size = shard_size
+        self.fsync = fsync
+        self.lock = threading.Lock()
+        self.block = []
+        self.block_bytes = 0
+        self.index = None
+
+        os.makedirs(directory, exist_ok=True)
+        shards = [
+            int(m.group(1)) for m in map(SHARD_RE.match, os.listdir(directory)) if m
+        ]
+        self.shard_number = max(shards, default=-1) + 1
+        self.shard = None
+        self.index_file = open(
+            os.path.join(directory, "index.tsv"), "a", encoding="utf-8"
+        )
+
+    def _shard_name(self, number: int):
+        return SHARD_NAME.format(number, EXTENSIONS[self.compression])
+
+    def _open_shard(self):
+        if self.shard is not None and self.shard.tell() < self.shard_size:
+            return
+        if self.shard is not None:
+            self.shard.close()
+            self.shard_number += 1
+        self.shard = open(
+            os.path.join(self.directory, self._shard_name(self.shard_number)), "ab"
+        )
+
+    def write(self, video_id: str, record: dict, on_written=None):
+        """Append record of video_id.
+
+        Args:
+            video_id (str): Id of the TikTok Video.
+            record (dict): Metadata of the TikTok Video.
+            on_written (callable, optional): Called without arguments once the
+                record was written to the shard. Defaults to None.
+        """
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        line = (line + "\n").encode("utf-8")
+        with self.lock:
+            self.block.append((str(video_id), line, on_written))
+            self.block_bytes += len(line)
+            if self.block_bytes >= self.block_size:
+                self._flush()
+
+    def _flush(self):
+        if not self.block:
+            return
+        self._open_shard()
+        data = compress(b"".join(line for _, line, _ in self.block), self.compression)
+        offset = self.shard.tell()
+        self.shard.write(data)
+        self.shard.flush()
+
+        entries = []
+        for n, (video_id, _, _) in enumerate(self.block):
+            entry = (self.shard_number, offset, len(data), n)
+            entries.append("{}\t{}\t{}\t{}\t{}\n".format(video_id, *entry))
+            if self.index is not None:
+                self.index[video_id] = entry
+        self.index_file.write("".join(entries))
+        self.index_file.flush()
+        if self.fsync:
+            os.fsync(self.shard.fileno())
+            os.fsync(self.index_file.fileno())
+
+        block = self.block
+        self.block = []
+        self.block_bytes = 0
+        for _, _, on_written in block:
+            if on_written is not None:
+                on_written()
+
+    def flush(self):
+        """Write buffered records."""
+        with self.lock:
+            self._flush()
+
+    def _load_index(self):
+        index = {}
+        with open(
+            os.path.join(self.directory, "index.tsv"), "r", encoding="utf-8"
+        ) as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 5:
+                    index[parts[0]] = tuple(int(x) for x in parts[1:])
+        return index
+
+    def lookup(self, video_id: str):
+        """Read the most recent record of video_id.
+
+        Args:
+            video_id (str): Id of the TikTok Video.
+
+        Returns:
+            dict: Record or None if video_id was never written.
+        """
+        with self.lock:
+            self._flush()
+            if self.index is None:
+                self.index = self._load_index()
+            entry = self.index.get(str(video_id))
+        if entry is None:
+            return None
+
+        shard, offset, length, n = entry
+        for compression, extension in EXTENSIONS.items():
+            path = os.path.join(self.directory, SHARD_NAME.format(shard, extension))
+            if os.path.isfile(path):
+                break
+        else:
+            return None
+        with open(path, "rb") as f:
+            f.seek(offset)
+            block = decompress(f.read(length), compression)
+        return json.loads(block.splitlines()[n])
+
+    def close(self):
+        """Write buffered records and close the shard and index."""
+        with self.lock:
+            self._flush()
+            if self.shard is not None:
+                self.shard.close()
+                self.shard = None
+            self.index_file.close()
+
+
+def read_records(directory: str):
+    """Yield all records of a metadata sink in write order.
+
+    Args:
+        directory (str): Directory of the shards.
+    """
+    shards = []
+    for name in os.listdir(directory):
+        m = SHARD_RE.match(name)
+        if m:
+            compression = "gzip" if m.group(2) == "gz" else "zstd"
+            shards.append((int(m.group(1)), name, compression))
+
+    for _, name, compression in sorted(shards):
+        path = os.path.join(directory, name)
+        if compression == "zstd":
+            with open(path, "rb") as f:
+                reader = zstandard.ZstdDecompressor().stream_reader(
+                    f, read_across_frames=True
+                )
+                stream = io.TextIOWrapper(reader, encoding="utf-8")
+                for line in stream:
+                    yield json.loads(line)
+        else:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
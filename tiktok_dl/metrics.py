@@ -0,0 +1,274 @@
+"""Per-stage timings and counters of the download pipeline."""
+import bisect
+import json
+import os
+import threading
+import time
+
+# Pipeline stages in the order a video passes them.
+STAGES = (
+    "webpage",
+    "scan",
+    "parse_json",
+    "extract",
+    "validate",
+    "output_format",
+    "download_url",
+)
+
+# Upper bounds in seconds of the latency histogram buckets.
+BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class Histogram:
+    """Latency histogram with fixed buckets."""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float):
+        """Return upper bound of the bucket holding quantile q, at most `max`."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 6),
+        }
+
+
+class _Timer:
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Thread-safe aggregate of stage timings, counters, bytes and errors.
+
+    Recording a value takes a lock and a dictionary update, cheap enough
+    to stay enabled for every video.
+    """
+
+    def __init__(self):
+        """Initialize empty Metrics."""
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.stages = {stage: Histogram() for stage in STAGES}
+        self.counters = {}
+        self.bytes = {}
+        self.errors = {}
+
+    def timer(self, stage: str):
+        """Return context manager recording its duration under stage."""
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        """Record seconds spent in stage."""
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name: str, value=1):
+        """Increment counter name by value."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_bytes(self, kind: str, size: int):
+        """Add size bytes received of kind, "webpage" or "media"."""
+        with self.lock:
+            self.bytes[kind] = self.bytes.get(kind, 0) + size
+
+    def error(self, error):
+        """Count error by its class name."""
+        name = type(error).__name__
+        with self.lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def snapshot(self):
+        """Return JSON serializable copy of all metrics."""
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "uptime": round(time.time() - self.started_at, 3),
+                "stages": {
+                    stage: histogram.to_dict()
+                    for stage, histogram in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "bytes": dict(self.bytes),
+                "errors": dict(self.errors),
+            }
+
+    def summary(self):
+        """Return human readable summary as list of lines."""
+        snapshot = self.snapshot()
+        lines = [
+            "{:<14} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+                "stage", "count", "total s", "mean ms", "p50 ms", "p99 ms"
+            )
+        ]
+        for stage, stats in snapshot["stages"].items():
+            if stats["count"] == 0:
+                continue
+            lines.append(
+                "{:<14} {:>8} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+                    stage,
+                    stats["count"],
+                    stats["sum"],
+                    stats["mean"] * 1000,
+                    stats["p50"] * 1000,
+                    stats["p99"] * 1000,
+                )
+            )
+        for title in ("counters", "bytes", "errors"):
+            if snapshot[title]:
+                lines.append(
+                    "{}: {}".format(
+                        title,
+                        ", ".join(
+                            "{}={}".format(k, v)
+                            for k, v in sorted(snapshot[title].items())
+                        ),
+                    )
+                )
+        return lines
+
+    def prometheus(self):
+        """Return metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP tiktok_dl_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE tiktok_dl_stage_seconds histogram",
+        ]
+        with self.lock:
+            for stage, histogram in self.stages.items():
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        'tiktok_dl_stage_seconds_bucket{{stage="{}",le="{}"}} {}'.format(
+                            stage, bound, cumulative
+                        )
+                    )
+                lines.append(
+                    'tiktok_dl_stage_seconds_sum{{stage="{}"}} {}'.format(
+                        stage, histogram.sum
+                    )
+                )
+                lines.append(
+                    'tiktok_dl_stage_seconds_count{{stage="{}"}} {}'.format(
+                        stage, histogram.count
+                    )
+                )
+            for name, label, help_text, values in (
+                ("events", "event", "Pipeline events.", self.counters),
+                ("bytes", "kind", "Bytes received.", self.bytes),
+                ("errors", "class", "Errors by exception class.", self.errors),
+            ):
+                lines.append("# HELP tiktok_dl_{}_total {}".format(name, help_text))
+                lines.append("# TYPE tiktok_dl_{}_total counter".format(name))
+                for key, value in sorted(values.items()):
+                    lines.append(
+                        'tiktok_dl_{}_total{{{}="{}"}} {}'.format(
+                            name, label, key, value
+                        )
+                    )
+        lines.append("# HELP tiktok_dl_uptime_seconds Seconds since start.")
+        lines.append("# TYPE tiktok_dl_uptime_seconds gauge")
+        lines.append(
+            "tiktok_dl_uptime_seconds {}".format(
+                round(time.time() - self.started_at, 3)
+            )
+        )
+        return "\n".join(lines) + "\n"
+
+
+class StatsFile:
+    """Write snapshots of Metrics to a JSON file every `interval` seconds."""
+
+    def __init__(self, metrics, path: str, interval=10.0):
+        """Initialize Stats File and start the writer thread.
+
+        Args:
+            metrics (Metrics): Metrics to write.
+            path (str): File path of the JSON file, replaced atomically.
+            interval (float, optional): Seconds between writes. Defaults to 10.0.
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        """Write current snapshot."""
+        temp = "{}.tmp".format(self.path)
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump(self.metrics.snapshot(), f, indent=2)
+        os.replace(temp, self.path)
+
+    def close(self):
+        """Stop the writer thread and write the final snapshot."""
+        self.stopped.set()
+        self.thread.join()
+        self.write()
@@ -0,0 +1,111 @@
+"""Latency aware selection of CDN mirrors."""
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class HostStats:
+    """Moving averages of a single CDN host."""
+
+    def __init__(self):
+        self.latency = None
+        self.throughput = None
+        self.failures = 0
+        self.failed_until = 0.0
+
+
+class MirrorSelector:
+    """Order mirror URLs by health, latency and throughput of their hosts.
+
+    Hosts never seen before are tried first in the order given, so every
+    mirror gets measured. Failed hosts are moved last until `cooldown`
+    seconds passed, doubling with every consecutive failure. Only failures
+    of the host count, such as connection errors, timeouts and HTTP 5xx.
+    """
+
+    def __init__(self, alpha=0.3, cooldown=30, clock=time.monotonic):
+        """Initialize Mirror Selector.
+
+        Args:
+            alpha (float, optional): Weight of new samples in the moving
+                averages. Defaults to 0.3.
+            cooldown (int, optional): Seconds a failed host is avoided.
+                Defaults to 30.
+            clock (callable, optional): Monotonic clock. Defaults to time.monotonic.
+        """
+        self.alpha = alpha
+        self.cooldown = cooldown
+        self.clock = clock
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url: str):
+        host = urlsplit(url).hostname
+        stats = self.hosts.get(host)
+        if stats is None:
+            stats = self.hosts[host] = HostStats()
+        return stats
+
+    def _average(self, old, new):
+        return new if old is None else old + self.alpha * (new - old)
+
+    def record(self, url: str, latency: float, size=0, elapsed=0.0):
+        """Record a successful request.
+
+        Args:
+            url (str): Requested URL.
+            latency (float): Seconds until the response headers arrived.
+            size (int, optional): Bytes received. Defaults to 0.
+            elapsed (float, optional): Seconds spent receiving. Defaults to 0.
+        """
+        with self.lock:
+            stats = self._host(url)
+            stats.latency = self._average(stats.latency, latency)
+            if size > 0 and elapsed > 0:
+                stats.throughput = self._average(stats.throughput, size / elapsed)
+            stats.failures = 0
+            stats.failed_until = 0.0
+
+    def failed(self, url: str, status=None):
+        """Record a failed request.
+
+        Args:
+            url (str): Requested URL.
+            status (int, optional): HTTP status of the response, None if
+                there was none. Statuses below 500, such as 404 of an expired
+                URL, do not count against the host. Defaults to None.
+        """
+        if status is not None and status < 500:
+            return
+        with self.lock:
+            stats = self._host(url)
+            stats.failures += 1
+            stats.failed_until = self.clock() + self.cooldown * 2 ** min(
+                stats.failures - 1, 6
+            )
+
+    def _key(self, stats: HostStats, now: float, size: int):
+        if stats.failed_until > now:
+            return (2, stats.failed_until)
+        if stats.latency is None:
+            return (0, 0.0)
+        estimate = stats.latency
+        if stats.throughput:
+            estimate += size / stats.throughput
+        return (1, estimate)
+
+    def order(self, urls, size=1048576):
+        """Sort mirror URLs, best first.
+
+        Args:
+            urls (list): Mirror URLs of the same file.
+            size (int, optional): Expected file size used to weigh latency
+                against throughput. Defaults to 1 MiB.
+
+        Returns:
+            list: URLs ordered by expected download time.
+        """
+        with self.lock:
+            now = self.clock()
+            keys = {url: self._key(self._host(url), now, size) for url in urls}
+        return sorted(urls, key=keys.__getitem__)
@@ -0,0 +1,84 @@
+"""Incremental extraction of the __NEXT_DATA__ script from TikTok webpages."""
+import re
+
+NEXT_DATA_START_RE = re.compile(rb'id="__NEXT_DATA__"\s+type="application/json"[^>]*>')
+NEXT_DATA_END = b"</script>"
+
+
+def video_record(url: str, video_data: dict, aweme_data: dict, version, timestamp):
+    """Return record of a video as written to its JSON file.
+
+    Args:
+        url (str): URL of the video webpage.
+        video_data (dict): Extracted video data.
+        aweme_data (dict): pageProps of the __NEXT_DATA__ payload.
+        version (str): Version of the extractor used.
+        timestamp (int): Unixtimestamp the webpage was fetched at.
+
+    Returns:
+        dict: Record shared by downloads and offline re-extraction.
+    """
+    return {
+        "url": url,
+        "video_data": video_data,
+        "aweme_data": aweme_data,
+        "tiktok-dl": version,
+        "timestamp": timestamp,
+    }
+
+
+class NextDataScanner:
+    """Scan a stream of HTML chunks for the __NEXT_DATA__ payload.
+
+    Only a small tail of the page is buffered while looking for the opening
+    tag, and only the payload itself once it was found.
+    """
+
+    def __init__(self, keep=512):
+        """Initialize scanner.
+
+        Args:
+            keep (int, optional): Bytes kept between chunks while searching for
+                the opening tag. Defaults to 512.
+        """
+        self.keep = keep
+        self.buffer = bytearray()
+        self.found = False
+        self.payload = None
+        self._end_from = 0
+
+    @property
+    def done(self):
+        """Return True once the closing tag was seen."""
+        return self.payload is not None
+
+    def feed(self, chunk: bytes):
+        """Feed next chunk of the webpage.
+
+        Args:
+            chunk (bytes): Chunk of the webpage.
+
+        Returns:
+            bool: True once the payload is complete.
+        """
+        if self.done:
+            return True
+
+        self.buffer += chunk
+        if not self.found:
+            m = NEXT_DATA_START_RE.search(self.buffer)
+            if m is None:
+                if len(self.buffer) > self.keep:
+                    del self.buffer[: -self.keep]
+                return False
+            del self.buffer[: m.end()]
+            self.found = True
+
+        end = self.buffer.find(NEXT_DATA_END, self._end_from)
+        if end == -1:
+            self._end_from = max(0, len(self.buffer) - len(NEXT_DATA_END))
+            return False
+
+        self.payload = bytes(self.buffer[:end]).decode("utf-8").strip()
+        self.buffer = bytearray()
+        return True
@@ -30,18 +30,82 @@ def options_parser():
         help="Download only videos not listed in the archive file. "
         "Record the IDs of all downloaded videos in it.",
     )
+    video_selection_group.add_argument(
+        "--archive-backend",
+        choices=["text", "sqlite"],
+        default="text",
+        help="Storage of the download archive, "
+        "sqlite can be shared by several processes.",
+    )
+    video_selection_group.add_argument(
+        "--archive-bloom",
+        action="store_true",
+        default=False,
+        help="Keep a Bloom filter in front of the text archive index.",
+    )
 
     parallel_download_group = parser.add_argument_group("Parallel Download")
     parallel_download_group.add_argument(
         "-d", "--daemon", action="store_true", dest="daemon", help="Run as daemon.",
     )
+    parallel_download_group.add_argument(
+        "--daemon-host",
+        metavar="HOST",
+        type=str,
+        default="127.0.0.1",
+        help="Address the daemon HTTP API listens on.",
+    )
+    parallel_download_group.add_argument(
+        "--daemon-port",
+        metavar="PORT",
+        type=int,
+        default=8000,
+        help="Port the daemon HTTP API listens on.",
+    )
     parallel_download_group.add_argument(
         "-j",
         "--concurrent-count",
         metavar="CONCURRENT_COUNT",
         type=int,
-        default=2,
-        help="Download videos in parallel.",
+        default=1,
+        help="Number of videos to download in parallel.",
+    )
+    parallel_download_group.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        default="threads",
+        help="Download engine, asyncio requires aiohttp.",
+    )
+    parallel_download_group.add_argument(
+        "--pool-size",
+        metavar="POOL_SIZE",
+        type=int,
+        default=10,
+        help="Number of keep-alive connections per host.",
+    )
+    parallel_download_group.add_argument(
+        "--segments",
+        metavar="SEGMENTS",
+        type=int,
+        default=1,
+        help="Download each video over this many parallel byte ranges "
+        "(threads engine only).",
+    )
+    parallel_download_group.add_argument(
+        "--segment-min-size",
+        metavar="BYTES",
+        type=int,
+        default=8388608,
+        help="Only segment videos larger than this many bytes.",
+    )
+    parallel_download_group.add_argument(
+        "--race-mirrors",
+        metavar="COUNT",
+        type=int,
+        default=0,
+        help="Race the first byte of this many mirrors and download from the "
+        "fastest (threads engine only). Mirrors are always ordered by measured "
+        "speed and failed over on errors.",
     )
 
     filesystem_group = parser.add_argument_group("Filesystem Options")
@@ -88,6 +152,74 @@ def options_parser():
         default=None,
         help="Directory prefix.",
     )
+    filesystem_group.add_argument(
+        "--metadata-sink",
+        metavar="DIRECTORY",
+        type=str,
+        default=None,
+        help="Append video metadata to compressed JSON Lines shards in DIRECTORY "
+        "instead of writing a .json file per video.",
+    )
+    filesystem_group.add_argument(
+        "--metadata-compression",
+        choices=["gzip", "zstd"],
+        default="gzip",
+        help="Compression of --metadata-sink shards, zstd requires zstandard.",
+    )
+    filesystem_group.add_argument(
+        "--fsync",
+        action="store_true",
+        help="Sync written files to disk, batched per directory.",
+    )
+    filesystem_group.add_argument(
+        "--content-store",
+        metavar="DIRECTORY",
+        type=str,
+        default=None,
+        help="Store every distinct media file once in DIRECTORY and link it "
+        "into the output paths. Files with a known ETag at the same URL are not "
+        "downloaded again.",
+    )
+    filesystem_group.add_argument(
+        "--content-store-link",
+        choices=["hardlink", "copy"],
+        default="hardlink",
+        help="Hardlink stored media into the output paths (editing one output "
+        "file changes all files with the same content) or give every path its "
+        "own copy, a reflink where the filesystem supports it.",
+    )
+
+    page_cache_group = parser.add_argument_group("Page Cache")
+    page_cache_group.add_argument(
+        "--page-cache",
+        metavar="FILE",
+        type=str,
+        default=None,
+        help="Cache __NEXT_DATA__ of video webpages in the SQLite database FILE "
+        "and read webpages from it.",
+    )
+    page_cache_group.add_argument(
+        "--page-cache-max-size",
+        metavar="BYTES",
+        type=int,
+        default=1073741824,
+        help="Evict least recently used pages beyond this many compressed bytes.",
+    )
+    page_cache_group.add_argument(
+        "--page-cache-ttl",
+        metavar="SECONDS",
+        type=int,
+        default=604800,
+        help="Fetch webpages cached longer ago again and skip them with "
+        "--reextract, 0 to never expire.",
+    )
+    page_cache_group.add_argument(
+        "--reextract",
+        action="store_true",
+        help="Extract all pages of --page-cache offline and print them as JSON "
+        "Lines, or append them to --metadata-sink. Runs --concurrent-count "
+        "processes if greater than 1, one per CPU otherwise.",
+    )
 
     thumbnail_group = parser.add_argument_group("Thumbnail images")
     thumbnail_group.add_argument(
@@ -125,14 +257,52 @@ def options_parser():
         "--dump-json",
         action="store_true",
         default=False,
-        help="Simulate, quiet but print JSON information. "
+        help="Only fetch webpages and print the video information as one JSON "
+        "object per line, nothing is downloaded or written. "
         'See the "OUTPUT TEMPLATE" for a description of available keys.',
     )
     simulation_group.add_argument(
         "--print-json",
         action="store_true",
         default=False,
-        help="Be quiet and print the video information as JSON (video is still being downloaded).",
+        help="Print the video information as one JSON object per line "
+        "(video is still being downloaded).",
+    )
+    simulation_group.add_argument(
+        "--validate",
+        choices=["full", "sampled", "off"],
+        default="full",
+        help="Validate video JSON against the schemas for every video, "
+        "a sample of videos or not at all.",
+    )
+    simulation_group.add_argument(
+        "--validate-sample-rate",
+        metavar="N",
+        type=int,
+        default=100,
+        help="Validate one in N videos with --validate sampled.",
+    )
+    simulation_group.add_argument(
+        "--print-stats",
+        action="store_true",
+        default=False,
+        help="Print time spent in each download stage, bytes, retries and "
+        "errors at the end of the run.",
+    )
+    simulation_group.add_argument(
+        "--stats-file",
+        metavar="FILE",
+        type=str,
+        default=None,
+        help="Periodically write stage timings, bytes, retries and errors "
+        "as JSON to this file.",
+    )
+    simulation_group.add_argument(
+        "--stats-interval",
+        metavar="SECONDS",
+        type=float,
+        default=10.0,
+        help="Seconds between writes of --stats-file.",
     )
     simulation_group.add_argument(
         "-v",
@@ -154,22 +324,33 @@ def options_parser():
         metavar="SLEEP_INTERVAL",
         type=float,
         default=0.2,
-        help="Number of seconds to sleep before each download.",
+        help="Initial number of seconds between requests to the TikTok "
+        "webpage host. Adapts to the responses, backs off on HTTP 429 and 503. "
+        "Media hosts are only slowed down once they throttle.",
     )
     workarounds_group.add_argument(
         "--max-sleep-interval",
         metavar="MAX_SLEEP_INTERVAL",
         type=float,
         default=0,
-        help="Maximum possible number of seconds to sleep.",
+        help="Maximum number of seconds between requests to a host that "
+        "throttles downloads (default 60 if 0).",
     )
     parser.set_defaults(
+        archive_backend="text",
+        archive_bloom=False,
         batch_file=None,
         concurrent_count=1,
+        content_store=None,
+        content_store_link="hardlink",
         daemon=False,
+        daemon_host="127.0.0.1",
+        daemon_port=8000,
         directory_prefix=None,
         download_archive=None,
         dump_json=False,
+        engine="threads",
+        fsync=False,
         get_description=False,
         get_duration=False,
         get_filename=False,
@@ -178,17 +359,32 @@ def options_parser():
         get_title=False,
         get_url=False,
         max_sleep_interval=0,
+        metadata_compression="gzip",
+        metadata_sink=None,
         no_check_certificate=False,
         no_overwrite=False,
         no_warnings=False,
         no_write_json=False,
         output_template="{Y}-{d}-{m}_{H}-{M}-{S} {id}_{user_id}",
+        page_cache=None,
+        page_cache_max_size=1073741824,
+        page_cache_ttl=604800,
+        pool_size=10,
         print_json=False,
+        print_stats=False,
         quiet=False,
+        race_mirrors=0,
+        reextract=False,
+        segment_min_size=8388608,
+        segments=1,
         simulate=False,
         skip_download=False,
         sleep_interval=0.2,
+        stats_file=None,
+        stats_interval=10.0,
         urls=[],
+        validate="full",
+        validate_sample_rate=100,
         verbose=True,
         write_description=False,
         write_thumbnail=True,
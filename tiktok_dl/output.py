@@ -0,0 +1,65 @@
+"""Streaming of video metadata as JSON Lines."""
+import json
+import queue
+import sys
+import threading
+
+_CLOSE = object()
+
+
+class JSONLinesWriter:
+    """Write one compact JSON object per line from many workers.
+
+    Lines are handed to a single writer thread through a bounded queue, so
+    workers block instead of buffering without limit when the consumer of
+    the stream is slower than the crawl. The stream is flushed whenever
+    the queue runs empty.
+    """
+
+    def __init__(self, stream=None, max_pending=1024):
+        """Initialize JSON Lines Writer.
+
+        Args:
+            stream (file, optional): Text stream to write to. Defaults to sys.stdout.
+            max_pending (int, optional): Lines buffered before `write` blocks.
+                Defaults to 1024.
+        """
+        self.stream = sys.stdout if stream is None else stream
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            line = self.queue.get()
+            if line is _CLOSE:
+                break
+            if self.closed:
+                continue
+            try:
+                self.stream.write(line)
+                if self.queue.empty():
+                    self.stream.flush()
+            except BrokenPipeError:
+                # Consumer went away, drain so that workers do not block.
+                self.closed = True
+        if not self.closed:
+            self.stream.flush()
+
+    def write(self, record):
+        """Queue record for writing.
+
+        Args:
+            record (dict): JSON serializable object.
+        """
+        if self.closed:
+            return
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self.queue.put(line + "\n")
+
+    def close(self):
+        """Write queued lines and stop the writer thread."""
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
@@ -0,0 +1,193 @@
+"""On-disk cache of __NEXT_DATA__ payloads."""
+import sqlite3
+import threading
+import time
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    video_id TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+"""
+
+
+class PageCache:
+    """Size bounded cache of raw __NEXT_DATA__ payloads keyed by video id.
+
+    Payloads are stored zlib compressed in a SQLite database in WAL mode, so
+    offline re-extraction can read it from several processes. Entries older
+    than `ttl` seconds are ignored and removed, least recently used entries
+    are evicted once the compressed payloads exceed `max_size` bytes.
+    """
+
+    def __init__(self, path: str, max_size=1073741824, ttl=604800, readonly=False):
+        """Initialize Page Cache.
+
+        Args:
+            path (str): File path of the database.
+            max_size (int, optional): Maximum bytes of compressed payloads.
+                Defaults to 1 GiB.
+            ttl (int, optional): Seconds a payload stays valid, 0 keeps payloads
+                forever. Defaults to 7 days.
+            readonly (bool, optional): Open for reading only, access times
+                are not updated. Defaults to False.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self.readonly = readonly
+        self.lock = threading.Lock()
+        self.touched = {}
+
+        if readonly:
+            self.connection = sqlite3.connect(
+                "file:{}?mode=ro".format(path),
+                uri=True,
+                timeout=30,
+                check_same_thread=False,
+            )
+            self.total_size = None
+            return
+
+        self.connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.total_size = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+
+    def _expired(self, fetched_at: int, now: float):
+        return self.ttl > 0 and fetched_at < now - self.ttl
+
+    def get(self, video_id: str):
+        """Get cached payload of video_id.
+
+        Args:
+            video_id (str): id of the TikTok Video.
+
+        Returns:
+            str: JSON string of the __NEXT_DATA__ script or None.
+        """
+        entry = self.read(video_id)
+        if entry is None:
+            return None
+        if not self.readonly:
+            with self.lock:
+                self.touched[video_id] = time.time()
+                if len(self.touched) >= 100:
+                    self._flush_touched()
+        return entry[0]
+
+    def read(self, video_id: str):
+        """Read cached payload of video_id and its fetch time.
+
+        Returns:
+            tuple: JSON string and unixtimestamp it was fetched at, None if
+                missing or expired.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT payload, fetched_at FROM pages WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None or self._expired(row[1], time.time()):
+            return None
+        return (zlib.decompress(row[0]).decode("utf-8"), row[1])
+
+    def put(self, video_id: str, payload: str):
+        """Cache payload of video_id, evicting entries if the cache is full.
+
+        Args:
+            video_id (str): id of the TikTok Video.
+            payload (str): JSON string of the __NEXT_DATA__ script.
+        """
+        data = zlib.compress(payload.encode("utf-8"), 6)
+        now = time.time()
+        with self.lock:
+            old = self.connection.execute(
+                "SELECT size FROM pages WHERE video_id = ?", (video_id,)
+            ).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(video_id, payload, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, data, len(data), int(now), now),
+            )
+            self.total_size += len(data) - (old[0] if old else 0)
+            if self.total_size > self.max_size:
+                self._evict(now)
+
+    def _flush_touched(self):
+        if not self.touched:
+            return
+        self.connection.executemany(
+            "UPDATE pages SET accessed_at = ? WHERE video_id = ?",
+            [(t, video_id) for video_id, t in self.touched.items()],
+        )
+        self.touched = {}
+
+    def _evict(self, now: float):
+        """Remove expired, then least recently used entries down to 90%."""
+        self._flush_touched()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            if self.ttl > 0:
+                self.connection.execute(
+                    "DELETE FROM pages WHERE fetched_at < ?", (now - self.ttl,)
+                )
+            target = self.max_size * 9 // 10
+            total = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()[0]
+            cursor = self.connection.execute(
+                "SELECT video_id, size FROM pages ORDER BY accessed_at"
+            )
+            evict = []
+            for video_id, size in cursor:
+                if total <= target:
+                    break
+                evict.append((video_id,))
+                total -= size
+            cursor.close()
+            self.connection.executemany("DELETE FROM pages WHERE video_id = ?", evict)
+        except sqlite3.Error:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+        self.total_size = total
+
+    def ids(self, page_size=10000):
+        """Yield ids of all valid cached payloads ordered by id.
+
+        Args:
+            page_size (int, optional): Ids read per query. Defaults to 10000.
+        """
+        query = "SELECT video_id FROM pages WHERE video_id > ? AND fetched_at >= ?"
+        query += " ORDER BY video_id LIMIT ?"
+        oldest = int(time.time()) - self.ttl if self.ttl > 0 else 0
+        last = ""
+        while True:
+            with self.lock:
+                rows = self.connection.execute(
+                    query, (last, oldest, page_size)
+                ).fetchall()
+            for (video_id,) in rows:
+                yield video_id
+            if len(rows) < page_size:
+                return
+            last = rows[-1][0]
+
+    def close(self):
+        """Write access times and close the database."""
+        with self.lock:
+            if not self.readonly:
+                self._flush_touched()
+            self.connection.close()
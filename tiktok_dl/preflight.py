@@ -0,0 +1,87 @@
+"""Pre-flight filtering of URLs for tiktok_dl."""
+import re
+from collections import OrderedDict
+
+from tiktok_dl.utils import match_id
+from tiktok_dl.utils import normalize_url
+from tiktok_dl.utils import valid_url_re
+
+
+class Preflight:
+    """Drop invalid, duplicate and archived URLs before any network I/O.
+
+    Only the `max_seen` most recently seen ids are remembered. An older
+    duplicate is downloaded by then and dropped as archived instead.
+    """
+
+    def __init__(self, archive, logger, max_seen=100000):
+        """Initialize Preflight.
+
+        Args:
+            archive: Archive Manager to check for downloaded videos.
+            logger: Instance of Logger class.
+            max_seen (int, optional): Video ids remembered to drop duplicates.
+                Defaults to 100000.
+        """
+        self.archive = archive
+        self.logger = logger
+        self.max_seen = max_seen
+        self.seen = OrderedDict()
+        self.stats = {"queued": 0, "duplicate": 0, "archived": 0, "invalid": 0}
+
+    def check(self, url: str):
+        """Check a single URL.
+
+        Args:
+            url (str): TikTok Video URL.
+
+        Returns:
+            str: Normalized URL or None if it should be skipped.
+        """
+        url = normalize_url(url)
+        try:
+            video_id = match_id(url, valid_url_re())
+        except (ValueError, re.error) as e:
+            # requests.exceptions.InvalidURL is a ValueError.
+            self.logger.error(e)
+            self.stats["invalid"] += 1
+            return None
+
+        key = int(video_id)
+        if key in self.seen:
+            self.seen.move_to_end(key)
+            self.logger.debug("{} is a duplicate", video_id)
+            self.stats["duplicate"] += 1
+            return None
+        self.seen[key] = None
+        if len(self.seen) > self.max_seen:
+            self.seen.popitem(last=False)
+
+        if self.archive.recorded(video_id):
+            self.logger.debug("{} already recorded in archive", video_id)
+            self.stats["archived"] += 1
+            return None
+
+        self.stats["queued"] += 1
+        return url
+
+    def filter(self, urls):
+        """Yield normalized URLs which need to be downloaded.
+
+        Args:
+            urls (iterable): TikTok Video URLs, consumed lazily.
+        """
+        for url in urls:
+            url = self.check(url)
+            if url is not None:
+                yield url
+
+    def report(self):
+        """Log number of queued and skipped URLs."""
+        self.logger.info(
+            "Queued {} urls, skipped {} archived, {} duplicate and {} invalid urls",
+            self.stats["queued"],
+            self.stats["archived"],
+            self.stats["duplicate"],
+            self.stats["invalid"],
+        )
@@ -0,0 +1,236 @@
+"""Adaptive per-host rate limiting of HTTP requests."""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+THROTTLE_RETRIES = 3
+THROTTLE_STATUS = (429, 503)
+# Requests per second of hosts not paced by `sleep_interval`.
+UNPACED_RATE = 1000.0
+
+
+def parse_retry_after(value, now=None):
+    """Parse value of a Retry-After header.
+
+    Args:
+        value (str): Delay in seconds or HTTP date.
+        now (float, optional): Current unixtimestamp. Defaults to time.time().
+
+    Returns:
+        float: Seconds to wait or None if value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+class TokenBucket:
+    """Token bucket of a single host."""
+
+    def __init__(
+        self, rate: float, burst: float, now: float, max_rate=None, increase=None
+    ):
+        self.rate = rate
+        self.max_rate = rate if max_rate is None else max_rate
+        self.increase = rate / 10 if increase is None else increase
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.blocked_until = now
+
+    def reserve(self, now: float):
+        """Take a token, possibly ahead of time.
+
+        Returns:
+            float: Seconds to wait before the request may be sent.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        delay = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(delay, self.blocked_until - now)
+
+
+class RateLimiter:
+    """Per-host token bucket rate limiter shared by all workers.
+
+    The rate of every host adapts AIMD-style: each healthy response raises
+    it by `increase` requests per second up to `max_rate`, a 429 or 503
+    response multiplies it by `decrease` down to `min_rate` and blocks the
+    host for the duration of `Retry-After`.
+
+    Only `hosts` start at the rate of `sleep_interval`, other hosts such as
+    the CDN start at UNPACED_RATE and slow down once they throttle.
+    """
+
+    def __init__(
+        self,
+        sleep_interval=0.2,
+        max_sleep_interval=0,
+        burst=1,
+        decrease=0.5,
+        increase=None,
+        max_rate=None,
+        max_retry_after=300,
+        hosts=None,
+        clock=time.monotonic,
+    ):
+        """Initialize Rate Limiter.
+
+        Args:
+            sleep_interval (float, optional): Initial seconds between requests
+                to a host, 0 starts at `max_rate`. Defaults to 0.2.
+            max_sleep_interval (float, optional): Largest seconds between
+                requests to a throttled host, 0 for 60. Defaults to 0.
+            burst (int, optional): Requests sent without waiting after a host
+                was idle. Defaults to 1.
+            decrease (float, optional): Rate multiplier on throttling. Defaults to 0.5.
+            increase (float, optional): Requests per second added on healthy
+                responses. Defaults to a tenth of the initial rate.
+            max_rate (float, optional): Largest requests per second of a host.
+                Defaults to ten times the initial rate, 100 if `sleep_interval`
+                is 0.
+            max_retry_after (int, optional): Cap for Retry-After. Defaults to 300.
+            hosts (iterable, optional): Domains paced by `sleep_interval`,
+                including their subdomains. Defaults to None, all hosts.
+            clock (callable, optional): Monotonic clock. Defaults to time.monotonic.
+        """
+        self.min_rate = 1.0 / (max_sleep_interval or 60)
+        if sleep_interval > 0:
+            self.max_rate = max_rate or 10.0 / sleep_interval
+            initial = 1.0 / sleep_interval
+        else:
+            self.max_rate = max_rate or 100.0
+            initial = self.max_rate
+        self.initial_rate = min(self.max_rate, max(self.min_rate, initial))
+        self.increase = increase or self.initial_rate / 10
+        self.decrease = decrease
+        self.burst = burst
+        self.max_retry_after = max_retry_after
+        self.hosts = None if hosts is None else tuple(hosts)
+        self.clock = clock
+
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def paced(self, host: str):
+        """Return True if host is paced by `sleep_interval`."""
+        if self.hosts is None:
+            return True
+        return any(
+            host == domain or host.endswith("." + domain) for domain in self.hosts
+        )
+
+    def _bucket(self, host: str, now: float):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            if self.paced(host or ""):
+                bucket = TokenBucket(
+                    self.initial_rate,
+                    self.burst,
+                    now,
+                    max_rate=self.max_rate,
+                    increase=self.increase,
+                )
+            else:
+                bucket = TokenBucket(UNPACED_RATE, self.burst, now)
+            self.buckets[host] = bucket
+        return bucket
+
+    def reserve(self, url: str):
+        """Reserve a request to the host of url.
+
+        Args:
+            url (str): URL to be requested.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        host = urlsplit(url).hostname
+        with self.lock:
+            now = self.clock()
+            return self._bucket(host, now).reserve(now)
+
+    def acquire(self, url: str):
+        """Block until a request to the host of url may be sent."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def feedback(self, url: str, status: int, retry_after=None):
+        """Adapt rate of the host of url to a response.
+
+        Args:
+            url (str): URL that was requested.
+            status (int): HTTP status of the response.
+            retry_after (str, optional): Value of the Retry-After header.
+
+        Returns:
+            bool: True if the host throttled the request.
+        """
+        host = urlsplit(url).hostname
+        with self.lock:
+            now = self.clock()
+            bucket = self._bucket(host, now)
+            if status not in THROTTLE_STATUS:
+                if status < 400:
+                    bucket.rate = min(bucket.max_rate, bucket.rate + bucket.increase)
+                return False
+
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0)
+            wait = parse_retry_after(retry_after)
+            if wait is None:
+                wait = 1.0 / bucket.rate
+            wait = min(wait, self.max_retry_after)
+            bucket.blocked_until = max(bucket.blocked_until, now + wait)
+            return True
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter throttling requests with a RateLimiter.
+
+    Throttled requests are retried up to `retries` times once the host
+    may be requested again.
+    """
+
+    def __init__(self, limiter, retries=THROTTLE_RETRIES, metrics=None, **kwargs):
+        """Initialize adapter.
+
+        Args:
+            limiter (RateLimiter): Rate limiter shared by all sessions.
+            retries (int, optional): Retries of throttled requests. Defaults to 3.
+            metrics (Metrics, optional): Metrics counting the retries.
+                Defaults to None.
+        """
+        self.limiter = limiter
+        self.throttle_retries = retries
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        for attempt in range(self.throttle_retries + 1):
+            self.limiter.acquire(request.url)
+            response = super().send(request, **kwargs)
+            throttled = self.limiter.feedback(
+                request.url, response.status_code, response.headers.get("Retry-After")
+            )
+            if not throttled or attempt == self.throttle_retries:
+                return response
+            if self.metrics is not None:
+                self.metrics.count("throttle_retries")
+            response.close()
+        return response
@@ -0,0 +1,144 @@
+"""Offline re-extraction of cached __NEXT_DATA__ payloads."""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+
+from tiktok_dl.next_data import video_record
+from tiktok_dl.page_cache import PageCache
+
+# Per-process state of the pool workers, see `_init_worker`.
+_state = {}
+
+
+def extract_page(json_string: str, extractor, validator, timestamp=None):
+    """Extract video data from a __NEXT_DATA__ payload.
+
+    Args:
+        json_string (str): JSON string of the __NEXT_DATA__ script.
+        extractor (Extractor): Extractor to use.
+        validator (AwemeValidator): Validator of the extracted data.
+        timestamp (int, optional): Time the payload was fetched at.
+            Defaults to now.
+
+    Returns:
+        dict: Same record as written by `Downloader`, None if the video was
+            not available. Its url is the canonical webpage URL.
+    """
+    aweme_data = json.loads(json_string)["props"]["pageProps"]
+    if aweme_data.get("statusCode") != 0:
+        return None
+
+    version, video_data = extractor.extract(json_data=aweme_data)
+    validator.validate(video_data)
+    if timestamp is None:
+        timestamp = int(time.time())
+    url = "https://www.tiktok.com/@{}/video/{}".format(
+        video_data.get("unique_id"), video_data.get("id")
+    )
+    return video_record(url, video_data, aweme_data, version, timestamp)
+
+
+def _init_worker(cache_path: str, validate: str, full: bool):
+    from tiktok_dl.extractors.extractor import Extractor
+    from tiktok_dl.validator import AwemeValidator
+
+    validator = AwemeValidator(mode=validate)
+    _state["cache"] = PageCache(cache_path, ttl=0, readonly=True)
+    _state["validator"] = validator
+    _state["extractor"] = Extractor()
+    _state["full"] = full
+
+
+def _extract_chunk(video_ids):
+    records = []
+    failed = 0
+    for video_id in video_ids:
+        entry = _state["cache"].read(video_id)
+        if entry is None:
+            continue
+        try:
+            record = extract_page(
+                entry[0], _state["extractor"], _state["validator"], entry[1]
+            )
+        except Exception:
+            failed += 1
+            continue
+        if record is None:
+            continue
+        if not _state["full"]:
+            record = record["video_data"]
+        records.append((video_id, record))
+    return records, failed
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def reextract(
+    cache_path: str,
+    emit,
+    processes=None,
+    validate="full",
+    ttl=0,
+    full=True,
+    chunk_size=256,
+):
+    """Run Extractor and AwemeValidator over every cached payload.
+
+    Payloads are read and extracted in a process pool, at most two chunks
+    per process are in flight.
+
+    Args:
+        cache_path (str): File path of the page cache.
+        emit (callable): Called with video id and record in this process.
+        processes (int, optional): Worker processes. Defaults to os.cpu_count().
+        validate (str, optional): Validation mode. Defaults to "full".
+        ttl (int, optional): Skip payloads older than this many seconds,
+            0 uses all payloads. Defaults to 0.
+        full (bool, optional): Emit complete records instead of video data
+            only. Defaults to True.
+        chunk_size (int, optional): Videos per task. Defaults to 256.
+
+    Returns:
+        dict: Number of extracted and failed videos.
+    """
+    processes = processes or os.cpu_count() or 1
+    stats = {"extracted": 0, "failed": 0}
+
+    def collect(done):
+        for future in done:
+            records, failed = future.result()
+            stats["failed"] += failed
+            stats["extracted"] += len(records)
+            for video_id, record in records:
+                emit(video_id, record)
+
+    cache = PageCache(cache_path, ttl=ttl, readonly=True)
+    pending = set()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(cache_path, validate, full),
+        ) as executor:
+            for chunk in _chunks(cache.ids(), chunk_size):
+                if len(pending) >= processes * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(_extract_chunk, chunk))
+            done, pending = wait(pending)
+            collect(done)
+    finally:
+        cache.close()
+    return stats
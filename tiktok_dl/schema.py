@@ -10,9 +10,5 @@ def parse_json(direcroy, filename):
 
 def schemas():
     """Read Schemas from available schemas."""
-    directory = os.path.dirname(os.path.realpath(__file__))
-    return [
-        parse_json(directory, i)
-        for i in os.listdir(os.path.join(directory, "schemas"))
-        if ".json" in i
-    ]
+    directory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "schemas")
+    return [parse_json(directory, i) for i in os.listdir(directory) if ".json" in i]
@@ -0,0 +1,128 @@
+"""Segmented multi-connection media download."""
+import os
+
+import requests
+
+from tiktok_dl.utils import parse_content_range
+
+
+class SegmentedDownload:
+    """Download a file as parallel byte ranges into a preallocated file."""
+
+    def __init__(
+        self, session, logger, aborted, executor, segments=4, min_size=8388608
+    ):
+        """Initialize Segmented Download.
+
+        Args:
+            session (requests.Session): Session used for all requests.
+            logger: Instance of Logger class.
+            aborted (threading.Event): Stop downloading when set.
+            executor (concurrent.futures.Executor): Executor shared by all
+                downloads, running the ranges.
+            segments (int, optional): Number of parallel ranges. Defaults to 4.
+            min_size (int, optional): Smaller files are not segmented. Defaults to 8 MiB.
+        """
+        self.session = session
+        self.logger = logger
+        self.aborted = aborted
+        self.executor = executor
+        self.segments = segments
+        self.min_size = min_size
+
+    def probe(self, url: str):
+        """Get size of the file if the server supports byte ranges.
+
+        Args:
+            url (str): URL of the file.
+
+        Returns:
+            int: Size of the file or None if ranges are not supported.
+        """
+        with self.session.get(
+            url,
+            stream=True,
+            timeout=30,
+            headers={"Range": "bytes=0-0", "Accept-Encoding": "identity"},
+        ) as response:
+            if response.status_code != 206:
+                return None
+            _, _, total = parse_content_range(response.headers.get("Content-Range"))
+            return total
+
+    def _ranges(self, size: int):
+        step = -(-size // self.segments)
+        return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+    def _fetch(self, url: str, dest: str, start: int, end: int):
+        headers = {
+            "Range": "bytes={}-{}".format(start, end),
+            "Accept-Encoding": "identity",
+        }
+        written = 0
+        with self.session.get(
+            url, stream=True, timeout=160, headers=headers
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                return False
+            if parse_content_range(response.headers.get("Content-Range"))[0] != start:
+                return False
+
+            with open(dest, "r+b") as handle:
+                handle.seek(start)
+                for data in response.iter_content(chunk_size=1048576):
+                    if self.aborted.is_set():
+                        return False
+                    handle.write(data[: max(0, end - start + 1 - written)])
+                    written += len(data)
+        return written == end - start + 1
+
+    def download(self, url: str, dest: str):
+        """Download url to dest using `segments` connections.
+
+        Data is written to `dest.seg` and renamed to dest once every range
+        completed. The temporary file is removed on failure.
+
+        Args:
+            url (str): URL of the file.
+            dest (str): Destination path.
+
+        Returns:
+            bool: True if downloaded, False if the caller should fall back to
+                a single stream.
+        """
+        try:
+            size = self.probe(url)
+        except requests.exceptions.RequestException:
+            return False
+        if size is None or size < self.min_size:
+            return False
+
+        temp = dest + ".seg"
+        with open(temp, "wb") as handle:
+            handle.truncate(size)
+
+        ranges = self._ranges(size)
+        self.logger.debug("Downloading to {} in {} segments".format(dest, len(ranges)))
+        futures = [
+            self.executor.submit(self._fetch, url, temp, start, end)
+            for start, end in ranges
+        ]
+        # Wait for every range, none may still write to temp once it is removed.
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(
+                    "Segmented download of {} failed: {}".format(url, e)
+                )
+                results.append(False)
+
+        if all(results) and os.path.getsize(temp) == size:
+            os.replace(temp, dest)
+            return True
+
+        os.remove(temp)
+        return False
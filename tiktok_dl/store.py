@@ -0,0 +1,174 @@
+"""Content-addressed store for downloaded media."""
+import hashlib
+import os
+import shutil
+import threading
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+LINK_MODES = ("hardlink", "copy")
+# ioctl request cloning a whole file on Linux (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+
+class ContentStore:
+    """Store every distinct file once and link it into the output paths.
+
+    Blobs are kept in `root/objects/<digest[:2]>/<digest>`. With the
+    "hardlink" link mode output files are hardlinks to their blob, so editing
+    one output file changes every file with the same content. The "copy" mode
+    gives every output file its own data, cloned where the filesystem
+    supports reflinks. Hardlinks fall back to copies where unsupported.
+
+    An append-only `root/index` maps the host and path of a response with its
+    strong ETag and size to a blob, so known files are linked without
+    downloading them again. ETags are only meaningful for a single resource,
+    they are never matched across paths or hosts.
+    """
+
+    def __init__(self, root: str, algorithm="sha256", link_mode="hardlink"):
+        """Initialize Content Store.
+
+        Args:
+            root (str): Directory of the store.
+            algorithm (str, optional): hashlib algorithm. Defaults to "sha256".
+            link_mode (str, optional): "hardlink" or "copy". Defaults to
+                "hardlink".
+
+        Raises:
+            ValueError: Unknown link_mode.
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError("Unknown link mode {}".format(link_mode))
+        self.root = root
+        self.algorithm = algorithm
+        self.link_mode = link_mode
+        self.objects = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index")
+        self.index = {}
+        self.lock = threading.Lock()
+
+        os.makedirs(self.objects, exist_ok=True)
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t")
+                    # Entries without a location are not scoped, ignore them.
+                    if len(parts) == 4:
+                        self.index[tuple(parts[:3])] = parts[3]
+        self.index_file = open(self.index_path, "a", encoding="utf-8")
+
+    def hasher(self):
+        """Return new hash object of `algorithm`."""
+        return hashlib.new(self.algorithm)
+
+    def blob_path(self, digest: str):
+        """Path of the blob with digest."""
+        return os.path.join(self.objects, digest[:2], digest)
+
+    @staticmethod
+    def _key(url, etag, size):
+        # Weak ETags do not guarantee identical bytes.
+        if not url or not etag or etag.startswith("W/") or size is None:
+            return None
+        # Query strings of CDN urls carry expiring signatures.
+        parts = urlsplit(url)
+        return (parts.netloc.lower() + parts.path, etag, str(size))
+
+    def lookup(self, url, etag, size):
+        """Find blob of a response by its url, ETag and size.
+
+        Args:
+            url (str): URL of the request.
+            etag (str): ETag header of the response.
+            size (int): Size of the complete file.
+
+        Returns:
+            str: Path of the blob or None if unknown.
+        """
+        key = self._key(url, etag, size)
+        if key is None:
+            return None
+        digest = self.index.get(key)
+        if digest is None:
+            return None
+        path = self.blob_path(digest)
+        return path if os.path.isfile(path) else None
+
+    def link(self, blob: str, dest: str):
+        """Link blob to dest according to `link_mode`."""
+        temp = dest + ".link"
+        if os.path.lexists(temp):
+            os.remove(temp)
+        if self.link_mode == "hardlink":
+            try:
+                os.link(blob, temp)
+            except OSError:
+                self._copy(blob, temp)
+        else:
+            self._copy(blob, temp)
+        os.replace(temp, dest)
+
+    @staticmethod
+    def _copy(src: str, dest: str):
+        """Copy src to dest, as reflink if the filesystem supports it."""
+        with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+                    return
+                except OSError:
+                    pass
+            shutil.copyfileobj(fsrc, fdest, 1048576)
+
+    def digest_file(self, path: str):
+        """Hash contents of path."""
+        hasher = self.hasher()
+        with open(path, "rb") as f:
+            for data in iter(lambda: f.read(1048576), b""):
+                hasher.update(data)
+        return hasher.hexdigest()
+
+    def put(self, src: str, dest: str, digest=None, url=None, etag=None, size=None):
+        """Move src into the store and link it to dest.
+
+        src is removed if the store already contains the same content.
+
+        Args:
+            src (str): Downloaded file.
+            dest (str): Output path.
+            digest (str, optional): Digest of src, computed if None.
+            url (str, optional): URL src was downloaded from. Defaults to None.
+            etag (str, optional): ETag of the response. Defaults to None.
+            size (int, optional): Size of the complete file. Defaults to None.
+
+        Returns:
+            str: Digest of the content.
+        """
+        if digest is None:
+            digest = self.digest_file(src)
+
+        blob = self.blob_path(digest)
+        if os.path.isfile(blob):
+            os.remove(src)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.replace(src, blob)
+        self.link(blob, dest)
+
+        key = self._key(url, etag, size)
+        if key is not None and self.index.get(key) != digest:
+            with self.lock:
+                self.index[key] = digest
+                self.index_file.write("\t".join(key + (digest,)) + "\n")
+                self.index_file.flush()
+        return digest
+
+    def close(self):
+        """Close the index."""
+        with self.lock:
+            self.index_file.close()
@@ -0,0 +1,165 @@
+"""Compiled output filename templates."""
+import re
+import string
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from datetime import timezone
+
+TIME_FIELDS = {
+    "Y": lambda t: "{:04d}".format(t.year),
+    "m": lambda t: "{:02d}".format(t.month),
+    "d": lambda t: "{:02d}".format(t.day),
+    "H": lambda t: "{:02d}".format(t.hour),
+    "M": lambda t: "{:02d}".format(t.minute),
+    "S": lambda t: "{:02d}".format(t.second),
+}
+UNSAFE_RE = re.compile(r'[\x00-\x1f\x7f/\\:*?"<>|]')
+MISSING = "NA"
+
+
+def sanitize(value: str):
+    """Replace characters unsafe in filenames of a field value.
+
+    Args:
+        value (str): Rendered field value.
+
+    Returns:
+        str: value safe to be used as (part of) a single path component.
+    """
+    value = UNSAFE_RE.sub("_", value)
+    if value in (".", ".."):
+        return "_"
+    return value
+
+
+class OutputTemplate:
+    """Output template parsed once and rendered for every video.
+
+    Only fields referenced by the template are looked up, and the time
+    fields `Y`, `m`, `d`, `H`, `M` and `S` share a single conversion of
+    `create_time`. Field values are sanitized, separators in the template
+    itself are kept. A format spec the value does not accept, such as
+    `{id:05d}` for a string id, renders the value as is, see `check`.
+
+    The `max_paths` most recently rendered paths are remembered, a path
+    already taken by another video gets the video id appended.
+    """
+
+    def __init__(self, template: str, max_paths=65536):
+        """Compile template.
+
+        Args:
+            template (str): `str.format` style output template.
+            max_paths (int, optional): Rendered paths remembered for collision
+                detection. Defaults to 65536.
+
+        Raises:
+            ValueError: Template is malformed.
+        """
+        self.template = template
+        self.formatter = string.Formatter()
+        self.parts = []
+        self.fields = set()
+        for literal, field, spec, conversion in self.formatter.parse(template):
+            if field is not None:
+                if field == "" or field.isdigit():
+                    raise ValueError(
+                        "Positional field in output template {}".format(template)
+                    )
+                name = re.match(r"[^.\[]*", field).group()
+                self.fields.add(name)
+            self.parts.append((literal, field, spec, conversion))
+        self.time_fields = self.fields & set(TIME_FIELDS)
+
+        self.max_paths = max_paths
+        self.paths = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _values(self, video_data: dict):
+        values = {}
+        if self.time_fields:
+            timestamp = video_data.get("create_time")
+            if timestamp is not None:
+                t = datetime.fromtimestamp(timestamp, timezone.utc)
+                for name in self.time_fields:
+                    values[name] = TIME_FIELDS[name](t)
+        for name in self.fields - self.time_fields:
+            if name in video_data:
+                values[name] = video_data[name]
+        return values
+
+    def _field(self, values: dict, field: str, spec: str, conversion, strict):
+        try:
+            value, _ = self.formatter.get_field(field, (), values)
+        except (KeyError, IndexError, AttributeError, TypeError):
+            return MISSING
+        if value is None:
+            return MISSING
+        value = self.formatter.convert_field(value, conversion)
+        try:
+            rendered = self.formatter.format_field(value, spec or "")
+        except (ValueError, TypeError) as e:
+            if strict:
+                raise ValueError(
+                    "Format spec {!r} of field {} does not match {}: {}".format(
+                        spec, field, type(value).__name__, e
+                    )
+                )
+            rendered = self.formatter.format_field(value, "")
+        return sanitize(rendered)
+
+    def format(self, video_data: dict, strict=False):
+        """Render template for video_data without collision detection.
+
+        Args:
+            video_data (dict): Extracted video data.
+            strict (bool, optional): Raise on format specs not matching a
+                value instead of ignoring them. Defaults to False.
+
+        Raises:
+            ValueError: Format spec does not match a value, with `strict`.
+
+        Returns:
+            str: Rendered path.
+        """
+        values = self._values(video_data)
+        rendered = []
+        for literal, field, spec, conversion in self.parts:
+            rendered.append(literal)
+            if field is not None:
+                rendered.append(self._field(values, field, spec, conversion, strict))
+        return "".join(rendered)
+
+    def check(self, sample: dict):
+        """Check that the format specs of all fields accept sample.
+
+        Args:
+            sample (dict): Video data with values of the extracted types.
+
+        Raises:
+            ValueError: Format spec does not match a value of sample.
+        """
+        self.format(sample, strict=True)
+
+    def render(self, video_data: dict):
+        """Render unique path for video_data.
+
+        Args:
+            video_data (dict): Extracted video data.
+
+        Returns:
+            str: Rendered path, unique among paths rendered so far.
+        """
+        path = self.format(video_data)
+        video_id = video_data.get("id")
+        with self.lock:
+            candidate = path
+            base, n = "{}_{}".format(path, video_id), 0
+            while self.paths.setdefault(candidate, video_id) != video_id:
+                n += 1
+                candidate = base if n == 1 else "{}_{}".format(base, n)
+            self.paths.move_to_end(candidate)
+            if len(self.paths) > self.max_paths:
+                self.paths.popitem(last=False)
+            return candidate
@@ -1,39 +1,119 @@
 """Main module."""
-from tiktok_dl.downloader import Downloader
-from tiktok_dl.extractors.extractor import Extractor
+import itertools
+import sys
+
+from tiktok_dl.archive import open_archive
+from tiktok_dl.batch import input_urls
 from tiktok_dl.logger import Logger
-from tiktok_dl.validator import AwemeValidator
+from tiktok_dl.metrics import Metrics
+from tiktok_dl.metrics import StatsFile
+from tiktok_dl.preflight import Preflight
+from tiktok_dl.worker import WorkerPool
+
+# Seconds running downloads get to stop after an interrupt before files
+# and the archive are closed under them.
+STOP_TIMEOUT = 30
 
 
 class TikTokDownloader:
     """TikTok Downloader Class."""
 
     def __init__(self, options):
-        """Initialize validator, extractor, logger and downloader.
+        """Initialize logger and archive.
+
+        Validator, extractor and downloader pull in requests, jsonschema
+        and the schemas, they are created on first use of `downloader`.
 
         Args:
             options (dict): Dictionary of command-line options.
         """
         self.options = options
-        self.validator = AwemeValidator()
-        self.extractor = Extractor()
+        self._downloader = None
+        self.page_cache = None
+        self.stats_file = None
+        self.metrics = Metrics()
         self.logger = Logger(
             no_warnings=self.options.no_warnings,
             quiet=self.options.quiet,
             verbose=self.options.verbose,
         )
-        self.downloader = Downloader(
-            validator=self.validator,
-            extractor=self.extractor,
+        self.archive = open_archive(
+            self.options.download_archive,
+            backend=self.options.archive_backend,
+            bloom=self.options.archive_bloom,
+        )
+        self.preflight = Preflight(self.archive, self.logger)
+
+    @property
+    def downloader(self):
+        """Downloader instance, created on first access."""
+        if self._downloader is None:
+            self._downloader = self._create_downloader()
+        return self._downloader
+
+    @property
+    def validator(self):
+        """AwemeValidator of `downloader`, created on first access."""
+        return self.downloader.validator
+
+    @property
+    def extractor(self):
+        """Extractor of `downloader`, created on first access."""
+        return self.downloader.extractor
+
+    def _create_downloader(self):
+        from tiktok_dl.extractors.extractor import Extractor
+        from tiktok_dl.validator import AwemeValidator
+
+        if self.options.engine == "asyncio":
+            from tiktok_dl.async_downloader import AsyncDownloader as downloader_class
+        else:
+            from tiktok_dl.downloader import Downloader as downloader_class
+
+        validator = AwemeValidator(
+            mode=self.options.validate,
+            sample_rate=self.options.validate_sample_rate,
+            logger=self.logger,
+        )
+        extractor = Extractor()
+        if self.options.page_cache is not None:
+            from tiktok_dl.page_cache import PageCache
+
+            self.page_cache = PageCache(
+                self.options.page_cache,
+                max_size=self.options.page_cache_max_size,
+                ttl=self.options.page_cache_ttl,
+            )
+        if self.options.stats_file is not None:
+            self.stats_file = StatsFile(
+                self.metrics,
+                self.options.stats_file,
+                interval=self.options.stats_interval,
+            )
+        return downloader_class(
+            validator=validator,
+            extractor=extractor,
             logger=self.logger,
+            archive=self.archive,
+            content_store=self.options.content_store,
+            content_store_link=self.options.content_store_link,
             directory_prefix=self.options.directory_prefix,
             dump_json=self.options.dump_json,
+            fsync=self.options.fsync,
             max_sleep_interval=self.options.max_sleep_interval,
+            metadata_compression=self.options.metadata_compression,
+            metadata_sink=self.options.metadata_sink,
+            metrics=self.metrics,
             no_check_certificate=self.options.no_check_certificate,
             no_overwrite=self.options.no_overwrite,
             no_write_json=self.options.no_write_json,
             output_template=self.options.output_template,
+            page_cache=self.page_cache,
+            pool_size=self.options.pool_size,
             print_json=self.options.print_json,
+            race_mirrors=self.options.race_mirrors,
+            segment_min_size=self.options.segment_min_size,
+            segments=self.options.segments,
             simulate=self.options.simulate,
             skip_download=self.options.skip_download,
             sleep_interval=self.options.sleep_interval,
@@ -42,11 +122,77 @@ class TikTokDownloader:
         )
 
     def download(self, url):
-        def queue(url):
-            pass
+        """Download a single TikTok Video.
 
-        queue(url)
+        Args:
+            url (str): URL of the TikTok Video.
+        """
+        self.downloader.download(url)
+
+    def _process_urls_threads(self, urls):
+        pool = WorkerPool(
+            self.download,
+            logger=self.logger,
+            concurrent_count=self.options.concurrent_count,
+        )
+        try:
+            pool.map(urls)
+        except KeyboardInterrupt:
+            self.logger.warning("Interrupted, waiting for running downloads to stop")
+            self.abort()
+            if not pool.join(timeout=STOP_TIMEOUT):
+                self.logger.warning("Downloads still running, closing anyway")
+            raise
+
+    def abort(self):
+        """Abort running downloads, if the downloader was created."""
+        if self._downloader is not None:
+            self._downloader.abort()
+
+    def input_urls(self):
+        """Return iterator of URLs from the command-line and `batch_file`."""
+        return input_urls(self.options.urls, self.options.batch_file)
 
     def process_urls(self):
-        for url in self.options.urls:
-            self.download(url)
+        """Download all urls in parallel using `concurrent_count` workers.
+
+        URLs are read lazily, so downloads start before the whole batch file
+        was read. Invalid, duplicate and archived urls are dropped before any
+        request.
+        """
+        urls = self.preflight.filter(self.input_urls())
+        try:
+            first = next(urls, None)
+            if first is None:
+                return
+            urls = itertools.chain([first], urls)
+
+            if self.options.engine == "asyncio":
+                self.downloader.run(
+                    urls, concurrent_count=self.options.concurrent_count
+                )
+            else:
+                self._process_urls_threads(urls)
+        finally:
+            self.close()
+            self.preflight.report()
+
+    def close(self):
+        """Flush and close the download archive, downloader and page cache.
+
+        The final metrics are written to `stats_file` and, with
+        `print_stats`, printed to stderr.
+        """
+        # Closing the downloader flushes the metadata sink, which records
+        # its last videos in the archive.
+        if self._downloader is not None:
+            self._downloader.close()
+        self.archive.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.stats_file is not None:
+            self.stats_file.close()
+            self.stats_file = None
+        if self.options.print_stats:
+            for line in self.metrics.summary():
+                print(line, file=sys.stderr)
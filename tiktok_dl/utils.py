@@ -1,8 +1,10 @@
 import re
 from datetime import datetime
+from datetime import timezone
 
-from loguru import logger
-from requests.exceptions import InvalidURL
+
+NO_DEFAULT = object()
+PATTERN_TYPES = (str, type(re.compile("")))
 
 
 def format_utctime(time: int, fmt: str) -> str:
@@ -15,20 +17,21 @@ def format_utctime(time: int, fmt: str) -> str:
     Returns:
         str: unixtimestamp formatted to custom fmt.
     """
-    return datetime.utcfromtimestamp(time).strftime(fmt)
+    return datetime.fromtimestamp(time, timezone.utc).strftime(fmt)
 
 
 def search_regex(
-    pattern, string: str, name: str, default=object(), fatal=True, flags=0, group=None
+    pattern, string: str, name: str, default=NO_DEFAULT, fatal=True, flags=0, group=None
 ):
     """Perform a regex search on the given string, using a single or a list of patterns returning the first matching group.
 
     In case of failure return a default value or raise a WARNING or a
     RegexNotFoundError, depending on fatal, specifying the field name.
     """
-    if isinstance(pattern, (str, type(re.compile("")))):
+    if isinstance(pattern, PATTERN_TYPES):
         mobj = re.search(pattern, string, flags)
     else:
+        mobj = None
         for p in pattern:
             mobj = re.search(p, string, flags)
             if mobj:
@@ -40,23 +43,52 @@ def search_regex(
             return next(g for g in mobj.groups() if g is not None)
         else:
             return mobj.group(group)
-    elif default is not default:
+    elif default is not NO_DEFAULT:
         return default
     elif fatal:
         raise re.error("Unable to extract %s" % name)
     else:
+        from loguru import logger
+
         logger.error("unable to extract {}", name)
         return None
 
 
+VALID_URL_RE = re.compile(
+    r"https?://www\.tiktokv?\.com/(?:@[\w\._]+|share)/video/(?P<id>\d+)"
+)
+
+
 def valid_url_re():
     """TikTok URL RegExp.
 
        Captures id of the TikTok Video.
     """
-    return re.compile(
-        r"https?://www\.tiktokv?\.com/(?:@[\w\._]+|share)/video/(?P<id>\d+)"
-    )
+    return VALID_URL_RE
+
+
+def normalize_url(url: str) -> str:
+    """Normalize TikTok Video URL so that it matches `valid_url_re`.
+
+    Strips whitespace and fragment, adds missing scheme and
+    replaces bare or mobile TikTok hosts with `www.tiktok.com`.
+
+    Args:
+        url (str): TikTok Video URL.
+
+    Returns:
+        str: Normalized URL.
+    """
+    url = url.strip().split("#", 1)[0]
+    if "://" not in url:
+        url = "https://" + url
+
+    scheme, rest = url.split("://", 1)
+    host, sep, path = rest.partition("/")
+    host = host.lower()
+    if host in ("tiktok.com", "m.tiktok.com"):
+        host = "www.tiktok.com"
+    return "{}://{}{}{}".format(scheme.lower(), host, sep, path)
 
 
 def match_id(url: str, valid_re):
@@ -75,6 +107,8 @@ def match_id(url: str, valid_re):
     """
     m = valid_re.match(url)
     if m is None:
+        from requests.exceptions import InvalidURL
+
         raise InvalidURL("Url is invalid {}".format(url))
     if m.group("id") is None:
         raise re.error("unable to find video id {}".format(url))
@@ -132,3 +166,18 @@ def int_or_none(v, default=None, get_attr=None):
         return int(v)
     except (ValueError, TypeError):
         return default
+
+
+def parse_content_range(value):
+    """Parse Content-Range header.
+
+    Args:
+        value (str): Value of the header, e.g. "bytes 0-99/1000" or "bytes */1000".
+
+    Returns:
+        tuple: (start, end, total), each int or None if unknown.
+    """
+    m = re.match(r"bytes\s+(?:(\d+)-(\d+)|\*)/(\d+|\*)", value or "")
+    if m is None:
+        return (None, None, None)
+    return tuple(int_or_none(g) for g in m.groups())
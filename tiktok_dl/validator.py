@@ -1,22 +1,78 @@
 """Schema Validator for TikTok Video JSON."""
-from jsonschema import validate
-from jsonschema import ValidationError
-from loguru import logger
+import itertools
+import threading
 
 from tiktok_dl.schema import schemas
 
+VALIDATE_MODES = ("full", "sampled", "off")
+
 
 class AwemeValidator:
     """Validate Schema for TikTok Video JSON."""
 
-    def __init__(self):
-        """Initialize schemas."""
-        self.schemas = schemas()
+    def __init__(self, mode="full", sample_rate=100, logger=None):
+        """Initialize validation mode.
+
+        Schemas are read and compiled on first validation.
+
+        Args:
+            mode (str, optional): "full" validates every video, "sampled" one
+                in `sample_rate` videos and "off" none. Defaults to "full".
+            sample_rate (int, optional): Validate one in this many videos in
+                "sampled" mode. Defaults to 100.
+            logger (Logger, optional): Logger of failed validations.
+                Defaults to None.
+        """
+        if mode not in VALIDATE_MODES:
+            raise ValueError("Unknown validation mode {}".format(mode))
+
+        self.mode = mode
+        self.sample_rate = max(1, sample_rate)
+        self.logger = logger
+        self.schemas = None
+        self.validators = None
+        self.order = []
+        self.last_version = None
+
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Read schemas and compile a validator for each of them."""
+        from jsonschema.validators import validator_for
+
+        def compile_schema(schema):
+            cls = validator_for(schema)
+            cls.check_schema(schema)
+            return cls(schema)
+
+        with self._lock:
+            if self.validators is not None:
+                return
+            self.schemas = sorted(schemas(), key=lambda x: x.get("NAME"), reverse=True)
+            self.order = [json_schema.get("VERSION") for json_schema in self.schemas]
+            if self.last_version is None and self.order:
+                self.last_version = self.order[0]
+            self.validators = {
+                json_schema.get("VERSION"): compile_schema(json_schema.get("SCHEMA"))
+                for json_schema in self.schemas
+            }
+
+    def _matched(self, version: str):
+        self.last_version = version
+        if self.order[0] == version:
+            return
+        with self._lock:
+            self.order.remove(version)
+            self.order.insert(0, version)
 
     def validate(self, json_data: dict):
         """Validate json_data.
 
-        This will try validating from collection of schema.
+        This will try validating from collection of schema, starting with the
+        most recently matched version. In "sampled" and "off" modes skipped
+        videos are assumed to match the most recently matched version, which
+        is None in "off" mode.
 
         Args:
             str (dict): json data to validate.
@@ -25,16 +81,19 @@ class AwemeValidator:
             bool: True If Scheme validation was a success.
             str : Version of the Schema that was validated.
         """
-        for json_schema in self.schemas.reverse():
-            try:
-                validate(instance=json_data, schema=json_schema.get("SCHEMA"))
-                logger.debug(
-                    "Schema Validation success with " + json_schema.get("VERSION")
-                )
-
-                return (True, json_schema.get("VERSION"))
-            except ValidationError as e:
-                pass
-        logger.warning("No valid schema exists for given json data")
+        if self.mode == "off":
+            return (True, self.last_version)
+        if self.mode == "sampled" and next(self._counter) % self.sample_rate != 0:
+            return (True, self.last_version)
+        if self.validators is None:
+            self._load()
+
+        for version in list(self.order):
+            if self.validators[version].is_valid(json_data):
+                self._matched(version)
+                return (True, version)
+
+        if self.logger is not None:
+            self.logger.warning("No valid schema exists for given json data")
 
         return (False, None)
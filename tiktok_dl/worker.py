@@ -0,0 +1,120 @@
+"""Bounded Worker Pool for tiktok_dl."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+
+class WorkerPool:
+    """Run a task for each item on a bounded pool of threads."""
+
+    def __init__(self, task, logger, concurrent_count=1, backlog=2):
+        """Initialize Worker Pool.
+
+        Args:
+            task (callable): Function called with each item.
+            logger: Instance of Logger class.
+            concurrent_count (int, optional): Number of worker threads. Defaults to 1.
+            backlog (int, optional): Queued items allowed per worker before
+                `submit` blocks the producer. Defaults to 2.
+        """
+        self.task = task
+        self.logger = logger
+        self.concurrent_count = max(1, concurrent_count)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrent_count)
+        self._slots = threading.BoundedSemaphore(self.concurrent_count * backlog)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def _run(self, item):
+        if self.stopped.is_set():
+            return None
+        return self.task(item)
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None and not isinstance(error, KeyboardInterrupt):
+            self.logger.error("Worker failed: {!r}", error)
+
+    def submit(self, item):
+        """Queue item for the task, blocking while the pool is full.
+
+        Args:
+            item (object): Item passed to the task.
+
+        Returns:
+            Future: Future of the task, None if the pool was stopped.
+        """
+        self._slots.acquire()
+        if self.stopped.is_set():
+            self._slots.release()
+            return None
+
+        try:
+            future = self._executor.submit(self._run, item)
+        except RuntimeError:
+            # Pool was shut down by `stop` from another thread.
+            self._slots.release()
+            return None
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def map(self, items):
+        """Run the task for every item and wait for completion.
+
+        Items are consumed lazily, so `items` may be a generator.
+        On KeyboardInterrupt queued items are cancelled and the
+        interrupt is re-raised once running tasks return.
+
+        Args:
+            items (iterable): Items passed to the task.
+        """
+        try:
+            for item in items:
+                if self.stopped.is_set():
+                    break
+                self.submit(item)
+            self.shutdown(wait=True)
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+
+    def stop(self):
+        """Cancel queued items and stop accepting new ones."""
+        self.stopped.set()
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+        self.shutdown(wait=False)
+
+    def join(self, timeout=None):
+        """Wait for running tasks to return.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to None.
+
+        Returns:
+            bool: True if no task is running anymore.
+        """
+        with self._lock:
+            pending = list(self._pending)
+        _, not_done = wait(pending, timeout=timeout)
+        return len(not_done) == 0
+
+    def shutdown(self, wait=True):
+        """Shutdown worker threads.
+
+        Args:
+            wait (bool, optional): Wait for running tasks. Defaults to True.
+        """
+        self._executor.shutdown(wait=wait)
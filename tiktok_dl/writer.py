@@ -0,0 +1,156 @@
+"""Atomic file writes shared by all downloads."""
+import json
+import os
+import threading
+
+
+class FileWriter:
+    """Write files atomically through temporary files.
+
+    Directories known to exist are cached, so concurrent downloads into the
+    same directory do not repeat stat and mkdir calls. With `fsync` every
+    file is synced before it is renamed into place, while the directories
+    holding the renames are synced in batches of `sync_every` files.
+    """
+
+    def __init__(self, no_overwrite=False, fsync=False, sync_every=64):
+        """Initialize File Writer.
+
+        Args:
+            no_overwrite (bool, optional): Keep existing files. Defaults to False.
+            fsync (bool, optional): Sync written files to disk. Defaults to False.
+            sync_every (int, optional): Files renamed into a directory before
+                it is synced. Defaults to 64.
+        """
+        self.no_overwrite = no_overwrite
+        self.fsync = fsync
+        self.sync_every = sync_every
+        self.directories = set()
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def makedirs(self, directory: str):
+        """Create directory unless it is known to exist."""
+        if not directory or directory in self.directories:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self.directories.add(directory)
+
+    def skip(self, dest: str):
+        """Return True if dest exists and must not be overwritten.
+
+        Only a shortcut to avoid writing a file that would be discarded,
+        `write_bytes` still refuses to replace a file created meanwhile.
+        """
+        return self.no_overwrite and os.path.exists(dest)
+
+    def _temp(self, dest: str):
+        return "{}.{}.tmp".format(dest, threading.get_ident())
+
+    def _link(self, temp: str, dest: str):
+        """Move temp to dest unless dest exists.
+
+        Returns:
+            bool: False if dest already existed.
+        """
+        try:
+            os.link(temp, dest)
+        except FileExistsError:
+            return False
+        except OSError:
+            # Hard links are not supported, reserve dest instead.
+            try:
+                os.close(os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+            except FileExistsError:
+                return False
+            os.replace(temp, dest)
+            return True
+        os.remove(temp)
+        return True
+
+    def replace(self, temp: str, dest: str):
+        """Atomically move completed temp file to dest."""
+        if self.fsync:
+            self._fsync(temp)
+        os.replace(temp, dest)
+        self._schedule(dest)
+
+    def written(self, dest: str):
+        """Sync a file moved to dest without `replace`."""
+        if not self.fsync:
+            return
+        self._fsync(dest)
+        self._schedule(dest)
+
+    def _fsync(self, path: str):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _schedule(self, dest: str):
+        """Schedule sync of the directory of dest."""
+        if not self.fsync:
+            return
+
+        directory = os.path.dirname(dest) or "."
+        with self.lock:
+            count = self.pending.get(directory, 0) + 1
+            if count < self.sync_every:
+                self.pending[directory] = count
+                return
+            self.pending.pop(directory, None)
+        self._fsync(directory)
+
+    def sync(self):
+        """Sync all directories with files renamed since the last sync."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for directory in pending:
+            self._fsync(directory)
+
+    def write_bytes(self, dest: str, data: bytes):
+        """Atomically write data to dest.
+
+        Returns:
+            bool: False if dest was kept because of `no_overwrite`.
+        """
+        if self.skip(dest):
+            return False
+
+        self.makedirs(os.path.dirname(dest))
+        temp = self._temp(dest)
+        try:
+            with open(temp, "wb") as f:
+                f.write(data)
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if not self.no_overwrite:
+                os.replace(temp, dest)
+            elif not self._link(temp, dest):
+                os.remove(temp)
+                return False
+            self._schedule(dest)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return True
+
+    def write_text(self, dest: str, text: str):
+        """Atomically write text to dest encoded as utf-8."""
+        return self.write_bytes(dest, text.encode("utf-8"))
+
+    def write_json(self, dest: str, data):
+        """Atomically write data to dest as JSON."""
+        return self.write_text(dest, json.dumps(data, ensure_ascii=False))
+
+    def close(self):
+        """Sync pending directories."""
+        self.sync()
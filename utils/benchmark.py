@@ -0,0 +1,349 @@
+"""Benchmark tiktok-dl end to end against a local stand-in TikTok server.
+
+Usage: python utils/benchmark.py [--videos N] [--engines threads,asyncio]
+           [--concurrency 1,4,16] [--media-size BYTES] [--latency SECONDS]
+           [--error-rate RATE] [--throttle-rate RATE] [--output FILE]
+
+The server answers webpage requests with synthetic __NEXT_DATA__ pages built
+from tests/data/page_props.json and serves media of configurable size, with
+optional latency, HTTP 500 errors and HTTP 429 throttling. Webpage URLs stay
+valid TikTok URLs, the command-line reaches the server through HTTP_PROXY.
+
+Every scenario runs the command-line in a fresh interpreter and reports
+URLs/sec, MB/sec, p50/p99 latency of each video from its webpage request to
+its last media byte, and peak RSS of the command-line process.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+PAGE_PROPS = os.path.join(ROOT, "tests", "data", "page_props.json")
+VIDEO_URL = "http://www.tiktok.com/@bench.user/video/{}"
+FIRST_ID = 7000000000000000000
+
+PAGE_RE = re.compile(r"^/@[\w.]+/video/(?P<id>\d+)$")
+MEDIA_RE = re.compile(r"^/(?P<kind>video|cover)/(?P<id>\d+)\.(?:mp4|jpeg)$")
+
+PAGE = (
+    "<!DOCTYPE html><html><head><title>TikTok</title></head><body>"
+    '<div id="main">{padding}</div>'
+    '<script id="__NEXT_DATA__" type="application/json" crossorigin="anonymous">'
+    "{next_data}</script></body></html>"
+)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve webpages and media of `StandInServer` over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(status)
+
+    def do_GET(self):
+        server = self.server
+        # Proxied requests carry the absolute URL.
+        path = urlsplit(self.path).path
+        page = PAGE_RE.match(path)
+        media = MEDIA_RE.match(path)
+        video_id = (page or media).group("id") if page or media else None
+        if video_id is not None:
+            server.started(video_id)
+
+        if server.latency > 0:
+            time.sleep(server.latency)
+        fault = server.fault()
+        if fault == 429:
+            self._send(429, headers={"Retry-After": "0"})
+            return
+        if fault == 500 or video_id is None:
+            self._send(fault or 404)
+            return
+
+        if page:
+            body = server.page(video_id)
+            self._send(200, body, {"Content-Type": "text/html; charset=utf-8"})
+            return
+
+        payload = server.media if media.group("kind") == "video" else server.cover
+        start, end = 0, len(payload) - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if m and int(m.group(1)) < len(payload):
+            start = int(m.group(1))
+            if m.group(2):
+                end = min(end, int(m.group(2)))
+            status = 206
+            headers = {
+                "Content-Range": "bytes {}-{}/{}".format(start, end, len(payload))
+            }
+        else:
+            status = 200
+            headers = {}
+        headers["Accept-Ranges"] = "bytes"
+        self._send(status, payload[start : end + 1], headers)
+        server.finished(video_id, end - start + 1)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local stand-in of the TikTok webpage and CDN hosts."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        media_size=1048576,
+        cover_size=16384,
+        page_padding=65536,
+        latency=0.0,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        seed=0,
+    ):
+        """Initialize Stand-in Server on a free port of 127.0.0.1.
+
+        Args:
+            media_size (int, optional): Bytes of every video. Defaults to 1 MiB.
+            cover_size (int, optional): Bytes of every cover. Defaults to 16 KiB.
+            page_padding (int, optional): Bytes of markup before the
+                __NEXT_DATA__ script. Defaults to 64 KiB.
+            latency (float, optional): Seconds to wait before every response.
+                Defaults to 0.0.
+            error_rate (float, optional): Fraction of requests answered with
+                HTTP 500. Defaults to 0.0.
+            throttle_rate (float, optional): Fraction of requests answered with
+                HTTP 429. Defaults to 0.0.
+            seed (int, optional): Seed of the injected faults. Defaults to 0.
+        """
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.url = "http://127.0.0.1:{}".format(self.server_address[1])
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.media = os.urandom(media_size)
+        self.cover = os.urandom(cover_size)
+        self.padding = "<p>" + "x" * max(0, page_padding - 7) + "</p>"
+        with open(PAGE_PROPS, "r", encoding="utf-8") as f:
+            self.page_props = json.load(f)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget request counters and per-video timings."""
+        with self.lock:
+            self.statuses = {}
+            self.videos = {}
+            self.bytes_sent = 0
+
+    def fault(self):
+        """Return status code of the fault to inject or None."""
+        with self.lock:
+            p = self.random.random()
+        if p < self.throttle_rate:
+            return 429
+        if p < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+    def page(self, video_id: str):
+        """Render webpage of video_id."""
+        page_props = copy.deepcopy(self.page_props)
+        item = page_props["videoData"]["itemInfos"]
+        item["id"] = video_id
+        item["video"]["urls"] = ["{}/video/{}.mp4".format(self.url, video_id)]
+        item["covers"] = ["{}/cover/{}.jpeg".format(self.url, video_id)]
+        next_data = json.dumps({"props": {"pageProps": page_props}})
+        return PAGE.format(padding=self.padding, next_data=next_data).encode("utf-8")
+
+    def count(self, status: int):
+        with self.lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def started(self, video_id: str):
+        with self.lock:
+            self.videos.setdefault(video_id, [time.perf_counter(), None, 0])
+
+    def finished(self, video_id: str, size: int):
+        with self.lock:
+            video = self.videos[video_id]
+            video[1] = time.perf_counter()
+            video[2] += size
+            self.bytes_sent += size
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, args=(0.05,))
+        thread.daemon = True
+        thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def percentile(values, p):
+    """Return p-th percentile of values, None if there are none."""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[p - 1]
+
+
+def run_scenario(server, engine, concurrency, videos, first_id, extra_args=()):
+    """Download `videos` new videos with the command-line and measure it."""
+    server.reset()
+    with tempfile.TemporaryDirectory() as directory:
+        batch_file = os.path.join(directory, "urls.txt")
+        with open(batch_file, "w") as f:
+            for video_id in range(first_id, first_id + videos):
+                f.write(VIDEO_URL.format(video_id) + "\n")
+
+        cmd = [sys.executable, "-m", "tiktok_dl.cli", "--quiet"]
+        cmd += ["--engine", engine, "--concurrent-count", str(concurrency)]
+        cmd += ["--sleep-interval", "0", "--batch-file", batch_file]
+        cmd += ["--directory-prefix", os.path.join(directory, "out")]
+        cmd += list(extra_args)
+        env = dict(os.environ, HTTP_PROXY=server.url, NO_PROXY="127.0.0.1")
+        env["http_proxy"], env["no_proxy"] = env["HTTP_PROXY"], env["NO_PROXY"]
+
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd,
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # wait4 reports the resource usage of this child alone.
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        wall = time.perf_counter() - start
+
+    size = len(server.media)
+    with server.lock:
+        latencies = sorted(
+            (end - begin) * 1000
+            for begin, end, received in server.videos.values()
+            if end is not None and received >= size
+        )
+        statuses = dict(sorted(server.statuses.items()))
+        bytes_sent = server.bytes_sent
+
+    rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "engine": engine,
+        "concurrency": concurrency,
+        "videos": videos,
+        "completed": len(latencies),
+        "exit_code": proc.returncode,
+        "wall_s": round(wall, 3),
+        "urls_per_sec": round(videos / wall, 2),
+        "mb_per_sec": round(bytes_sent / wall / 1e6, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) or 0, 2),
+            "p99": round(percentile(latencies, 99) or 0, 2),
+        },
+        "peak_rss_mb": round(rss, 1),
+        "statuses": {str(k): v for k, v in statuses.items()},
+    }
+
+
+def csv(type_):
+    return lambda value: [type_(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--engines", type=csv(str), default=["threads", "asyncio"])
+    parser.add_argument("--concurrency", type=csv(int), default=[1, 4, 16])
+    parser.add_argument("--media-size", type=int, default=1048576)
+    parser.add_argument("--cover-size", type=int, default=16384)
+    parser.add_argument("--page-padding", type=int, default=65536)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument(
+        "cli_args",
+        nargs=argparse.REMAINDER,
+        help="Extra arguments of the command-line after '--'.",
+    )
+    args = parser.parse_args()
+    extra_args = [a for a in args.cli_args if a != "--"]
+
+    server = StandInServer(
+        media_size=args.media_size,
+        cover_size=args.cover_size,
+        page_padding=args.page_padding,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+    )
+    server.start()
+
+    results = {
+        "config": {
+            k: v for k, v in vars(args).items() if k not in ("output", "cli_args")
+        },
+        "cli_args": extra_args,
+        "scenarios": [],
+    }
+    first_id = FIRST_ID
+    try:
+        for engine in args.engines:
+            for concurrency in args.concurrency:
+                result = run_scenario(
+                    server, engine, concurrency, args.videos, first_id, extra_args
+                )
+                first_id += args.videos
+                results["scenarios"].append(result)
+                print(
+                    "{:<8} -j {:<3} {:>8.2f} urls/s {:>8.2f} MB/s  "
+                    "p50 {:>8.2f} ms  p99 {:>8.2f} ms  rss {:>6.1f} MB  "
+                    "{}/{} ok".format(
+                        engine,
+                        concurrency,
+                        result["urls_per_sec"],
+                        result["mb_per_sec"],
+                        result["latency_ms"]["p50"],
+                        result["latency_ms"]["p99"],
+                        result["peak_rss_mb"],
+                        result["completed"],
+                        result["videos"],
+                    )
+                )
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark start-up time of the tiktok-dl command-line.
+
+Usage: python utils/startup.py [--runs N] [--output FILE]
+
+Runs each scenario N times in a fresh interpreter and prints the median
+wall time together with the cumulative import time of `tiktok_dl.cli`
+as reported by `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+VIDEO_URL = "https://www.tiktok.com/@user/video/6843271209185053958"
+
+
+def scenarios(archive):
+    """Return command-line arguments of each scenario by name."""
+    return {
+        "version": ["--version"],
+        "help": ["--help"],
+        "archived": ["--quiet", "--download-archive", archive, VIDEO_URL],
+    }
+
+
+def run(args, importtime=False):
+    """Run the command-line with args, return wall time and its stderr."""
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-m", "tiktok_dl.cli"] + args
+
+    start = time.perf_counter()
+    out = subprocess.run(
+        cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    return time.perf_counter() - start, out.stderr.decode("utf-8", "replace")
+
+
+def import_time(stderr):
+    """Sum cumulative import time of top-level tiktok_dl modules in ms."""
+    total = 0
+    for line in stderr.split("\n"):
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \| (tiktok_dl\S*)$", line)
+        if m:
+            total += int(m.group(1))
+    return total / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", type=str, default=None)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        archive = os.path.join(directory, "archive.txt")
+        with open(archive, "w") as f:
+            f.write(VIDEO_URL.rsplit("/", 1)[-1] + "\n")
+
+        for name, cli_args in scenarios(archive).items():
+            wall = [run(cli_args)[0] for _ in range(args.runs)]
+            results[name] = {
+                "wall_ms": round(statistics.median(wall) * 1000, 2),
+                "import_ms": import_time(run(cli_args, importtime=True)[1]),
+            }
+            print(
+                "{:<10} wall {:>8.2f} ms  imports {:>8.2f} ms".format(
+                    name, results[name]["wall_ms"], results[name]["import_ms"]
+                )
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()